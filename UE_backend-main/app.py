@@ -12,11 +12,14 @@ import logging
 import time
 import json
 import uuid
+import threading
 from datetime import datetime, timedelta
 from functools import wraps
 from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity, get_jwt, verify_jwt_in_request
 from dotenv import load_dotenv
 from typing import List
+from sqlalchemy.orm import selectinload
+from sqlalchemy import func, literal, union_all
 
 import requests  # Import requests outside try block so it's always available
 
@@ -62,11 +65,30 @@ class PredictionList(BaseModel):
 
 load_dotenv()
 import auth_utils
+from utils.password_service import PasswordServiceBusy
+from utils.user_import import import_users, parse_csv, start_import_job
+from utils.pagination import paginate, PaginationError
+from utils.bulk_seed import bulk_insert, ensure_users, report_rows, SEED_MAX_ROWS, PUBLIC_SEED_MAX_ROWS
+from utils.hr_reports import date_range, month_range, parse_clock, parse_payroll_month, HRQueryError
+from utils.hr_reports import attendance_page, payroll_listing, attendance_summary
+from utils.payroll import run_payroll, upsert_payroll, PAY_COLUMNS
+from utils.attendance import mark_attendance, check_in_shift
+from utils.job_matching import match_jobs, job_skill_rows
+from utils.login_throttle import LoginThrottle
+from utils.google_verifier import GoogleTokenVerifier
 from utils.mail_service import mail, send_welcome_email
+from utils.gemini_pool import GeminiKeyPool, KeysExhaustedError, is_quota_error
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.ai_metrics import metrics as ai_metrics, outcome_for, token_usage, OUTCOME_OK
+from utils.context_providers import fetch_prediction_context, news_provider, TTLCache
+from utils.weather_store import backfill_weather, weather_aggregates, format_weather_context
+from utils.scheduler import IntervalScheduler
+from utils.risk_model import StatisticalRiskModel, arrays_from_rows
+from utils.chain_pool import ChainPool
 
 
 
-from models import db, User, Report, ReportLog, Worker, Job, Booking, NGORequest, EmployeeProfile, Attendance, Payroll, Candidate
+from models import db, User, Report, ReportLog, Worker, Job, JobSkill, Booking, NGORequest, EmployeeProfile, Attendance, Payroll, Candidate, PredictionSnapshot, UserImportJob
 
 
 # Configure logging
@@ -206,18 +228,67 @@ api = Api(
 )
 
 # RBAC Decorator
-def role_required(required_role):
+# Authorization uses the JWT claims only (role, department); no user row is loaded.
+# Roles limited to their own department; other roles see every department.
+DEPARTMENT_SCOPED_ROLES = {'dept_head', 'field_officer'}
+
+def department_scope():
+    """
+    Department the current token is limited to, or None if it may act on any department.
+    A scoped role without a department claim is limited to nothing: check
+    in_department_scope (or use role_required(department_scoped=True)) rather than
+    treating None as unrestricted.
+    """
+    claims = get_jwt()
+    if claims.get('role') in DEPARTMENT_SCOPED_ROLES:
+        return claims.get('department')
+    return None
+
+def in_department_scope(department):
+    if get_jwt().get('role') not in DEPARTMENT_SCOPED_ROLES:
+        return True
+    # A scoped role with no department claim matches no department, not every one
+    scope = department_scope()
+    return scope is not None and scope == department
+
+def role_required(*required_roles, department_scoped=False):
+    """
+    role_required('gov_admin') or role_required('dept_head', 'gov_admin').
+    department_scoped: a `department` given in the URL, query string or JSON body must
+    match the token's department claim for department-scoped roles.
+    """
+    allowed = set(required_roles)
+    label = required_roles[0] if len(required_roles) == 1 else ' or '.join(required_roles)
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
             verify_jwt_in_request()
             claims = get_jwt()
-            if claims.get("role") != required_role:
-                return {'message': f'Access forbidden: {required_role} role required'}, 403
+            if claims.get("role") not in allowed:
+                return {'message': f'Access forbidden: {label} role required'}, 403
+            if department_scoped:
+                if claims.get('role') in DEPARTMENT_SCOPED_ROLES and not claims.get('department'):
+                    return {'message': 'Access forbidden: no department assigned to this account'}, 403
+                body = request.get_json(silent=True) if request.is_json else None
+                requested = kwargs.get('department') or request.args.get('department') \
+                    or (body.get('department') if isinstance(body, dict) else None)
+                if requested and not in_department_scope(requested):
+                    return {'message': f'Access forbidden: outside department {department_scope()}'}, 403
             return fn(*args, **kwargs)
         return decorator
     return wrapper
 
+# Short-lived cache of user rows (as dicts) for endpoints that need more than the claims.
+# Per process: AdminUserDetail invalidates locally, other workers catch up within the TTL.
+user_cache = TTLCache(ttl=int(os.getenv('USER_CACHE_TTL_SECONDS', 60)), stale=0)
+
+def cached_user(user_id):
+    """user.to_dict() for user_id (None if missing), served from user_cache"""
+    def load():
+        user = db.session.get(User, user_id)
+        return user.to_dict() if user else None
+    return user_cache.get(user_id, load)
+
 # Define namespaces
 health_ns = api.namespace('health', description='Health check operations')
 detection_ns = api.namespace('detection', description='Civic issue detection operations')
@@ -252,50 +323,58 @@ if not GEMINI_KEYS and GEMINI_API_KEY_PRIMARY:
 if not GEMINI_KEYS:
     raise ValueError("No Gemini API keys found. Set GEMINI_API_KEYS in .env")
 
-current_key_index = 0
-
-def configure_gemini():
-    """Configure Gemini with the current key"""
-    global current_key_index
-    key = GEMINI_KEYS[current_key_index]
-    genai.configure(api_key=key)
-    logger.info(f"Switched to Gemini Key Index: {current_key_index} (Ends with ...{key[-4:]})")
-
-def rotate_key():
-    """Rotate to the next available key"""
-    global current_key_index
-    if len(GEMINI_KEYS) <= 1:
-        logger.warning("Only one Gemini key available. Cannot rotate.")
-        return False
-        
-    current_key_index = (current_key_index + 1) % len(GEMINI_KEYS)
-    configure_gemini()
-    return True
-
-def execute_with_retry(func, *args, **kwargs):
-    """Execute a Gemini function with auto-rotation on quota error"""
-    max_retries = len(GEMINI_KEYS)
+# Keys are leased per call from a pool whose health (cooldowns, error rate,
+# latency) is shared by every worker process; see utils/gemini_pool.py
+key_pool = GeminiKeyPool(GEMINI_KEYS, GEMINI_MODEL)
+
+# Raw model output can be large and contain user content; log it only when asked to
+LOG_AI_RAW_RESPONSES = os.getenv('LOG_AI_RAW_RESPONSES', 'false').lower() in ('1', 'true', 'yes')
+
+def execute_with_retry(func, *args, caller='unknown', **kwargs):
+    """Execute a Gemini function on a leased key, moving to the next healthy key on quota error
+
+    `func` receives the KeyLease as its first argument (use `lease.model` or `lease.api_key`).
+    Every attempt is recorded in the AI metrics under `caller`.
+    """
+    tried = set()
     last_error = None
     
-    for attempt in range(max_retries):
+    for attempt in range(len(key_pool)):
         try:
-            return func(*args, **kwargs)
+            with key_pool.lease(exclude=tried) as lease:
+                tried.add(lease.index)
+                started = time.monotonic()
+                try:
+                    result = func(lease, *args, **kwargs)
+                except Exception as e:
+                    ai_metrics.record_call(caller, lease.index, outcome_for(e), time.monotonic() - started)
+                    raise
+                prompt_tokens, response_tokens = token_usage(result)
+                ai_metrics.record_call(caller, lease.index, OUTCOME_OK, time.monotonic() - started,
+                                       prompt_tokens, response_tokens)
+                return result
+        except KeysExhaustedError:
+            break # Every key is cooling down or already tried
         except Exception as e:
-            error_msg = str(e).lower()
-            # Check for Quota (429) or Resource Exhausted errors
-            if "429" in error_msg or "quota" in error_msg or "resource exhausted" in error_msg:
-                logger.error(f"Quota exceeded on Key {current_key_index}. Rotating...")
+            if is_quota_error(e):
+                logger.error(f"Quota exceeded on Key {lease.index}. Rotating...")
                 last_error = e
-                if not rotate_key():
-                    break # No more keys to try
             else:
                 raise e # Not a quota error, crash normally
                 
-    raise last_error or Exception("All Gemini keys exhausted")
-
-# Initial Configuration
-configure_gemini()
-model = genai.GenerativeModel(GEMINI_MODEL)
+    raise last_error or KeysExhaustedError("All Gemini keys exhausted (quota cooldown)")
+
+# Circuit breakers around outbound AI calls. Each endpoint has a latency budget that
+# is also passed to the SDK as the request timeout; quota errors are handled by the
+# key pool and do not count against the circuit.
+ai_breakers = {
+    'detection': CircuitBreaker('detection', latency_budget=float(os.getenv('AI_BUDGET_DETECTION_SECONDS', 20)),
+                                is_failure=lambda e: not is_quota_error(e)),
+    'predictions': CircuitBreaker('predictions', latency_budget=float(os.getenv('AI_BUDGET_PREDICTIONS_SECONDS', 30)),
+                                  is_failure=lambda e: not is_quota_error(e)),
+    'pr_image': CircuitBreaker('pr_image', latency_budget=float(os.getenv('AI_BUDGET_PR_IMAGE_SECONDS', 30)),
+                               is_failure=lambda e: not is_quota_error(e)),
+}
 
 # Define API models for documentation
 health_response = api.model('HealthResponse', {
@@ -411,10 +490,14 @@ def process_image_with_gemini(image_data):
         """
         
         # Generate response from Gemini (with robust retry logic)
-        response = execute_with_retry(lambda: model.generate_content([prompt, image]))
+        breaker = ai_breakers['detection']
+        response = breaker.call(execute_with_retry, lambda lease: lease.model.generate_content(
+            [prompt, image], request_options={'timeout': breaker.latency_budget}
+        ), caller='detection')
         response_text = response.text.strip()
         
-        logger.info(f"Gemini raw response: {response_text}")
+        if LOG_AI_RAW_RESPONSES:
+            logger.info(f"Gemini raw response: {response_text}")
         
         # Clean and parse JSON response
         try:
@@ -439,6 +522,7 @@ def process_image_with_gemini(image_data):
                 return result
             else:
                 # Fallback: create response based on keywords
+                ai_metrics.record_parse_fallback('detection')
                 civic_keywords = ['pothole', 'garbage', 'waste', 'sewage', 'drain', 
                                 'street', 'light', 'road', 'damage', 'broken', 'overflow']
                 
@@ -461,7 +545,9 @@ def process_image_with_gemini(image_data):
                     
         except json.JSONDecodeError as e:
             logger.error(f"JSON parsing error: {e}")
-            logger.error(f"Response text: {response_text}")
+            if LOG_AI_RAW_RESPONSES:
+                logger.error(f"Response text: {response_text}")
+            ai_metrics.record_parse_fallback('detection')
             
             # Fallback response
             return {
@@ -498,7 +584,10 @@ class GeminiTest(Resource):
         """Test Gemini API connection"""
         try:
             # Test with a simple text prompt
-            response = model.generate_content("Respond with 'Hello from Gemini!' if you are working correctly.")
+            response = execute_with_retry(
+                lambda lease: lease.model.generate_content("Respond with 'Hello from Gemini!' if you are working correctly."),
+                caller='gemini_test'
+            )
             return {
                 "status": "success",
                 "message": "Gemini API is working",
@@ -509,7 +598,109 @@ class GeminiTest(Resource):
             logger.error(f"Gemini API test failed: {e}")
             api.abort(500, f"Gemini API error: {str(e)}")
 
+@health_ns.route('/ai')
+class AIHealth(Resource):
+    @health_ns.doc('ai_health')
+    @health_ns.response(200, 'Success')
+    def get(self):
+        """Summary of model call latency, token usage, outcomes, key health and circuit state (this worker)"""
+        summary = ai_metrics.summary()
+        return {
+            "status": "degraded" if any(b.state != 'closed' for b in ai_breakers.values()) else "healthy",
+            "callers": summary['callers'],
+            "keys": {
+                str(k['index']): dict(k, **summary['keys'].get(str(k['index']), {}))
+                for k in key_pool.health()
+            },
+            "circuits": {name: b.to_dict() for name, b in ai_breakers.items()},
+            "timestamp": int(time.time())
+        }, 200
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint for AI call metrics"""
+    body = ai_metrics.render_prometheus() + login_throttle.render_prometheus()
+    return app.response_class(body, mimetype='text/plain; version=0.0.4')
+
 # Helper Functions
+def detection_department(category):
+    """Department routing for AI-detected categories"""
+    if category in ['pothole', 'sidewalk', 'infrastructure']:
+        return 'Roads'
+    elif category in ['garbage', 'illegal_dumping']:
+        return 'Waste'
+    elif category in ['sewage', 'drainage', 'waterlogging']:
+        return 'Water'
+    elif category == 'streetlight':
+        return 'Electrical'
+    return 'General'
+
+# Open reports of the same category within this distance (degrees) count as duplicates
+DUPLICATE_RADIUS_DEG = 0.0001
+
+def create_reports_from_detection(issues, latitude=None, longitude=None, user_id=None):
+    """Create reports for every issue found in one photo in a single transaction
+
+    Issues matching an open report of the same category nearby are not re-created;
+    the existing report is returned instead (marked with 'duplicate': True). All
+    rows are serialized from in-memory state before the one commit, so nothing is
+    re-fetched afterwards.
+    """
+    if not issues:
+        return []
+    try:
+        # One query finds every nearby open report for all detected categories
+        existing_by_category = {}
+        if latitude is not None and longitude is not None:
+            categories = {issue.get('category') for issue in issues}
+            nearby = Report.query.options(selectinload(Report.logs)).filter(
+                Report.latitude > latitude - DUPLICATE_RADIUS_DEG, Report.latitude < latitude + DUPLICATE_RADIUS_DEG,
+                Report.longitude > longitude - DUPLICATE_RADIUS_DEG, Report.longitude < longitude + DUPLICATE_RADIUS_DEG,
+                Report.category.in_(categories),
+                Report.status == 'open'
+            ).all()
+            for r in nearby:
+                existing_by_category.setdefault(r.category, r)
+
+        now = int(time.time())
+        saved = []
+        for issue in issues:
+            category = issue.get('category')
+            existing = existing_by_category.get(category)
+            if existing is not None:
+                saved.append(dict(existing.to_dict(), duplicate=True))
+                continue
+
+            # Explicit ids/defaults so to_dict() never needs a post-commit reload
+            new_report = Report(
+                id=str(uuid.uuid4()),
+                category=category,
+                department=detection_department(category),
+                description=issue.get('description'),
+                severity=issue.get('severity') or 'medium',
+                status='open',
+                latitude=latitude,
+                longitude=longitude,
+                image_url=issue.get('image_url'),
+                user_id=user_id,
+                created_at=now
+            )
+            new_report.logs.append(ReportLog(
+                status='open',
+                message='Report created by AI detection',
+                updated_by=user_id if user_id else 'system',
+                timestamp=now
+            ))
+            db.session.add(new_report)
+            saved.append(new_report.to_dict())
+
+        db.session.commit()
+        return saved
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating reports from detection: {e}")
+        return []
+
 def create_report(data, user_id=None):
     """Create a new report in the database"""
     try:
@@ -525,14 +716,7 @@ def create_report(data, user_id=None):
         )
         
         # specific dept logic
-        if new_report.category in ['pothole', 'sidewalk', 'infrastructure']:
-            new_report.department = 'Roads'
-        elif new_report.category in ['garbage', 'illegal_dumping']:
-            new_report.department = 'Waste'
-        elif new_report.category in ['sewage', 'drainage', 'waterlogging']:
-            new_report.department = 'Water'
-        elif new_report.category == 'streetlight':
-             new_report.department = 'Electrical'
+        new_report.department = detection_department(new_report.category)
         
         # Add initial log
         initial_log = ReportLog(
@@ -569,47 +753,43 @@ class SeedReports(Resource):
         
         data = request.json or {}
         city = data.get('city', 'delhi')
-        count = min(int(data.get('count', 10)), 50)  # Max 50 at a time
-        
-        # City bounds
-        city_bounds = {
-            'delhi': {'lat': (28.5, 28.75), 'lng': (77.1, 77.3)},
-            'gwalior': {'lat': (26.15, 26.3), 'lng': (78.1, 78.25)},
-            'canberra': {'lat': (-35.4, -35.2), 'lng': (149.0, 149.2)}
-        }
+        # Unauthenticated: larger seeds go through /auth/admin/seed-reports
+        count = min(int(data.get('count', 10)), PUBLIC_SEED_MAX_ROWS)
         
-        bounds = city_bounds.get(city, city_bounds['delhi'])
+        bounds = CITY_REGISTRY.get(city, CITY_REGISTRY['delhi'])['bounds']
         
         categories = ['pothole', 'garbage', 'sewage', 'streetlight', 'traffic_signal', 
                       'waterlogging', 'construction_waste', 'encroachment', 'pollution']
         severities = ['low', 'medium', 'high']
         statuses = ['open', 'assigned', 'in_progress', 'resolved']
         
+        reporter = db.session.execute(db.select(User.id).limit(1)).scalar()  # Use real user ID
         created = []
+        specs = []
         for i in range(count):
             category = random.choice(categories)
-            department = DEPT_MAPPING.get(category, 'General')
-            
-            report = Report(
-                category=category,
-                department=department,
-                description=f"Auto-generated {category.replace('_', ' ')} report in {city.title()}",
-                severity=random.choice(severities),
-                status=random.choice(statuses),
-                latitude=random.uniform(bounds['lat'][0], bounds['lat'][1]),
-                longitude=random.uniform(bounds['lng'][0], bounds['lng'][1]),
-                user_id=User.query.first().id if User.query.first() else None  # Use real user ID
-            )
-            db.session.add(report)
+            specs.append({
+                'category': category,
+                'department': DEPT_MAPPING.get(category, 'General'),
+                'description': f"Auto-generated {category.replace('_', ' ')} report in {city.title()}",
+                'severity': random.choice(severities),
+                'status': random.choice(statuses),
+                'latitude': random.uniform(bounds['lat'][0], bounds['lat'][1]),
+                'longitude': random.uniform(bounds['lng'][0], bounds['lng'][1]),
+                'user_id': reporter
+            })
             created.append(category)
         
+        reports, _ = report_rows(specs)
+        bulk_insert(Report, reports)
         db.session.commit()
         
         return {
             'success': True,
             'message': f'Created {count} reports in {city.title()}',
             'count': count,
-            'categories': created
+            'categories': created[:50],
+            'category_counts': {c: created.count(c) for c in categories if c in created}
         }, 201
 
 @reports_ns.route('')
@@ -661,14 +841,11 @@ class MyReports(Resource):
 class ReportStatus(Resource):
     @reports_ns.doc(security='apikey')
     @jwt_required()
+    @role_required('field_officer', 'dept_head', 'gov_admin')
     def put(self, report_id):
         """Update report status"""
         current_user_id = get_jwt_identity()
-        claims = get_jwt()
-        role = claims.get('role')
-        
-        if role not in ['field_officer', 'dept_head', 'gov_admin']:
-             return {"message": "Unauthorized"}, 403
+        role = get_jwt().get('role')
              
         data = request.json
         new_status = data.get('status')
@@ -683,7 +860,7 @@ class ReportStatus(Resource):
 class ReportAssign(Resource):
     @reports_ns.doc(security='apikey')
     @jwt_required()
-    @role_required('dept_head')
+    @role_required('dept_head', department_scoped=True)
     def put(self, report_id):
         """Assign report to field officer"""
         data = request.json
@@ -692,6 +869,8 @@ class ReportAssign(Resource):
         report = Report.query.filter_by(id=report_id).first()
         if not report:
             return {"message": "Report not found"}, 404
+        if not in_department_scope(report.department):
+            return {"message": "Report belongs to another department"}, 403
             
         report.assigned_to = officer_id
         report.status = 'assigned'
@@ -749,6 +928,16 @@ class Signup(Resource):
 
         return {'message': 'User created successfully', 'success': True}, 201
 
+# Sliding-window throttle of failed logins by IP and email; blocks are checked before any DB lookup or bcrypt call
+login_throttle = LoginThrottle()
+TRUST_PROXY_HEADERS = os.getenv('TRUST_PROXY_HEADERS', 'false').lower() in ('1', 'true', 'yes')
+
+def client_ip():
+    """Client address; X-Forwarded-For is only honoured behind a trusted proxy"""
+    if TRUST_PROXY_HEADERS and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr
+
 @auth_ns.route('/login')
 class Login(Resource):
     @auth_ns.expect(auth_login_model)
@@ -758,10 +947,27 @@ class Login(Resource):
         email = data.get('email')
         password = data.get('password')
         
+        ip = client_ip()
+        retry_after = login_throttle.acquire(ip, email)
+        if retry_after:
+            return {'message': 'Too many login attempts. Try again later.', 'retry_after': retry_after}, 429, \
+                {'Retry-After': str(retry_after)}
+        
         user = User.query.filter_by(email=email).first()
         
         if not user or not auth_utils.check_password(password, user.password_hash):
+            login_throttle.failed(ip, email)
             return {'message': 'Invalid credentials'}, 401
+        login_throttle.succeeded(ip, email)
+        
+        # Upgrade hashes made with an older BCRYPT_ROUNDS while we have the plaintext
+        if auth_utils.password_needs_rehash(user.password_hash):
+            try:
+                user.password_hash = auth_utils.hash_password(password)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Password rehash failed for {user.id}: {e}")
             
         # Generate token with role claim
         additional_claims = {"role": user.role}
@@ -782,17 +988,18 @@ class Me(Resource):
     def get(self):
         """Get current user details"""
         current_user_id = get_jwt_identity()
-        claims = get_jwt()
         
-        user = User.query.filter_by(id=current_user_id).first()
+        user = cached_user(current_user_id)
         
         if not user:
             return {'message': 'User not found'}, 404
             
-        return user.to_dict(), 200
+        return user, 200
 
 # Google OAuth Configuration
 GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
+# Built once: signing certs are cached per Cache-Control and verified tokens memoized until exp
+google_verifier = GoogleTokenVerifier(GOOGLE_CLIENT_ID)
 
 google_oauth_model = api.model('GoogleOAuth', {
     'credential': fields.String(required=True, description='Google OAuth credential token')
@@ -804,9 +1011,6 @@ class GoogleOAuth(Resource):
     def post(self):
         """Login/Signup with Google OAuth"""
         try:
-            from google.oauth2 import id_token
-            from google.auth.transport import requests as google_requests
-            
             data = request.json
             credential = data.get('credential')
             
@@ -815,11 +1019,7 @@ class GoogleOAuth(Resource):
             
             # Verify the Google token
             try:
-                idinfo = id_token.verify_oauth2_token(
-                    credential, 
-                    google_requests.Request(), 
-                    GOOGLE_CLIENT_ID
-                )
+                idinfo = google_verifier.verify(credential)
             except ValueError as e:
                 return {'message': f'Invalid Google token: {str(e)}'}, 401
             
@@ -850,6 +1050,7 @@ class GoogleOAuth(Resource):
                 if user.name == 'Google User' or not user.name:
                     user.name = google_name
                     db.session.commit()
+                    user_cache.invalidate(user.id)
             
             # Generate JWT token
             additional_claims = {"role": user.role}
@@ -886,6 +1087,29 @@ admin_update_user_model = api.model('AdminUpdateUser', {
     'secret_key': fields.String(required=True, description='Secret admin key')
 })
 
+def page_response(key, page):
+    """{'success', <key>: items, 'limit', 'next_cursor', 'has_more'[, 'total']} for a paginate() result"""
+    items = page.pop('items')
+    return {'success': True, key: items, **page}, 200
+
+def candidate_page():
+    return paginate(Candidate.query, Candidate, request.args,
+                    sort_keys={'created_at': Candidate.created_at, 'name': Candidate.name},
+                    default_sort='-created_at',
+                    filters={'status': Candidate.status, 'position': Candidate.position})
+
+def user_bookings_page(user_id):
+    return paginate(Booking.query.filter_by(user_id=user_id), Booking, request.args,
+                    sort_keys={'created_at': Booking.created_at, 'amount': Booking.amount},
+                    default_sort='-created_at',
+                    filters={'status': Booking.status, 'service_type': Booking.service_type})
+
+def user_ngo_requests_page(user_id):
+    return paginate(NGORequest.query.filter_by(user_id=user_id), NGORequest, request.args,
+                    sort_keys={'created_at': NGORequest.created_at},
+                    default_sort='-created_at',
+                    filters={'status': NGORequest.status, 'category': NGORequest.category})
+
 def verify_admin_key(data):
     """Verify the secret admin key"""
     SECRET_ADMIN_KEY = os.getenv('SECRET_ADMIN_KEY', 'urbaneye-secret-2024')
@@ -899,43 +1123,76 @@ class AdminUsers(Resource):
         if not verify_admin_key(data):
             return {'message': 'Invalid secret key'}, 403
         
-        users = User.query.order_by(User.created_at.desc()).all()
-        return {
-            'success': True,
-            'users': [u.to_dict() for u in users],
-            'total': len(users)
-        }, 200
+        page = paginate(User.query, User, request.args,
+                        sort_keys={'created_at': User.created_at, 'email': User.email, 'name': User.name},
+                        default_sort='-created_at',
+                        filters={'role': User.role, 'department': User.department},
+                        count_by_default=True)
+        return page_response('users', page)
+
+ADMIN_STATS_CACHE_SECONDS = int(os.getenv('ADMIN_STATS_CACHE_SECONDS', 30))
+ADMIN_STATS_ROLES = ['civilian', 'social_worker', 'gig_worker', 'gov_admin', 'dept_head', 'field_officer', 'super_admin']
+ADMIN_STATS_DEPARTMENTS = ['Roads', 'Waste', 'Water', 'Electrical', 'General']
+
+admin_stats_cache = TTLCache(ttl=ADMIN_STATS_CACHE_SECONDS, stale=0)
+
+def compute_admin_stats():
+    """All dashboard counts in one round trip: a UNION ALL of grouped counts"""
+    week_ago = int(time.time()) - (7 * 24 * 60 * 60)
+
+    def grouped(metric, column):
+        return db.select(literal(metric).label('metric'), column.label('bucket'), func.count().label('n')).group_by(column)
+
+    query = union_all(
+        grouped('users.role', User.role),
+        grouped('users.department', User.department),
+        db.select(literal('users.recent'), literal('all'), func.count()).where(User.created_at >= week_ago),
+        grouped('reports.status', Report.status),
+        grouped('reports.department', Report.department),
+        grouped('bookings.status', Booking.status),
+        grouped('ngo_requests.status', NGORequest.status)
+    )
+    counts = {}
+    for metric, bucket, n in db.session.execute(query):
+        counts.setdefault(metric, {})[bucket] = n
+
+    def distribution(metric, keys=()):
+        values = dict.fromkeys(keys, 0)
+        values.update({k: v for k, v in counts.get(metric, {}).items() if k is not None})
+        return values
+
+    return {
+        'total_users': sum(counts.get('users.role', {}).values()),
+        'role_distribution': distribution('users.role', ADMIN_STATS_ROLES),
+        'department_distribution': distribution('users.department', ADMIN_STATS_DEPARTMENTS),
+        'new_users_this_week': counts.get('users.recent', {}).get('all', 0),
+        'reports': {
+            'total': sum(counts.get('reports.status', {}).values()),
+            'by_status': distribution('reports.status'),
+            'by_department': distribution('reports.department')
+        },
+        'bookings': {
+            'total': sum(counts.get('bookings.status', {}).values()),
+            'by_status': distribution('bookings.status')
+        },
+        'ngo_requests': {
+            'total': sum(counts.get('ngo_requests.status', {}).values()),
+            'by_status': distribution('ngo_requests.status')
+        },
+        'generated_at': int(time.time())
+    }
 
 @auth_ns.route('/admin/stats')
 class AdminStats(Resource):
     def post(self):
-        """Get user statistics (requires secret key in body)"""
+        """Get user, report, booking and NGO statistics (requires secret key in body)"""
         data = request.json or {}
         if not verify_admin_key(data):
             return {'message': 'Invalid secret key'}, 403
         
-        total_users = User.query.count()
-        role_counts = {}
-        for role in ['civilian', 'social_worker', 'gig_worker', 'gov_admin', 'dept_head', 'field_officer', 'super_admin']:
-            role_counts[role] = User.query.filter_by(role=role).count()
-        
-        # Recent users (last 7 days)
-        week_ago = int(time.time()) - (7 * 24 * 60 * 60)
-        recent_users = User.query.filter(User.created_at >= week_ago).count()
-        
-        # Department distribution
-        dept_counts = {}
-        for dept in ['Roads', 'Waste', 'Water', 'Electrical', 'General']:
-            dept_counts[dept] = User.query.filter_by(department=dept).count()
-        
         return {
             'success': True,
-            'stats': {
-                'total_users': total_users,
-                'role_distribution': role_counts,
-                'department_distribution': dept_counts,
-                'new_users_this_week': recent_users
-            }
+            'stats': admin_stats_cache.get('all', compute_admin_stats)
         }, 200
 
 @auth_ns.route('/admin/create-user')
@@ -982,6 +1239,66 @@ class AdminCreateUser(Resource):
             'user': new_user.to_dict()
         }, 201
 
+def import_request_payload():
+    """
+    Rows and options for a bulk user import: a JSON body with `users` (list of objects)
+    or `csv` (text), or a multipart upload with a `file` field (CSV or JSON list).
+    Returns (rows, options); rows is None if no rows were supplied.
+    """
+    if request.files.get('file'):
+        options = request.form.to_dict()
+        text = request.files['file'].read().decode('utf-8-sig')
+        if text.lstrip().startswith('['):
+            return json.loads(text), options
+        return parse_csv(text), options
+    options = request.json or {}
+    if isinstance(options.get('users'), list):
+        return options['users'], options
+    if options.get('csv'):
+        return parse_csv(options['csv']), options
+    return None, options
+
+def run_user_import(rows, options, status_endpoint, **kwargs):
+    """
+    Shared response handling for the bulk import endpoints. A dry run (no hashing)
+    answers inline; a real import is hashed and inserted in the background and
+    answers 202 with the job to poll at `status_endpoint`.
+    """
+    if rows is None:
+        return {'message': 'Provide `users` (JSON list), `csv` (text) or a `file` upload'}, 400
+    dry_run = str(options.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    try:
+        if dry_run:
+            return {'success': True, **import_users(rows, dry_run=True, **kwargs)}, 200
+        job = start_import_job(app, rows, **kwargs)
+    except ValueError as e:
+        return {'message': str(e)}, 400
+    status_url = api.url_for(status_endpoint, job_id=job.id)
+    return {'success': True, 'job': job.to_dict(), 'status_url': status_url}, 202, {'Location': status_url}
+
+def import_job_response(job_id):
+    job = db.session.get(UserImportJob, job_id)
+    if not job:
+        return {'message': 'Import job not found'}, 404
+    return {'success': True, 'job': job.to_dict()}, 200
+
+@auth_ns.route('/admin/users/import')
+class AdminImportUsers(Resource):
+    def post(self):
+        """Bulk-create users from JSON or CSV (requires secret key)"""
+        rows, options = import_request_payload()
+        if not verify_admin_key(options):
+            return {'message': 'Invalid secret key'}, 403
+        return run_user_import(rows, options, AdminImportJob)
+
+@auth_ns.route('/admin/users/import/<string:job_id>')
+class AdminImportJob(Resource):
+    def post(self, job_id):
+        """Status and, once done, per-row results of a bulk user import (requires secret key in body)"""
+        if not verify_admin_key(request.json or {}):
+            return {'message': 'Invalid secret key'}, 403
+        return import_job_response(job_id)
+
 @auth_ns.route('/admin/user/<string:user_id>')
 class AdminUserDetail(Resource):
     @auth_ns.expect(admin_update_user_model)
@@ -1010,6 +1327,7 @@ class AdminUserDetail(Resource):
             user.password_hash = auth_utils.hash_password(data['password'])
         
         db.session.commit()
+        user_cache.invalidate(user_id)
         
         return {
             'success': True,
@@ -1036,6 +1354,7 @@ class AdminUserDetail(Resource):
         
         db.session.delete(user)
         db.session.commit()
+        user_cache.invalidate(user_id)
         
         return {
             'success': True,
@@ -1055,7 +1374,7 @@ class AdminSeedReports(Resource):
             return {'message': 'Invalid secret key'}, 403
         
         city = data.get('city', 'delhi')
-        count = min(data.get('count', 10), 50)  # Max 50 at a time
+        count = min(int(data.get('count', 10)), SEED_MAX_ROWS)
         
         # City coordinates
         city_coords = {
@@ -1114,7 +1433,8 @@ class AdminSeedReports(Resource):
         severities = ['low', 'medium', 'high']
         statuses = ['open', 'assigned', 'in_progress']
         
-        created_reports = []
+        specs = []
+        now = int(time.time())
         
         for _ in range(count):
             issue = random.choice(issues)
@@ -1123,38 +1443,31 @@ class AdminSeedReports(Resource):
             lat = coords['center'][0] + random.uniform(-coords['range'], coords['range'])
             lng = coords['center'][1] + random.uniform(-coords['range'], coords['range'])
             
-            new_report = Report(
-                category=issue['category'],
-                department=issue['dept'],
-                description=random.choice(issue['descriptions']),
-                severity=random.choice(severities),
-                status=random.choice(statuses),
-                latitude=round(lat, 6),
-                longitude=round(lng, 6),
-                created_at=int(time.time()) - random.randint(0, 604800)  # Within last week
-            )
-            
-            # Add initial log
-            initial_log = ReportLog(
-                status='open',
-                message='Report created via seeder'
-            )
-            new_report.logs.append(initial_log)
-            
-            db.session.add(new_report)
-            created_reports.append({
-                'category': new_report.category,
-                'city': city,
-                'lat': new_report.latitude,
-                'lng': new_report.longitude
+            specs.append({
+                'category': issue['category'],
+                'department': issue['dept'],
+                'description': random.choice(issue['descriptions']),
+                'severity': random.choice(severities),
+                'status': random.choice(statuses),
+                'latitude': round(lat, 6),
+                'longitude': round(lng, 6),
+                'created_at': now - random.randint(0, 604800),  # Within last week
+                'logs': [{'status': 'open', 'message': 'Report created via seeder'}]
             })
         
+        reports, logs = report_rows(specs)
+        bulk_insert(Report, reports)
+        bulk_insert(ReportLog, logs)
         db.session.commit()
         
         return {
             'success': True,
             'message': f'Created {count} reports in {city.title()}',
-            'reports': created_reports
+            # Echo at most 50 rows; large seeds would otherwise return megabytes
+            'reports': [
+                {'category': r['category'], 'city': city, 'lat': r['latitude'], 'lng': r['longitude']}
+                for r in reports[:50]
+            ]
         }, 201
 
 # Detection Endpoints
@@ -1222,29 +1535,15 @@ class CivicIssueDetection(Resource):
             result = process_image_with_gemini(image_data)
             logger.info(f"Gemini analysis result: {result}")
             
-            # Auto-save valid reports to system
+            # Auto-save valid reports to system (one transaction for all issues)
             saved_reports = []
             if result.get('issues_found', False):
-                args = upload_parser.parse_args()
-                
-                # Check for logged-in user (optional)
-                current_user_id = None
-                try:
-                    verify_jwt_in_request(optional=True)
-                    current_user_id = get_jwt_identity()
-                except:
-                    pass
-
-                for issue in result.get('issues', []):
-                    report_data = {
-                        "category": issue.get('category'),
-                        "description": issue.get('description'),
-                        "severity": issue.get('severity'),
-                        "latitude": args.get('latitude'),
-                        "longitude": args.get('longitude')
-                    }
-                    new_report = create_report(report_data, user_id=current_user_id)
-                    saved_reports.append(new_report)
+                saved_reports = create_reports_from_detection(
+                    result.get('issues', []),
+                    latitude=args.get('latitude'),
+                    longitude=args.get('longitude'),
+                    user_id=get_jwt_identity()
+                )
 
             # Format response for Flutter app
             if result.get('issues_found', False):
@@ -1274,6 +1573,14 @@ class CivicIssueDetection(Resource):
             logger.info(f"Sending response: {response_data}")
             return response_data, 200
             
+        except CircuitOpenError as e:
+            logger.warning(f"Detection rejected: {e}")
+            return {
+                "success": False,
+                "error": "Service unavailable",
+                "message": "AI service temporarily unavailable. Please try again shortly.",
+                "timestamp": int(time.time())
+            }, 503, {'Retry-After': str(e.retry_after)}
         except Exception as e:
             logger.error(f"Error in analyze_civic_issue: {str(e)}", exc_info=True)
             # Check if it's a quota error
@@ -1374,15 +1681,49 @@ class JobResource(Resource):
         if not worker:
              return {'message': 'Only registered workers can view jobs'}, 403
              
-        # Find open jobs matching worker's skills/type
-        # For simplicity, show all 'posted' jobs for now
-        jobs = Job.query.filter_by(status='posted').all()
-        return {'success': True, 'jobs': [j.to_dict() for j in jobs]}, 200
+        # Posted jobs ranked by distance, skill overlap and service type, with report summaries
+        return page_response('jobs', match_jobs(worker, request.args))
 
     @gig_ns.doc(security='apikey')
     @jwt_required()
     def post(self):
-        pass
+        """
+        Post a job for a report; its required skills are indexed for matching.
+        Gov admins and department heads (within their department) may post any type;
+        the citizen who filed the report may hire a gig or private worker for it.
+        """
+        data = request.json or {}
+        report_id = data.get('report_id')
+        service_type = data.get('service_type', 'gig') # gig, municipal, ngo, private
+        if service_type not in ('gig', 'municipal', 'ngo', 'private'):
+            return {'message': f'Unknown service_type: {service_type}'}, 400
+        
+        report = Report.query.filter_by(id=report_id).first()
+        if not report:
+            return {'message': 'Report not found'}, 404
+        staff_ok = get_jwt().get('role') in ('gov_admin', 'dept_head') and in_department_scope(report.department)
+        owner_ok = report.user_id == get_jwt_identity() and service_type in ('gig', 'private')
+        if not (staff_ok or owner_ok):
+            return {'message': 'Access forbidden: only gov staff of this department, or the reporter '
+                               'hiring a gig or private worker, can post a job for this report'}, 403
+            
+        if Job.query.filter_by(report_id=report_id).first():
+            return {'message': 'Job already exists for this report'}, 400
+            
+        new_job = Job(
+            id=str(uuid.uuid4()),
+            report_id=report_id,
+            service_type=service_type,
+            status='posted',
+            quoted_price=300.0 if service_type == 'gig' else 0.0 # Example pricing
+        )
+        
+        db.session.add(new_job)
+        db.session.flush()  # job row first: job_skills references it
+        bulk_insert(JobSkill, job_skill_rows(new_job.id, report.category, data.get('skills')))
+        db.session.commit()
+        
+        return {'success': True, 'message': 'Job posted successfully', 'job': new_job.to_dict()}, 201
 
 
 # =====================
@@ -1396,10 +1737,8 @@ class HRCandidates(Resource):
     @role_required('gov_admin')
     def get(self):
         """Get all recruitment candidates"""
-        candidates = Candidate.query.all()
-        
         # Auto-Seed if empty
-        if not candidates:
+        if Candidate.query.first() is None:
             seeds = [
                 Candidate(name="Suresh Kumar", email="suresh@example.com", position="Field Officer", experience="2 Yrs", status="Interview"),
                 Candidate(name="Anita Desai", email="anita@example.com", position="Data Analyst", experience="4 Yrs", status="Shortlisted"),
@@ -1408,9 +1747,8 @@ class HRCandidates(Resource):
             ]
             db.session.add_all(seeds)
             db.session.commit()
-            candidates = seeds
             
-        return {'success': True, 'candidates': [c.to_dict() for c in candidates]}, 200
+        return page_response('candidates', candidate_page())
 
 @hr_ns.route('/attendance')
 class HRAttendance(Resource):
@@ -1418,36 +1756,42 @@ class HRAttendance(Resource):
     @jwt_required()
     @role_required('gov_admin')
     def get(self):
-        """Get today's attendance"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        attendance = Attendance.query.filter_by(date=today).all()
-        
-        if not attendance:
-            # Auto-seed based on current staff
-            staff = User.query.filter(User.role.in_(['dept_head', 'field_officer'])).all()
-            seeds = []
-            import random
-            for s in staff:
-                status = random.choice(['present', 'present', 'present', 'late', 'absent'])
-                check_in = f"{random.randint(8, 10)}:{random.randint(10, 59)} AM" if status != 'absent' else None
-                seeds.append(Attendance(user_id=s.id, date=today, check_in=check_in, status=status))
-            
-            if seeds:
-                db.session.add_all(seeds)
-                db.session.commit()
-                attendance = seeds
-        
-        # Join with User name for display
-        results = []
-        for a in attendance:
-            u = User.query.get(a.user_id)
-            if u:
-                d = a.to_dict()
-                d['name'] = u.name
-                d['role'] = u.role
-                results.append(d)
-                
-        return {'success': True, 'attendance': results}, 200
+        """Get attendance for today, ?date= or ?from=&to= (optional ?department=)"""
+        start, end = date_range(request.args)
+        page = attendance_page(start, end, request.args, department=request.args.get('department'))
+        body, status = page_response('attendance', page)
+        return {**body, 'from': start.isoformat(), 'to': end.isoformat()}, status
+
+@hr_ns.route('/attendance/summary')
+class HRAttendanceSummary(Resource):
+    @hr_ns.doc(security='apikey')
+    @jwt_required()
+    @role_required('gov_admin')
+    def get(self):
+        """Per-employee present/late/absent/half-day counts for ?month=YYYY-MM (default current month)"""
+        month = request.args.get('month') or datetime.now().strftime('%Y-%m')
+        start, end = month_range(month)
+        summary = attendance_summary(start, end, department=request.args.get('department'))
+        return {'success': True, 'month': month, 'summary': summary}, 200
+
+@hr_ns.route('/attendance/shift')
+class HRShiftCheckIn(Resource):
+    @hr_ns.doc(security='apikey')
+    @jwt_required()
+    @role_required('gov_admin', 'dept_head', department_scoped=True)
+    def post(self):
+        """Check in a whole shift in one statement: {user_ids, check_in?, status?, date?, department?}"""
+        data = request.json or {}
+        user_ids = data.get('user_ids')
+        if not isinstance(user_ids, list):
+            return {'success': False, 'message': 'user_ids must be a list'}, 400
+        now = datetime.now()
+        day = date_range({'date': data['date']})[0] if data.get('date') else now.date()
+        check_in = parse_clock(data['check_in']) if data.get('check_in') else now.time().replace(second=0, microsecond=0)
+        # Department heads can only check in their own department's staff
+        department = department_scope() or data.get('department')
+        result = check_in_shift(user_ids, day, check_in, status=data.get('status', 'present'), department=department)
+        return {'success': True, 'date': day.isoformat(), **result}, 200
 
 @hr_ns.route('/payroll')
 class HRPayroll(Resource):
@@ -1455,68 +1799,58 @@ class HRPayroll(Resource):
     @jwt_required()
     @role_required('gov_admin')
     def get(self):
-        """Get current month payroll"""
-        month = datetime.now().strftime('%B %Y')
-        payroll = Payroll.query.filter_by(month=month).all()
-        
-        if not payroll:
-             # Auto-seed
-            staff = User.query.filter(User.role.in_(['dept_head', 'field_officer'])).all()
-            seeds = []
-            import random
-            for s in staff:
-                base = 85000 if s.role == 'dept_head' else 45000
-                seeds.append(Payroll(
-                    user_id=s.id, 
-                    month=month, 
-                    year=datetime.now().year,
-                    base_salary=base, 
-                    net_salary=base, # Simplified
-                    status=random.choice(['paid', 'pending'])
-                ))
-            if seeds:
-                db.session.add_all(seeds)
-                db.session.commit()
-                payroll = seeds
-
-        results = []
-        for p in payroll:
-            u = User.query.get(p.user_id)
-            if u:
-                d = p.to_dict()
-                d['name'] = u.name
-                d['role'] = u.role
-                results.append(d)
-                
-        return {'success': True, 'payroll': results}, 200
+        """Get payroll for the current month or ?month= (optional ?department=)"""
+        month = request.args.get('month') or datetime.now().strftime('%B %Y')
+        payroll = payroll_listing(month, department=request.args.get('department'))
+        return {'success': True, 'month': month, 'payroll': payroll}, 200
+
+@hr_ns.route('/payroll/run')
+class HRPayrollRun(Resource):
+    @hr_ns.doc(security='apikey')
+    @jwt_required()
+    @role_required('gov_admin')
+    def post(self):
+        """Compute and upsert the month's payroll for all staff from salaries and attendance (Gov Admin Only)"""
+        data = request.json or {}
+        month = data.get('month') or datetime.now().strftime('%Y-%m')
+        summary = run_payroll(month, department=data.get('department'), dry_run=bool(data.get('dry_run')))
+        return {'success': True, **summary}, 200
+
+@gov_ns.route('/staff/import')
+class GovStaffImport(Resource):
+    @jwt_required()
+    @role_required('gov_admin')
+    def post(self):
+        """Bulk-create department heads and field officers from JSON or CSV (Gov Admin Only)"""
+        rows, options = import_request_payload()
+        return run_user_import(rows, options, GovStaffImportJob, allowed_roles=['dept_head', 'field_officer'],
+                               default_role=options.get('default_role', 'field_officer'))
+
+@gov_ns.route('/staff/import/<string:job_id>')
+class GovStaffImportJob(Resource):
+    @jwt_required()
+    @role_required('gov_admin')
+    def get(self, job_id):
+        """Status and, once done, per-row results of a staff import (Gov Admin Only)"""
+        return import_job_response(job_id)
 
 @gov_ns.route('/staff')
 class GovStaff(Resource):
     @jwt_required()
+    @role_required('gov_admin')
     def get(self):
-        """Get all department heads and field officers (Gov Admin Only)"""
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.role != 'gov_admin':
-            return {'message': 'Unauthorized. Gov Admin access required.'}, 403
-            
-        staff = User.query.filter(User.role.in_(['dept_head', 'field_officer'])).order_by(User.created_at.desc()).all()
-        return {
-            'success': True,
-            'staff': [u.to_dict() for u in staff],
-            'total': len(staff)
-        }, 200
+        """Get department heads and field officers, paginated (Gov Admin Only)"""
+        page = paginate(User.query.filter(User.role.in_(['dept_head', 'field_officer'])), User, request.args,
+                        sort_keys={'created_at': User.created_at, 'name': User.name, 'email': User.email},
+                        default_sort='-created_at',
+                        filters={'role': User.role, 'department': User.department},
+                        count_by_default=True)
+        return page_response('staff', page)
 
     @jwt_required()
+    @role_required('gov_admin')
     def post(self):
         """Create a new staff member (Gov Admin Only)"""
-        current_user_id = get_jwt_identity()
-        auth_user = User.query.get(current_user_id)
-        
-        if not auth_user or auth_user.role != 'gov_admin':
-            return {'message': 'Unauthorized. Gov Admin access required.'}, 403
-            
         data = request.json or {}
         email = data.get('email')
         password = data.get('password')
@@ -1552,28 +1886,6 @@ class GovStaff(Resource):
         except Exception as e:
             db.session.rollback()
             return {'message': f'Failed to create user: {str(e)}'}, 500
-        data = request.json
-        report_id = data.get('report_id')
-        service_type = data.get('service_type', 'gig') # gig, municipal, ngo
-        
-        report = Report.query.filter_by(id=report_id).first()
-        if not report:
-            return {'message': 'Report not found'}, 404
-            
-        if Job.query.filter_by(report_id=report_id).first():
-            return {'message': 'Job already exists for this report'}, 400
-            
-        new_job = Job(
-            report_id=report_id,
-            service_type=service_type,
-            status='posted',
-            quoted_price=300.0 if service_type == 'gig' else 0.0 # Example pricing
-        )
-        
-        db.session.add(new_job)
-        db.session.commit()
-        
-        return {'success': True, 'message': 'Job posted successfully', 'job': new_job.to_dict()}, 201
 
 @gig_ns.route('/jobs/<string:job_id>/accept')
 class JobAccept(Resource):
@@ -1719,12 +2031,7 @@ class BookingsList(Resource):
     @jwt_required()
     def get(self):
         """Get current user's bookings"""
-        current_user_id = get_jwt_identity()
-        bookings = Booking.query.filter_by(user_id=current_user_id).order_by(Booking.created_at.desc()).all()
-        return {
-            'success': True,
-            'bookings': [b.to_dict() for b in bookings]
-        }, 200
+        return page_response('bookings', user_bookings_page(get_jwt_identity()))
 
 @bookings_ns.route('/<string:booking_id>')
 class BookingDetail(Resource):
@@ -1827,124 +2134,153 @@ class ReportCreate(Resource):
         # Send Email Confirmation
         # Check if user has email (should be available from Authorizer check or DB fetch)
         try:
-             user = User.query.get(current_user_id)
-             if user and user.email:
+             user = cached_user(current_user_id)
+             if user and user['email']:
                  from utils.mail_service import send_report_confirmation
-                 send_report_confirmation(user.email, user.name, new_report.id, new_report.category.capitalize(), f"{new_report.latitude}, {new_report.longitude}")
+                 send_report_confirmation(user['email'], user['name'], new_report.id, new_report.category.capitalize(), f"{new_report.latitude}, {new_report.longitude}")
         except Exception as e:
              logger.error(f"Email sending failed: {e}")
 
         return {'success': True, 'message': 'Ticket created successfully', 'report': new_report.to_dict()}, 201
 
 
-@gov_ns.route('/predictions')
-class GovPredictions(Resource):
-    @gov_ns.doc(security='apikey')
-    @jwt_required()
-    @role_required('gov_admin')
-    def get(self):
-        """Get AI-generated predictive maintenance markers using LangChain, Weather & News"""
-        
-        # 1. Check API Key
-        if not os.getenv("GEMINI_API_KEY"):
-            return {'success': False, 'message': 'Gemini API Key missing.', 'predictions': []}, 200
-
-        try:
-            # --- HELPER: Fetch Weather (Open-Meteo) ---
-            def get_weather_context(lat=28.61, lng=77.20):
-                try:
-                    # Current + Past 14 days
-                    url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lng}&current=temperature_2m,rain,showers,wind_speed_10m&past_days=15&forecast_days=1"
-                    resp = requests.get(url, timeout=5)
-                    data = resp.json()
-                    
-                    current = data.get('current', {})
-                    # Quick summary construction
-                    return f"""
-                    Current Temp: {current.get('temperature_2m')}°C
-                    Current Rain: {current.get('rain')} mm
-                    Current Wind: {current.get('wind_speed_10m')} km/h
-                    (Historical data analyzed: High moisture patterns detected over last 15 days)
-                    """
-                except Exception as e:
-                    logger.error(f"Weather Fetch Error: {e}")
-                    return "Weather Service Unavailable (Simulated: Monsoon Season, High Humidity)"
-
-            # --- HELPER: Fetch News (NewsAPI) ---
-            def get_news_context(city="New Delhi"):
-                try:
-                    import requests
-                    from datetime import datetime, timedelta
-                    
-                    api_key = os.getenv("NEWS_API_KEY")
-                    if not api_key:
-                        return "News API Key missing in environment variables."
-                    
-                    # Construct URL
-                    # STRICT QUERY: Encoded "New Delhi" AND specific infrastructure keywords
-                    # logic: "New Delhi" AND (pothole OR road OR ...)
-                    query_params = '"New Delhi" AND (road OR pothole OR drainage OR waterlogging OR collapse OR traffic OR mcd OR ndmc)'
-                    
-                    # Removed 15-day validation as per user request to broaden the search scope while relying on strict keyword filtering for accuracy
-                    url = f'https://newsapi.org/v2/everything?q={query_params}&sortBy=relevancy&language=en&apiKey={api_key}'
-                    
-                    response = requests.get(url, timeout=10)
-                    data = response.json()
-                    
-                    if data.get("status") != "ok":
-                        logger.error(f"NewsAPI Error: {data.get('message')}")
-                        return f"NewsAPI Error: {data.get('message', 'Unknown error')}"
+# =====================
+# PREDICTION SNAPSHOTS
+# =====================
+# Predictions are generated in the background by the scheduler below and stored in
+# `prediction_snapshots`; GET /gov/predictions serves the latest snapshot.
+
+PREDICTION_REFRESH_SECONDS = int(os.getenv('PREDICTION_REFRESH_SECONDS', 3600))
+# City registry: weather station, news search terms and the bounds that scope report history
+CITY_REGISTRY = {
+    'delhi': {
+        'name': 'New Delhi', 'lat': 28.61, 'lng': 77.20, 'geo_terms': ('delhi', 'ncr'),
+        'bounds': {'lat': (28.5, 28.75), 'lng': (77.1, 77.35)}
+    },
+    'gwalior': {
+        'name': 'Gwalior', 'lat': 26.2183, 'lng': 78.1828, 'geo_terms': ('gwalior',),
+        'bounds': {'lat': (26.15, 26.3), 'lng': (78.1, 78.25)}
+    },
+    'canberra': {
+        'name': 'Canberra', 'lat': -35.2809, 'lng': 149.13, 'geo_terms': ('canberra',),
+        'bounds': {'lat': (-35.4735, -35.15), 'lng': (149.0, 149.2)}
+    }
+}
+PREDICTION_CITIES = list(CITY_REGISTRY)
+PREDICTION_PARALLELISM = int(os.getenv('PREDICTION_PARALLELISM', 4))
+PREDICTION_CACHE_SECONDS = int(os.getenv('PREDICTION_CACHE_SECONDS', 30))
+# Per-city lease while a snapshot is generated; longer than one pipeline run, not the refresh interval
+PREDICTION_RUN_LOCK_SECONDS = int(os.getenv('PREDICTION_RUN_LOCK_SECONDS', 300))
+WEATHER_INGEST_SECONDS = int(os.getenv('WEATHER_INGEST_SECONDS', 3600))
+# 'ai': LangChain/Gemini with the statistical model as fallback; 'statistical': offline model only
+PREDICTION_ENGINE = os.getenv('PREDICTION_ENGINE', 'ai').lower()
+
+risk_model = StatisticalRiskModel()
+
+def city_report_filter(city):
+    """SQL condition selecting reports inside a registry city's bounds"""
+    bounds = CITY_REGISTRY[city]['bounds']
+    return db.and_(Report.latitude.between(*bounds['lat']), Report.longitude.between(*bounds['lng']))
+
+def load_report_history(city):
+    """(lat, lng, created_at, category, severity) for every report inside the city's bounds"""
+    return db.session.execute(
+        db.select(Report.latitude, Report.longitude, Report.created_at, Report.category, Report.severity)
+        .where(city_report_filter(city))
+    ).all()
+
+PREDICTION_PROMPT_TEMPLATE = """
+    You are an expert Urban Infrastructure Analyst.
+    
+    MISSION:
+    Predict future civic infrastructure failures by correlating 3 data sources:
+    1. Historical Incident Patterns (Internal DB)
+    2. Live Weather Conditions (Open-Meteo)
+    3. Recent Local News (Web Search)
+    
+    DATA SOURCES:
+    
+    [A] LIVE WEATHER REPORT:
+    {weather_data}
+    
+    [B] RECENT LOCAL NEWS (Last 15 Days):
+    {news_data}
+    
+    [C] HISTORICAL INCIDENT LOG:
+    {report_data}
+    
+    TASK:
+    Based on the above, predict 3-5 potential future infrastructure failures.
+    Examples:
+    - If heavy rain + history of clogging -> Predict "Drainage Overflow"
+    - If heatwave + old roads -> Predict "Road Surface Crack"
+    - If news mentions "water pipeline burst" -> Predict "Water Supply Disruption" near that area
+    
+    OUTPUT FORMAT:
+    {format_instructions}
+    """
+
+# Parser, prompt and per-key chains are built once per process (see prediction_chain_components)
+_prediction_chain = {}
+_prediction_chain_lock = threading.Lock()
+
+def prediction_chain_components():
+    """(parser, chain_pool) for the LangChain prediction chain, built on first use"""
+    if not _prediction_chain:
+        with _prediction_chain_lock:
+            if not _prediction_chain:
+                # User commanded 2.5 Flash
+                parser = PydanticOutputParser(pydantic_object=PredictionList)
+                prompt = PromptTemplate(
+                    template=PREDICTION_PROMPT_TEMPLATE,
+                    input_variables=["weather_data", "news_data", "report_data"],
+                    partial_variables={"format_instructions": parser.get_format_instructions()}
+                )
+                chain_pool = ChainPool(prompt, lambda api_key: ChatGoogleGenerativeAI(
+                    model="gemini-2.5-flash",
+                    google_api_key=api_key,
+                    temperature=0.3,
+                    timeout=ai_breakers['predictions'].latency_budget,
+                    max_retries=1
+                ))
+                _prediction_chain.update(parser=parser, chain_pool=chain_pool)
+    return _prediction_chain['parser'], _prediction_chain['chain_pool']
 
-                    articles = data.get("articles", [])
-                    news_results = []
-                    
-                    for article in articles:
-                        title = article.get("title", "No Title")
-                        desc = article.get("description") or article.get("content") or ""
-                        
-                        # --- STRICT FILTERING IN PYTHON ---
-                        # 1. Geo-Filter: Must mention Delhi
-                        text_lower = (title + " " + desc).lower()
-                        if "delhi" not in text_lower and "ncr" not in text_lower:
-                            continue
-                            
-                        # 2. Topic-Filter: Must be about infra/civic issues
-                        # Exclude noise topics like UPSC, Exams, Elections, Cricket, Movies, and generic Govt Announcements
-                        noise_words = ["upsc", "exam", "result", "cricket", "movie", "film", "show", "review", 
-                                     "dividend", "profit", "quarter", "stock", "shares",
-                                     "scheme", "policy", "cabinet", "approves", "banknote", "currency", "passport", 
-                                     "launch", "inaugurate", "minister", "modi", "govt", "center", "yojana"] 
-                        if any(nw in text_lower for nw in noise_words):
-                            continue
-                            
-                        # 3. Keyword Confirmation (Double Check)
-                        # Must contain explicit physical infrastructure terms
-                        valid_topics = ["road", "traffic", "water", "drain", "sewer", "collapse", "construction", "mcd", "pothole", "highway", "pollution", "air quality"]
-                        if not any(vt in text_lower for vt in valid_topics):
-                            continue
-                        
-                        # Clean up formatting
-                        desc = desc.replace('\n', ' ')[:200] 
-                        news_results.append(f"- {title}: {desc}...")
-                        
-                        if len(news_results) >= 5: # Limit to top 5 relevant matches
-                            break
-                        
-                    final_text = "\n".join(news_results)
-                    return final_text if final_text else "No specific infrastructure news found for New Delhi."
+class PredictionPipeline:
+    """Weather + news + report history -> LangChain/Gemini predictions, with fallbacks"""
+    
+    def __init__(self, city='delhi'):
+        self.city = city
+        self.engine = None
+        self.inputs = {}
+        self._risk = None
+        self._weather_agg = None
 
-                except Exception as e:
-                    logger.error(f"News Search Error: {e}")
-                    # Fallback simulation ensures AI pipeline continues even if API usage limit is hit
-                    return "News Service Internal Error (Simulating: Reports of waterlogging in low-lying areas, Municipal strike ongoing, Road repair delays in sector 4)"
+    def run(self):
+        """Returns (response_body, status_code); sets self.engine and self.inputs"""
+        
+        # 1. Check API Key (the statistical engine needs neither keys nor network)
+        if PREDICTION_ENGINE == 'statistical' or not os.getenv("GEMINI_API_KEY"):
+            return self._statistical_predictions()
 
+        try:
             # 2. Fetch Context Data
-            weather_ctx = get_weather_context() # Defaulting to Delhi for demo
-            news_ctx = get_news_context()
+            location = CITY_REGISTRY[self.city]
+            weather = self._weather()
+            if weather:
+                # Stored hourly history: no outbound weather call
+                weather_ctx = format_weather_context(weather)
+                news_ctx = news_provider.get(location['name'], location['geo_terms'])
+            else:
+                # Backfill has not run yet: live weather and news (cached, fetched concurrently)
+                weather_ctx, news_ctx = fetch_prediction_context(
+                    lat=location['lat'], lng=location['lng'], city=location['name'], geo_terms=location['geo_terms']
+                )
             
-            # Fetch Historical Reports
+            # Fetch Historical Reports (this city only)
             try:
-                reports = Report.query.order_by(Report.created_at.desc()).limit(40).all()
+                reports = Report.query.filter(city_report_filter(self.city))\
+                    .order_by(Report.created_at.desc()).limit(40).all()
             except:
                 reports = []
             
@@ -1953,6 +2289,19 @@ class GovPredictions(Resource):
                 if r.latitude and r.longitude:
                     report_data_list.append(f"- [{r.category.upper()}] Sev:{r.severity}, Lat:{r.latitude}, Lng:{r.longitude}")
             report_data_str = "\n".join(report_data_list) or "- [None] No recent reports"
+            self.inputs = {'weather': weather_ctx, 'news': news_ctx, 'report_count': len(report_data_list),
+                           'weather_aggregates': weather}
+
+            # Hotspots from the full history, so the LLM is not limited to the latest reports
+            try:
+                hotspots = self._statistical_risk()['predictions']
+            except Exception as e:
+                logger.warning(f"Statistical hotspots unavailable: {e}")
+                hotspots = []
+            if hotspots:
+                report_data_str += "\n\nStatistical hotspots (full history):\n" + "\n".join(
+                    f"- [{p['type'].upper()}] Risk:{p['risk']}, Lat:{p['lat']}, Lng:{p['lng']}" for p in hotspots
+                )
 
             # 3. Setup LangChain Workflow
             # If LangChain is not available, skip directly to legacy predictions
@@ -1961,56 +2310,12 @@ class GovPredictions(Resource):
                 return self._legacy_predictions()
             
             try:
-                # User commanded 2.5 Flash
-                parser = PydanticOutputParser(pydantic_object=PredictionList)
-                
-                template = """
-                You are an expert Urban Infrastructure Analyst.
-                
-                MISSION:
-                Predict future civic infrastructure failures by correlating 3 data sources:
-                1. Historical Incident Patterns (Internal DB)
-                2. Live Weather Conditions (Open-Meteo)
-                3. Recent Local News (Web Search)
-                
-                DATA SOURCES:
-                
-                [A] LIVE WEATHER REPORT:
-                {weather_data}
-                
-                [B] RECENT LOCAL NEWS (Last 15 Days):
-                {news_data}
-                
-                [C] HISTORICAL INCIDENT LOG:
-                {report_data}
-                
-                TASK:
-                Based on the above, predict 3-5 potential future infrastructure failures.
-                Examples:
-                - If heavy rain + history of clogging -> Predict "Drainage Overflow"
-                - If heatwave + old roads -> Predict "Road Surface Crack"
-                - If news mentions "water pipeline burst" -> Predict "Water Supply Disruption" near that area
-                
-                OUTPUT FORMAT:
-                {format_instructions}
-                """
-                
-                prompt = PromptTemplate(
-                    template=template,
-                    input_variables=["weather_data", "news_data", "report_data"],
-                    partial_variables={"format_instructions": parser.get_format_instructions()}
-                )
-                
-                # Define the prediction runner for retry logic
-                def run_prediction_chain():
-                    current_key = GEMINI_KEYS[current_key_index]
-                    llm = ChatGoogleGenerativeAI(
-                        model="gemini-2.5-flash", 
-                        google_api_key=current_key,
-                        temperature=0.3
-                    )
-                    chain = prompt | llm | parser
-                    return chain.invoke({
+                parser, chain_pool = prediction_chain_components()
+
+                # Chains are pre-built per key and reused (see ChainPool)
+                def run_prediction_chain(lease):
+                    # Parsing happens outside the call so token usage is visible on the message
+                    return chain_pool.get(lease.api_key).invoke({
                         "weather_data": weather_ctx,
                         "news_data": news_ctx,
                         "report_data": report_data_str
@@ -2018,10 +2323,18 @@ class GovPredictions(Resource):
 
                 # Execute with robust rotation
                 logger.info("Executing AI Prediction Chain with Robust Rotation...")
-                result = execute_with_retry(run_prediction_chain)
+                message = ai_breakers['predictions'].call(execute_with_retry, run_prediction_chain, caller='predictions_chain')
+                if LOG_AI_RAW_RESPONSES:
+                    logger.info(f"Prediction chain raw response: {message.content}")
+                try:
+                    result = parser.invoke(message)
+                except Exception:
+                    ai_metrics.record_parse_fallback('predictions_chain')
+                    raise
                 
                 predictions_json = [p.dict() for p in result.predictions]
                 
+                self.engine = 'langchain'
                 return {
                     'success': True, 
                     'predictions': predictions_json,
@@ -2030,9 +2343,13 @@ class GovPredictions(Resource):
                         'news_summary': result.news_analysis,
                         'weather_raw': weather_ctx,
                         'news_raw': news_ctx  # Pass raw news articles to frontend
-                    }
+                    },
+                    'risk_grid': self._risk['grid'] if self._risk else []
                 }, 200
 
+            except CircuitOpenError as e:
+                logger.warning(f"Prediction chain skipped: {e}")
+                return self._cached_or_legacy_predictions()
             except Exception as e:
                 logger.error(f"AI Chain Failed: {e}", exc_info=True)
                 # Fallback to legacy prediction when LangChain fails
@@ -2042,18 +2359,68 @@ class GovPredictions(Resource):
             logger.error(f"Prediction Endpoint Error: {str(e)}", exc_info=True)
             return self._legacy_predictions()
 
+    def _cached_or_legacy_predictions(self):
+        """Serve the last successful AI predictions while the circuit is open"""
+        last_good = PredictionSnapshot.query.filter_by(city=self.city, engine='langchain')\
+            .order_by(PredictionSnapshot.created_at.desc()).first()
+        if last_good:
+            self.engine = 'cached'
+            cached = dict(last_good.payload)
+            cached['warning'] = 'AI service degraded, serving cached predictions'
+            cached['cached_at'] = last_good.created_at
+            return cached, 200
+        return self._legacy_predictions()
+
+    def _weather(self):
+        """Stored weather aggregates for the city (None until the backfill job has run)"""
+        if self._weather_agg is None:
+            try:
+                self._weather_agg = weather_aggregates(self.city) or {}
+            except Exception as e:
+                logger.warning(f"Weather aggregates unavailable for {self.city}: {e}")
+                self._weather_agg = {}
+        return self._weather_agg or None
+
+    def _statistical_risk(self):
+        """Run the offline risk model over the full report history (once per pipeline run)"""
+        if self._risk is None:
+            self._risk = risk_model.predict(*arrays_from_rows(load_report_history(self.city)), weather=self._weather())
+        return self._risk
+
+    def _statistical_predictions(self, warning=None):
+        """Offline predictions from the statistical risk model"""
+        try:
+            risk = self._statistical_risk()
+        except Exception as e:
+            logger.error(f"Statistical Prediction Error: {e}", exc_info=True)
+            self.engine = 'unavailable'
+            return {'success': False, 'message': 'Prediction service unavailable', 'predictions': []}, 200
+
+        self.engine = 'statistical'
+        self.inputs.setdefault('report_count', risk['stats']['reports'])
+        self.inputs.setdefault('weather_aggregates', self._weather())
+        body = {
+            'success': True,
+            'predictions': risk['predictions'],
+            'risk_grid': risk['grid'],
+            'engine_stats': risk['stats']
+        }
+        if warning:
+            body['warning'] = warning
+        return body, 200
+
     def _legacy_predictions(self):
         """Legacy fallback: Get AI-generated predictive maintenance markers using Gemini"""
         
         # 1. Check API Key
         if not os.getenv("GEMINI_API_KEY"):
-            # Fallback for demo if no key is present
-            return {'success': False, 'message': 'Gemini API Key missing. Simulation Mode Active', 'predictions': []}, 200
+            return self._statistical_predictions()
 
         try:
-            # 2. Fetch Historical Data (Last 30 Resolved/Active Reports)
+            # 2. Fetch Historical Data (Last 30 Resolved/Active Reports in this city)
             try:
-                reports = Report.query.order_by(Report.created_at.desc()).limit(30).all()
+                reports = Report.query.filter(city_report_filter(self.city))\
+                    .order_by(Report.created_at.desc()).limit(30).all()
             except Exception:
                 reports = []
             
@@ -2098,8 +2465,10 @@ class GovPredictions(Resource):
 
             # 4. Call Gemini API
             # Use gemini-2.0-flash-exp (or gemini-1.5-flash) instead of deprecated gemini-pro
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(prompt)
+            breaker = ai_breakers['predictions']
+            response = breaker.call(execute_with_retry, lambda lease: lease.model_named('gemini-2.5-flash').generate_content(
+                prompt, request_options={'timeout': breaker.latency_budget}
+            ), caller='predictions_legacy')
             
             # 5. Parse Response
             raw_text = response.text.strip()
@@ -2111,17 +2480,145 @@ class GovPredictions(Resource):
             if raw_text.endswith("```"):
                 raw_text = raw_text[:-3]
                 
-            predictions = json.loads(raw_text)
+            try:
+                predictions = json.loads(raw_text)
+            except json.JSONDecodeError:
+                ai_metrics.record_parse_fallback('predictions_legacy')
+                raise
             
+            self.engine = 'legacy'
             return {'success': True, 'predictions': predictions}, 200
 
         except Exception as e:
             logging.error(f"Gemini Prediction Error: {str(e)}")
-            # Fallback to random data if AI fails
-            fallback_predictions = [
-                {'lat': 28.6200, 'lng': 77.2100, 'type': 'Pothole (Fallback)', 'risk': 'High (90%)', 'estimated_cost': 4500, 'reasoning': 'AI Service Unavailable - Offline Prediction'}
-            ]
-            return {'success': True, 'predictions': fallback_predictions, 'warning': 'Used fallback data'}, 200
+            # Offline model over the full report history
+            return self._statistical_predictions(warning='AI service unavailable, using statistical predictions')
+
+def run_prediction_snapshot(city, trigger='schedule'):
+    """Run the prediction pipeline for a city and persist the result"""
+    started = time.time()
+    pipeline = PredictionPipeline(city)
+    payload, _ = pipeline.run()
+    snapshot = PredictionSnapshot(
+        city=city,
+        engine=pipeline.engine or 'fallback',
+        payload=payload,
+        inputs=pipeline.inputs,
+        trigger=trigger,
+        started_at=int(started),
+        duration_ms=int((time.time() - started) * 1000)
+    )
+    db.session.add(snapshot)
+    db.session.commit()
+    prediction_cache.invalidate(city)
+    logger.info(f"Prediction snapshot for {city}: engine={snapshot.engine}, {snapshot.duration_ms}ms ({trigger})")
+    return snapshot
+
+def latest_prediction_snapshot(city):
+    return PredictionSnapshot.query.filter_by(city=city).order_by(PredictionSnapshot.created_at.desc()).first()
+
+# Per-city response cache in front of the snapshot table (other workers' snapshots show up within the TTL)
+prediction_cache = TTLCache(ttl=PREDICTION_CACHE_SECONDS, stale=0)
+
+def snapshot_body(snapshot):
+    if snapshot is None:
+        return None
+    body = dict(snapshot.payload)
+    body['snapshot'] = snapshot.to_dict()
+    return body
+
+def _prediction_job(city, trigger):
+    # Every worker ticks on the same interval; skip cities another worker refreshed recently
+    if trigger == 'schedule':
+        latest = latest_prediction_snapshot(city)
+        if latest and latest.created_at > time.time() - PREDICTION_REFRESH_SECONDS * 0.9:
+            return
+    # A cold start that lost the race to another worker's first snapshot has nothing to do
+    if trigger == 'cold_start' and latest_prediction_snapshot(city) is not None:
+        return
+    run_prediction_snapshot(city, trigger)
+
+# Cities run concurrently on a bounded pool, so adding one does not delay the others.
+# Each city has its own lease: a refresh of one city is not dropped while another is running.
+prediction_scheduler = IntervalScheduler(
+    app, 'prediction_snapshots', _prediction_job,
+    interval=PREDICTION_REFRESH_SECONDS,
+    lock_ttl=PREDICTION_RUN_LOCK_SECONDS,
+    targets=lambda: PREDICTION_CITIES,
+    parallelism=PREDICTION_PARALLELISM,
+    lock_per_target=True
+)
+
+def _weather_job(city, trigger):
+    location = CITY_REGISTRY[city]
+    backfill_weather(city, location['lat'], location['lng'])
+
+weather_scheduler = IntervalScheduler(
+    app, 'weather_backfill', _weather_job,
+    interval=WEATHER_INGEST_SECONDS,
+    targets=lambda: PREDICTION_CITIES,
+    parallelism=PREDICTION_PARALLELISM
+)
+
+@app.before_request
+def start_prediction_scheduler():
+    # Started on the first request so CLI scripts importing app don't spawn it
+    if os.getenv('PREDICTION_SCHEDULER_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+        prediction_scheduler.start()
+    if os.getenv('WEATHER_INGEST_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+        weather_scheduler.start()
+
+@gov_ns.route('/predictions')
+class GovPredictions(Resource):
+    @gov_ns.doc(security='apikey', params={
+        'city': 'City to get predictions for (default: delhi)',
+        'refresh': 'Set to 1 to enqueue a background regeneration'
+    })
+    @jwt_required()
+    @role_required('gov_admin')
+    def get(self):
+        """Get the latest AI-generated predictive maintenance snapshot (LangChain, Weather & News)"""
+        city = request.args.get('city', 'delhi').lower()
+        if city not in PREDICTION_CITIES:
+            return {'success': False, 'message': f'Unknown city. Available: {PREDICTION_CITIES}', 'predictions': []}, 400
+        
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        body = prediction_cache.get(city, lambda: snapshot_body(latest_prediction_snapshot(city)))
+        enqueued = False
+        
+        if body is None:
+            # Nothing generated yet for this city: build the first snapshot inline, under the
+            # city's lease so concurrent first requests do not all call Gemini
+            if prediction_scheduler.run_locked(city, 'cold_start'):
+                body = snapshot_body(latest_prediction_snapshot(city))
+            if body is None:
+                return {
+                    'success': True,
+                    'predictions': [],
+                    'message': 'Predictions for this city are being generated, retry shortly'
+                }, 202, {'Retry-After': '10'}
+        elif refresh:
+            # False when the scheduler is off or another worker is already regenerating this city
+            enqueued = prediction_scheduler.enqueue(city)
+        
+        body = dict(body, snapshot=dict(body['snapshot'], refresh_enqueued=enqueued))
+        return body, 200
+
+@gov_ns.route('/weather')
+class GovWeather(Resource):
+    @gov_ns.doc(security='apikey', params={'city': 'City (default: delhi)'})
+    @jwt_required()
+    @role_required('gov_admin')
+    def get(self):
+        """Rolling weather aggregates (rain 24h/7d, heat days) from the stored hourly history"""
+        city = request.args.get('city', 'delhi').lower()
+        if city not in PREDICTION_CITIES:
+            return {'success': False, 'message': f'Unknown city. Available: {PREDICTION_CITIES}'}, 400
+
+        aggregates = weather_aggregates(city)
+        if aggregates is None:
+            return {'success': False, 'message': 'No weather history stored yet for this city'}, 404
+        return {'success': True, 'city': city, 'weather': aggregates}, 200
 
 
 @ngo_ns.route('/requests')
@@ -2170,12 +2667,7 @@ class NGORequestsList(Resource):
     @jwt_required()
     def get(self):
         """Get current user's NGO requests"""
-        current_user_id = get_jwt_identity()
-        requests = NGORequest.query.filter_by(user_id=current_user_id).order_by(NGORequest.created_at.desc()).all()
-        return {
-            'success': True,
-            'requests': [r.to_dict() for r in requests]
-        }, 200
+        return page_response('requests', user_ngo_requests_page(get_jwt_identity()))
 
 @ngo_ns.route('/requests/<string:request_id>')
 class NGORequestDetail(Resource):
@@ -2323,6 +2815,13 @@ def legacy_report_civic_issue():
         logger.info(f"Sending response: {response_data}")
         return response_data, 200
         
+    except CircuitOpenError as e:
+        logger.warning(f"Detection rejected: {e}")
+        return {
+            "success": False,
+            "error": "Service unavailable",
+            "message": "AI service temporarily unavailable. Please try again shortly."
+        }, 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         logger.error(f"Error in legacy report_civic_issue: {str(e)}", exc_info=True)
         return {
@@ -2337,7 +2836,10 @@ def legacy_test_gemini():
     """Legacy Gemini test endpoint for backward compatibility"""
     try:
         # Test with a simple text prompt
-        response = model.generate_content("Respond with 'Hello from Gemini!' if you are working correctly.")
+        response = execute_with_retry(
+            lambda lease: lease.model.generate_content("Respond with 'Hello from Gemini!' if you are working correctly."),
+            caller='gemini_test'
+        )
         return {
             "status": "success",
             "message": "Gemini API is working",
@@ -2403,6 +2905,21 @@ def not_found(e):
         "message": "The requested endpoint was not found"
     }, 404
 
+@api.errorhandler(PaginationError)
+def pagination_error(e):
+    """Bad limit/sort/cursor on a list endpoint"""
+    return {'success': False, 'message': str(e)}, 400
+
+@api.errorhandler(HRQueryError)
+def hr_query_error(e):
+    """Bad date/month filter on an HR listing"""
+    return {'success': False, 'message': str(e)}, 400
+
+@api.errorhandler(PasswordServiceBusy)
+def password_service_busy(e):
+    """Hashing queue is full (login/signup burst)"""
+    return {'success': False, 'message': 'Server busy, please retry shortly'}, 503, {'Retry-After': '2'}
+
 # Add request logging middleware
 @app.before_request
 def log_request_info():
@@ -2444,7 +2961,7 @@ if __name__ == '__main__':
     
     # Test Gemini connection on startup
     try:
-        test_response = model.generate_content("Test connection")
+        test_response = execute_with_retry(lambda lease: lease.model.generate_content("Test connection"), caller='startup_check')
         print("✅ Gemini API connection successful")
     except Exception as e:
         print(f"❌ Gemini API connection failed: {e}")
@@ -2469,6 +2986,14 @@ class GeneratePRImage(Resource):
         pr_text = data.get('pr_text', '')
         stats = data.get('stats', {})
         
+        # Don't hold the worker (or simulate loading) while the image model is known to be down
+        if ai_breakers['pr_image'].is_open:
+            return {
+                'success': True,
+                'message': 'AI generation unavailable, using placeholder: image service circuit open',
+                'image_url': '/unnamed.jpg' # Generic City
+            }, 200
+        
         logger.info("Generating PR Image...")
         time.sleep(3) # Simulate loading for 3 seconds as requested
         
@@ -2488,13 +3013,16 @@ class GeneratePRImage(Resource):
                 # Attempt to access ImageGenerationModel
                 if hasattr(genai, 'ImageGenerationModel'):
                     imagen_model = genai.ImageGenerationModel("imagen-3.0-generate-001")
-                    images = imagen_model.generate_images(
+                    started = time.monotonic()
+                    images = ai_breakers['pr_image'].call(
+                        imagen_model.generate_images,
                         prompt=prompt,
                         number_of_images=1,
                         aspect_ratio="16:9",
                         safety_filter_level="block_only_high",
                         person_generation="allow_adult"
                     )
+                    ai_metrics.record_call('pr_image', None, OUTCOME_OK, time.monotonic() - started)
                     
                     if images and images[0]:
                         # Convert to base64
@@ -2506,6 +3034,8 @@ class GeneratePRImage(Resource):
                             'message': 'Image generated with Imagen 3'
                         }, 200
             except Exception as e:
+                if not isinstance(e, CircuitOpenError):
+                    ai_metrics.record_call('pr_image', None, outcome_for(e))
                 logger.warning(f"Imagen 3 generation failed or not found: {e}")
                 
             # Fallback: Check if we can use a standard GenerativeModel if the user insisted 
@@ -2530,9 +3060,8 @@ class GeneratePRImage(Resource):
 class HRCandidates(Resource):
     @jwt_required()
     def get(self):
-        """List all candidates"""
-        candidates = Candidate.query.order_by(Candidate.created_at.desc()).all()
-        return {'success': True, 'candidates': [c.to_dict() for c in candidates]}, 200
+        """List candidates, paginated"""
+        return page_response('candidates', candidate_page())
         
     @jwt_required()
     def post(self):
@@ -2552,47 +3081,32 @@ class HRCandidates(Resource):
 @hr_ns.route('/attendance')
 class HRAttendance(Resource):
     @jwt_required()
+    @role_required('gov_admin')
     def get(self):
-        """Get attendance for a specific date (or today)"""
-        date_str = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
-        logs = Attendance.query.filter_by(date=date_str).all()
-        
-        # Join with User to get names
-        results = []
-        for log in logs:
-            user = User.query.get(log.user_id)
-            if user:
-                data = log.to_dict()
-                data['user_name'] = user.name
-                data['user_role'] = user.role
-                results.append(data)
-                
-        return {'success': True, 'date': date_str, 'attendance': results}, 200
+        """Get attendance for a specific date (or today), or a ?from=&to= range, paginated"""
+        start, end = date_range(request.args)
+        page = attendance_page(start, end, request.args, department=request.args.get('department'),
+                               labels=('user_name', 'user_role'))
+        body, status = page_response('attendance', page)
+        return {**body, 'date': start.isoformat(), 'from': start.isoformat(), 'to': end.isoformat()}, status
 
     @jwt_required()
     def post(self):
         """Mark attendance (Check-in/out)"""
-        data = request.json
+        data = request.json or {}
         user_id = data.get('user_id')
         status = data.get('status', 'present')
-        check_in = data.get('check_in') # Optional manual override
-        
-        today = datetime.now().strftime('%Y-%m-%d')
-        log = Attendance.query.filter_by(user_id=user_id, date=today).first()
-        
-        if not log:
-            log = Attendance(
-                user_id=user_id,
-                date=today,
-                check_in=check_in or datetime.now().strftime('%I:%M %p'),
-                status=status
-            )
-            db.session.add(log)
-        else:
-            if data.get('check_out'):
-                log.check_out = datetime.now().strftime('%I:%M %p')
-                
-        db.session.commit()
+        check_in = data.get('check_in') # Optional manual override, HH:MM AM/PM
+        if not user_id:
+            return {'success': False, 'message': 'user_id is required'}, 400
+        
+        # Upsert on (user_id, date): a repeated or concurrent check-in never adds a second row
+        now = datetime.now()
+        clock = now.time().replace(second=0, microsecond=0)
+        log = mark_attendance(user_id, now.date(),
+                              check_in=parse_clock(check_in) if check_in else clock,
+                              status=status,
+                              check_out=clock if data.get('check_out') else None)
         return {'success': True, 'log': log.to_dict()}, 200
 
 @hr_ns.route('/payroll')
@@ -2601,35 +3115,43 @@ class HRPayroll(Resource):
     def get(self):
         """Get payroll status for a month"""
         month = request.args.get('month', 'October 2024')
-        records = Payroll.query.filter_by(month=month).all()
-        
-        results = []
-        for p in records:
-            user = User.query.get(p.user_id)
-            if user:
-                data = p.to_dict()
-                data['user_name'] = user.name
-                data['user_role'] = user.role
-                results.append(data)
-                
-        return {'success': True, 'payroll': results}, 200
+        records = payroll_listing(month, department=request.args.get('department'),
+                                  labels=('user_name', 'user_role'))
+        return {'success': True, 'payroll': records}, 200
 
     @jwt_required()
+    @role_required('gov_admin')
     def post(self):
-        """Generate/Update payroll"""
-        data = request.json
-        # Simplified logic: Create payroll entry
-        new_payroll = Payroll(
-            user_id=data['user_id'],
-            month=data['month'],
-            year=data['year'],
-            base_salary=data['base_salary'],
-            net_salary=data['net_salary'],
-            status=data.get('status', 'pending')
-        )
-        db.session.add(new_payroll)
+        """Generate/Update one employee's payroll for a month (rows already paid are left as they are)"""
+        data = request.json if isinstance(request.json, dict) else {}
+        user_id = data.get('user_id')
+        if not user_id or not isinstance(user_id, str):
+            return {'success': False, 'message': 'user_id is required'}, 400
+        amounts = {}
+        for key in PAY_COLUMNS:
+            value = data.get(key, None if key in ('base_salary', 'net_salary') else 0.0)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return {'success': False, 'message': f'{key} must be a number'}, 400
+            amounts[key] = float(value)
+        status = data.get('status', 'pending')
+        if status not in ('pending', 'paid'):
+            return {'success': False, 'message': 'status must be pending or paid'}, 400
+        year, month = parse_payroll_month(data.get('month'), data.get('year'))
+        if not db.session.get(User, user_id):
+            return {'success': False, 'message': 'User not found'}, 404
+        # Same (user_id, year, month) upsert as the payroll run, so the two never duplicate a month
+        upsert_payroll([{
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'month': month,
+            'year': year,
+            **amounts,
+            'status': status,
+            'payment_date': None
+        }], update_columns=PAY_COLUMNS + ['status'])
         db.session.commit()
-        return {'success': True, 'payroll': new_payroll.to_dict()}, 201
+        payroll = Payroll.query.filter_by(user_id=user_id, year=year, month=month).first()
+        return {'success': True, 'payroll': payroll.to_dict()}, 201
 
 # ============== LEADERBOARD ENDPOINT ==============
 @auth_ns.route('/leaderboard')
@@ -2670,9 +3192,7 @@ class MyBookings(Resource):
     @jwt_required()
     def get(self):
         """Get current user's bookings"""
-        current_user_id = get_jwt_identity()
-        bookings = Booking.query.filter_by(user_id=current_user_id).order_by(Booking.created_at.desc()).all()
-        return {'success': True, 'bookings': [b.to_dict() for b in bookings]}, 200
+        return page_response('bookings', user_bookings_page(get_jwt_identity()))
 
 @bookings_ns.route('')
 class CreateBooking(Resource):
@@ -2704,9 +3224,7 @@ class MyNGORequests(Resource):
     @jwt_required()
     def get(self):
         """Get current user's NGO help requests"""
-        current_user_id = get_jwt_identity()
-        requests = NGORequest.query.filter_by(user_id=current_user_id).order_by(NGORequest.created_at.desc()).all()
-        return {'success': True, 'requests': [r.to_dict() for r in requests]}, 200
+        return page_response('requests', user_ngo_requests_page(get_jwt_identity()))
 
 @ngo_ns.route('/requests')
 class CreateNGORequest(Resource):
@@ -2748,7 +3266,7 @@ class ReportDetail(Resource):
 @auth_ns.route('/admin/seed-all')
 class SeedAll(Resource):
     def post(self):
-        """Seed database with comprehensive Indian data: users, field officers, reports, bookings, NGO requests"""
+        """Seed database with comprehensive Indian data: users, field officers, reports, bookings, NGO requests, attendance"""
         import random
         
         data = request.json or {}
@@ -2777,7 +3295,11 @@ class SeedAll(Resource):
         gwalior_bounds = {'lat': (26.15, 26.3), 'lng': (78.1, 78.25)}
         canberra_bounds = {'lat': (-35.4735, -35.1500), 'lng': (149.0000, 149.2000)}
         
-        created_counts = {'users': 0, 'field_officers': 0, 'dept_heads': 0, 'reports': 0, 'bookings': 0, 'ngo_requests': 0}
+        created_counts = {'users': 0, 'field_officers': 0, 'dept_heads': 0, 'reports': 0, 'bookings': 0, 'ngo_requests': 0, 'attendance': 0}
+        report_count = min(int(data.get('reports', 50)), SEED_MAX_ROWS)
+        booking_count = min(int(data.get('bookings', 10)), SEED_MAX_ROWS)
+        ngo_request_count = min(int(data.get('ngo_requests', 8)), SEED_MAX_ROWS)
+        now = int(time.time())
         
         # Pre-hash passwords to safe time (hashing is slow)
         citizen_pwd = auth_utils.hash_password('citizen123')
@@ -2785,200 +3307,133 @@ class SeedAll(Resource):
         officer_pwd = auth_utils.hash_password('officer123')
         gig_pwd = auth_utils.hash_password('gig123')
 
-        # 1. Create Civilians (10 users)
-        civilian_ids = []
-        new_civilians = []
-        for i in range(10):
-            name = f"{random.choice(first_names)} {random.choice(last_names)}"
-            email = f"citizen{i+1}@urbaneye.in"
-            
-            if not User.query.filter_by(email=email).first():
-                user = User(
-                    email=email,
-                    password_hash=citizen_pwd,
-                    name=name,
-                    role='civilian'
-                )
-                db.session.add(user)
-                new_civilians.append(user)
-                created_counts['users'] += 1
-            else:
-                existing = User.query.filter_by(email=email).first()
-                civilian_ids.append(existing.id)
-        
-        if new_civilians:
-            db.session.flush() # Batch flush
-            for u in new_civilians:
-                civilian_ids.append(u.id)
-        
-        # 2. Create Department Heads (6 - one per dept)
-        dept_head_ids = []
-        new_heads = []
-        for i, dept in enumerate(departments):
-            name = f"{random.choice(first_names)} {random.choice(last_names)}"
-            email = f"depthead.{dept.lower()}@gov.in"
-            
-            if not User.query.filter_by(email=email).first():
-                user = User(
-                    email=email,
-                    password_hash=dept_head_pwd,
-                    name=name,
-                    role='dept_head',
-                    department=dept
-                )
-                db.session.add(user)
-                new_heads.append(user)
-                created_counts['dept_heads'] += 1
-            else:
-                existing = User.query.filter_by(email=email).first()
-                dept_head_ids.append(existing.id)
-        
-        if new_heads:
-            db.session.flush()
-            for u in new_heads:
-                dept_head_ids.append(u.id)
-        
-        # 3. Create Field Officers (12 - 2 per dept)
-        field_officer_ids = []
-        new_officers = []
-        for dept in departments:
-            for j in range(2):
-                name = f"{random.choice(first_names)} {random.choice(last_names)}"
-                email = f"fo.{dept.lower()}{j+1}@gov.in"
-                
-                if not User.query.filter_by(email=email).first():
-                    user = User(
-                        email=email,
-                        password_hash=officer_pwd,
-                        name=name,
-                        role='field_officer',
-                        department=dept
-                    )
-                    db.session.add(user)
-                    new_officers.append(user)
-                    created_counts['field_officers'] += 1
-                else:
-                    existing = User.query.filter_by(email=email).first()
-                    field_officer_ids.append(existing.id)
-        
-        if new_officers:
-            db.session.flush()
-            for u in new_officers:
-                field_officer_ids.append(u.id)
-        
-        # 4. Create Gig Workers (5)
-        gig_worker_ids = []
-        new_gig_workers = []
-        for i in range(5):
-            name = f"{random.choice(first_names)} {random.choice(last_names)}"
-            email = f"gigworker{i+1}@urbaneye.in"
-            
-            if not User.query.filter_by(email=email).first():
-                user = User(
-                    email=email,
-                    password_hash=gig_pwd,
-                    name=name,
-                    role='gig_worker'
-                )
-                db.session.add(user)
-                new_gig_workers.append(user)
-            else:
-                existing = User.query.filter_by(email=email).first()
-                gig_worker_ids.append(existing.id)
-
-        if new_gig_workers:
-            db.session.flush()
-            for u in new_gig_workers:
-                gig_worker_ids.append(u.id)
-        # 5. Create Reports (50 total with mixed statuses and assignments)
-        for i in range(50):
+        def person():
+            return f"{random.choice(first_names)} {random.choice(last_names)}"
+
+        # 1-4. Civilians (10), department heads (one per dept), field officers (2 per dept), gig workers (5)
+        civilians = [{'email': f"citizen{i+1}@urbaneye.in", 'name': person(), 'role': 'civilian',
+                      'password_hash': citizen_pwd} for i in range(10)]
+        dept_heads = [{'email': f"depthead.{dept.lower()}@gov.in", 'name': person(), 'role': 'dept_head',
+                       'department': dept, 'password_hash': dept_head_pwd} for dept in departments]
+        officers = [{'email': f"fo.{dept.lower()}{j+1}@gov.in", 'name': person(), 'role': 'field_officer',
+                     'department': dept, 'password_hash': officer_pwd} for dept in departments for j in range(2)]
+        gig_workers = [{'email': f"gigworker{i+1}@urbaneye.in", 'name': person(), 'role': 'gig_worker',
+                        'password_hash': gig_pwd} for i in range(5)]
+
+        # One IN query for every seeded email, then one executemany per role group
+        user_ids, created_emails = ensure_users(civilians + dept_heads + officers + gig_workers, now=now)
+        civilian_ids = [user_ids[u['email']] for u in civilians]
+        created_counts['users'] = sum(1 for u in civilians if u['email'] in created_emails)
+        created_counts['dept_heads'] = sum(1 for u in dept_heads if u['email'] in created_emails)
+        created_counts['field_officers'] = sum(1 for u in officers if u['email'] in created_emails)
+        
+        # Field officers per department, resolved once instead of per report
+        officers_by_dept = {}
+        for u in officers:
+            officers_by_dept.setdefault(u['department'], []).append(user_ids[u['email']])
+        
+        # 5. Create Reports (mixed statuses and assignments)
+        city_bounds = [CITY_REGISTRY[c]['bounds'] for c in ('delhi', 'gwalior', 'canberra')]
+        landmarks = ['MG Road', 'Connaught Place', 'Lajpat Nagar', 'Karol Bagh', 'Rohini', 'Dwarka', 'Noida Sector', 'Gurgaon Cyber Hub', 'Gwalior Fort', 'Maharaj Bada']
+        specs = []
+        for i in range(report_count):
             category = random.choice(categories)
             department = DEPT_MAPPING.get(category, 'General')
             status = random.choice(statuses)
-            bounds = random.choice([delhi_bounds, gwalior_bounds, canberra_bounds])
+            bounds = random.choice(city_bounds)
             
             # Assign to field officer if status is assigned/in_progress
             assigned_to = None
-            if status in ['assigned', 'in_progress'] and field_officer_ids:
-                # Optimized query to avoid N+1 and Legacy API warning
-                possible_officers = User.query.filter(User.id.in_(field_officer_ids), User.department == department).all()
-                if possible_officers:
-                    assigned_to = random.choice(possible_officers).id
-            
-            report = Report(
-                category=category,
-                department=department,
-                description=f"Reported {category.replace('_', ' ')} issue near {random.choice(['MG Road', 'Connaught Place', 'Lajpat Nagar', 'Karol Bagh', 'Rohini', 'Dwarka', 'Noida Sector', 'Gurgaon Cyber Hub', 'Gwalior Fort', 'Maharaj Bada'])}",
-                severity=random.choice(severities),
-                status=status,
-                latitude=random.uniform(bounds['lat'][0], bounds['lat'][1]),
-                longitude=random.uniform(bounds['lng'][0], bounds['lng'][1]),
-                user_id=random.choice(civilian_ids) if civilian_ids else None,
-                assigned_to=assigned_to
-            )
-            
-            # Add log entry directly to relationship (no flush needed)
-            log = ReportLog(
-                status=status,
-                message=f"Issue reported by citizen"
-            )
-            report.logs.append(log)
+            if status in ['assigned', 'in_progress'] and officers_by_dept.get(department):
+                assigned_to = random.choice(officers_by_dept[department])
             
+            logs = [{'status': status, 'message': "Issue reported by citizen"}]
             if status in ['assigned', 'in_progress', 'resolved']:
-                log2 = ReportLog(
-                    status='assigned',
-                    message=f"Assigned to field officer for resolution"
-                )
-                report.logs.append(log2)
-            
-            db.session.add(report)
-            created_counts['reports'] += 1
-            
-        # Batch flush after all reports created
-        db.session.flush()
+                logs.append({'status': 'assigned', 'message': "Assigned to field officer for resolution"})
+            
+            specs.append({
+                'category': category,
+                'department': department,
+                'description': f"Reported {category.replace('_', ' ')} issue near {random.choice(landmarks)}",
+                'severity': random.choice(severities),
+                'status': status,
+                'latitude': random.uniform(bounds['lat'][0], bounds['lat'][1]),
+                'longitude': random.uniform(bounds['lng'][0], bounds['lng'][1]),
+                'user_id': random.choice(civilian_ids) if civilian_ids else None,
+                'assigned_to': assigned_to,
+                'logs': logs
+            })
         
-        # 6. Create Bookings (10)
-        service_types = ['pothole_repair', 'garbage_collection', 'drain_cleaning', 'street_light_fix', 'general_maintenance']
-        for i in range(10):
-            if civilian_ids:
-                booking = Booking(
-                    user_id=random.choice(civilian_ids),
-                    service_type=random.choice(service_types),
-                    scheduled_at=int(time.time() + random.randint(86400, 2592000)), # Next 1-30 days as timestamp
-                    time_slot=random.choice(['today_morning', 'tomorrow_evening']),
-                    status=random.choice(['confirmed', 'completed']),
-                    amount=random.randint(200, 500),
-                    payment_status='paid',
-                    worker_name=f"Worker {random.randint(1, 5)}",
-                    worker_phone=f"98{random.randint(10000000, 99999999)}",
-                    eta_minutes=30
-                )
-                db.session.add(booking)
-                created_counts['bookings'] += 1
+        reports, logs = report_rows(specs, now=now)
+        created_counts['reports'] = bulk_insert(Report, reports)
+        bulk_insert(ReportLog, logs)
         
-        # 7. Create NGO Requests (8)
+        # 6. Create Bookings
+        service_types = ['pothole_repair', 'garbage_collection', 'drain_cleaning', 'street_light_fix', 'general_maintenance']
+        bookings = []
+        if civilian_ids:
+            for i in range(booking_count):
+                bookings.append({
+                    'id': str(uuid.uuid4()),
+                    'user_id': random.choice(civilian_ids),
+                    'service_type': random.choice(service_types),
+                    'scheduled_at': int(now + random.randint(86400, 2592000)), # Next 1-30 days as timestamp
+                    'time_slot': random.choice(['today_morning', 'tomorrow_evening']),
+                    'status': random.choice(['confirmed', 'completed']),
+                    'amount': random.randint(200, 500),
+                    'payment_status': 'paid',
+                    'worker_name': f"Worker {random.randint(1, 5)}",
+                    'worker_phone': f"98{random.randint(10000000, 99999999)}",
+                    'eta_minutes': 30,
+                    'created_at': now
+                })
+        created_counts['bookings'] = bulk_insert(Booking, bookings)
+        
+        # 7. Create NGO Requests
         ngo_categories = ['food_distribution', 'medical_camp', 'education_support', 'shelter_assistance', 'elderly_care']
         mock_ngos = [
             {'id': 'ngo-1', 'name': 'Green Earth Foundation', 'contact': 'help@greenearth.org'},
             {'id': 'ngo-2', 'name': 'Animal Rescue India', 'contact': 'rescue@ari.org'},
         ]
         
-        for i in range(8):
-            if civilian_ids:
+        ngo_requests = []
+        if civilian_ids:
+            for i in range(ngo_request_count):
                 ngo = random.choice(mock_ngos)
-                ngo_req = NGORequest(
-                    user_id=random.choice(civilian_ids),
-                    category=random.choice(ngo_categories),
-                    description=f"Need assistance for {random.choice(['homeless shelter', 'food distribution', 'medical camp', 'education program', 'elderly care'])} in the area",
-                    scale=random.choice(['low', 'medium', 'high']),
-                    address=f"{random.choice(['Chandni Chowk', 'Paharganj', 'Sadar Bazar', 'Karol Bagh', 'Old Delhi'])}, Delhi",
-                    status=random.choice(['reviewing', 'assigned', 'completed']),
-                    ngo_id=ngo['id'],
-                    ngo_name=ngo['name'],
-                    ngo_contact=ngo['contact']
-                )
-                db.session.add(ngo_req)
-                created_counts['ngo_requests'] += 1
+                ngo_requests.append({
+                    'id': str(uuid.uuid4()),
+                    'user_id': random.choice(civilian_ids),
+                    'category': random.choice(ngo_categories),
+                    'description': f"Need assistance for {random.choice(['homeless shelter', 'food distribution', 'medical camp', 'education program', 'elderly care'])} in the area",
+                    'scale': random.choice(['low', 'medium', 'high']),
+                    'address': f"{random.choice(['Chandni Chowk', 'Paharganj', 'Sadar Bazar', 'Karol Bagh', 'Old Delhi'])}, Delhi",
+                    'status': random.choice(['reviewing', 'assigned', 'completed']),
+                    'ngo_id': ngo['id'],
+                    'ngo_name': ngo['name'],
+                    'ngo_contact': ngo['contact'],
+                    'created_at': now
+                })
+        created_counts['ngo_requests'] = bulk_insert(NGORequest, ngo_requests)
+        
+        # 8. Today's attendance for department staff who have none yet
+        today = datetime.now().date()
+        staff_ids = [user_ids[u['email']] for u in dept_heads + officers]
+        marked = set(db.session.execute(
+            db.select(Attendance.user_id).where(Attendance.date == today, Attendance.user_id.in_(staff_ids))).scalars())
+        attendance = []
+        for staff_id in staff_ids:
+            if staff_id in marked:
+                continue
+            status = random.choice(['present', 'present', 'present', 'late', 'absent'])
+            attendance.append({
+                'id': str(uuid.uuid4()),
+                'user_id': staff_id,
+                'date': today,
+                'check_in': parse_clock(f"{random.randint(8, 10)}:{random.randint(10, 59)} AM") if status != 'absent' else None,
+                'check_out': None,
+                'status': status
+            })
+        created_counts['attendance'] = bulk_insert(Attendance, attendance)
         
         db.session.commit()
         
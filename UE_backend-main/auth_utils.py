@@ -1,13 +1,18 @@
-import bcrypt
 from flask_jwt_extended import create_access_token
 
+from utils.password_service import password_service
+
 def hash_password(password):
-    """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Hash a password using bcrypt (on the hashing process pool)"""
+    return password_service.hash(password)
 
 def check_password(password, hashed_password):
     """Check a password against a hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return password_service.verify(password, hashed_password)
+
+def password_needs_rehash(hashed_password):
+    """True if the hash was made with a different work factor than BCRYPT_ROUNDS"""
+    return password_service.needs_rehash(hashed_password)
 
 def generate_token(user_id, role, additional_claims=None):
     """Generate a JWT token with user role"""
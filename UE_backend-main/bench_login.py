@@ -0,0 +1,83 @@
+"""
+Login latency under concurrent load.
+
+Fires `requests` logins from `concurrency` threads against the app (Flask test
+client, no network) and reports p50/p95/p99. While the burst runs it also
+probes /api/v1/health, to show how much the hashing load slows other requests.
+
+Compare inline hashing with the process pool:
+    PASSWORD_HASH_WORKERS=0 python bench_login.py 200 32
+    PASSWORD_HASH_WORKERS=4 python bench_login.py 200 32
+
+Use a throwaway DATABASE_URL; a bench user is created if missing.
+"""
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app, db, User
+import auth_utils
+from utils.password_service import password_service
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+EMAIL = 'bench-login@urbaneye.local'
+PASSWORD = 'bench-password'
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+def ensure_user():
+    with app.app_context():
+        if not User.query.filter_by(email=EMAIL).first():
+            db.session.add(User(email=EMAIL, name='Bench', role='civilian',
+                                password_hash=auth_utils.hash_password(PASSWORD)))
+            db.session.commit()
+
+
+def login(client):
+    started = time.perf_counter()
+    resp = client.post('/api/v1/auth/login', json={'email': EMAIL, 'password': PASSWORD})
+    return time.perf_counter() - started, resp.status_code
+
+
+if __name__ == '__main__':
+    ensure_user()
+    client = app.test_client()
+    login(client)  # warm up the pool
+
+    probe_latencies = []
+    done = threading.Event()
+
+    def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            client.get('/api/v1/health')
+            probe_latencies.append(time.perf_counter() - started)
+            time.sleep(0.05)
+
+    prober = threading.Thread(target=probe, daemon=True)
+    prober.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = list(pool.map(lambda _: login(client), range(REQUESTS)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    prober.join()
+
+    latencies = [r[0] for r in results]
+    statuses = {}
+    for _, code in results:
+        statuses[code] = statuses.get(code, 0) + 1
+    print(f"{REQUESTS} logins, concurrency {CONCURRENCY}, workers {password_service.workers}, "
+          f"rounds {password_service.rounds}: {REQUESTS / elapsed:.1f} logins/s, statuses {statuses}")
+    print(f"login  p50 {percentile(latencies, 0.5):8.1f} ms  p95 {percentile(latencies, 0.95):8.1f} ms  "
+          f"p99 {percentile(latencies, 0.99):8.1f} ms")
+    if probe_latencies:
+        print(f"health p50 {percentile(probe_latencies, 0.5):8.1f} ms  p99 {percentile(probe_latencies, 0.99):8.1f} ms "
+              f"({len(probe_latencies)} probes during the burst)")
+    password_service.shutdown()
@@ -0,0 +1,60 @@
+"""
+Microbenchmark: per-request overhead of the prediction chain outside the model call.
+
+Compares rebuilding parser + prompt + ChatGoogleGenerativeAI on every request (the
+old GovPredictions path) with the pooled chains from prediction_chain_components().
+Only construction and prompt formatting are timed; no request is sent to Gemini.
+
+Usage: python bench_prediction_chain.py [iterations]
+"""
+import sys
+import time
+
+from app import (ChatGoogleGenerativeAI, PromptTemplate, PydanticOutputParser, PredictionList,
+                 PREDICTION_PROMPT_TEMPLATE, prediction_chain_components)
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+KEYS = ['bench-key-1', 'bench-key-2', 'bench-key-3']
+INPUTS = {
+    'weather_data': 'Current Temp: 31°C\nCurrent Rain: 4.2 mm\nCurrent Wind: 12 km/h',
+    'news_data': '- Waterlogging reported near ITO after heavy rain...',
+    'report_data': '\n'.join(f'- [POTHOLE] Sev:high, Lat:28.61{i}, Lng:77.20{i}' for i in range(40))
+}
+
+
+def per_request(api_key):
+    parser = PydanticOutputParser(pydantic_object=PredictionList)
+    prompt = PromptTemplate(
+        template=PREDICTION_PROMPT_TEMPLATE,
+        input_variables=["weather_data", "news_data", "report_data"],
+        partial_variables={"format_instructions": parser.get_format_instructions()}
+    )
+    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=api_key,
+                                 temperature=0.3, timeout=30, max_retries=1)
+    chain = prompt | llm
+    return chain.first.invoke(INPUTS)
+
+
+def pooled(api_key):
+    _, chain_pool = prediction_chain_components()
+    return chain_pool.get(api_key).first.invoke(INPUTS)
+
+
+def bench(name, fn):
+    fn(KEYS[0])  # warm up imports / first build
+    started = time.perf_counter()
+    for i in range(ITERATIONS):
+        fn(KEYS[i % len(KEYS)])
+    per_call_ms = (time.perf_counter() - started) / ITERATIONS * 1000
+    print(f"{name:<28} {per_call_ms:8.3f} ms/request")
+    return per_call_ms
+
+
+if __name__ == '__main__':
+    if ChatGoogleGenerativeAI is None:
+        print("LangChain is not installed")
+        sys.exit(1)
+    print(f"{ITERATIONS} iterations, {len(KEYS)} keys")
+    rebuilt = bench('rebuild per request', per_request)
+    reused = bench('pooled chains', pooled)
+    print(f"speedup: {rebuilt / reused:.1f}x")
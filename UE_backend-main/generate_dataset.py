@@ -0,0 +1,350 @@
+"""
+Deterministic city-scale synthetic dataset for benchmarking.
+
+Streams correlated data straight into DATABASE_URL in chunks, so memory stays
+flat at millions of rows:
+  - staff: dept heads, field officers (with HR profiles) and civilians per city
+  - reports clustered around power-law weighted hotspots per city, a power-law
+    category mix (each hotspot leans to one category), category-dependent
+    severity, a timeline weighted towards recent days, and an age-dependent
+    status; open -> assigned -> resolved logs with increasing timestamps
+  - reports are assigned to field officers of the same city and department
+  - jobs for assigned/resolved reports (with their job_skills index rows),
+    bookings by civilians, daily attendance for every officer
+
+The same --seed and --now give the same rows (ids included). On PostgreSQL rows
+go in with COPY; elsewhere with chunked executemany.
+
+Usage:
+    python generate_dataset.py --reports 1000000 --seed 42
+    python generate_dataset.py --reports 50000 --civilians 5000 --officers-per-dept 4 --attendance-days 30
+Every generated account uses the password given by --password (default 'bench123').
+"""
+import io
+import csv
+import sys
+import time
+import uuid
+import argparse
+from datetime import datetime, timezone, timedelta, time as dt_time
+
+import numpy as np
+
+from app import app, CITY_REGISTRY, DEPT_MAPPING
+from models import db, User, Report, ReportLog, Job, JobSkill, Booking, EmployeeProfile, Attendance
+from utils.bulk_seed import bulk_insert
+from utils.job_matching import job_skill_rows
+from utils.password_service import password_service
+import auth_utils
+
+DAY = 86400
+
+# Share of generated reports per registry city (others split the remainder evenly)
+CITY_WEIGHTS = {'delhi': 0.6, 'gwalior': 0.25, 'canberra': 0.15}
+# Most to least frequent; frequencies follow 1 / rank^CATEGORY_EXPONENT
+CATEGORIES = ['garbage', 'pothole', 'streetlight', 'drainage', 'waterlogging', 'sewage',
+              'construction_waste', 'traffic_signal', 'sidewalk', 'illegal_dumping', 'infrastructure']
+CATEGORY_EXPONENT = 1.1
+SEVERITIES = ['low', 'medium', 'high', 'critical']
+# Severity mix per category group
+SEVERE_CATEGORIES = {'sewage', 'waterlogging', 'traffic_signal', 'infrastructure'}
+SEVERITY_P = {'severe': [0.10, 0.35, 0.40, 0.15], 'normal': [0.35, 0.45, 0.17, 0.03]}
+DEPARTMENTS = ['Roads', 'Waste', 'Water', 'General']
+HOTSPOTS_PER_CITY = 60
+# Fraction of reports scattered uniformly over the city instead of around a hotspot
+BACKGROUND_SHARE = 0.1
+HOTSPOT_SIGMA_DEG = 0.004
+SERVICE_TYPES = ['express', 'premium']
+
+
+class RowWriter:
+    """Chunked writes: COPY on PostgreSQL, executemany elsewhere"""
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.use_copy = db.engine.dialect.name == 'postgresql'
+        self.counts = {}
+
+    def write(self, model, rows):
+        if not rows:
+            return
+        if self.use_copy:
+            self._copy(model.__table__, rows)
+        else:
+            bulk_insert(model, rows, chunk_size=self.chunk_size)
+        self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+
+    def _copy(self, table, rows):
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(['\\N' if row[c] is None else row[c] for c in columns])
+        buffer.seek(0)
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+        finally:
+            cursor.close()
+
+
+def uuids(rng, n):
+    """n deterministic UUID4 strings drawn from rng"""
+    raw = rng.bytes(16 * n)
+    return [str(uuid.UUID(bytes=raw[i * 16:(i + 1) * 16], version=4)) for i in range(n)]
+
+
+def power_law(n, exponent):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def city_weights(cities):
+    known = sum(CITY_WEIGHTS.get(c, 0) for c in cities)
+    unknown = [c for c in cities if c not in CITY_WEIGHTS]
+    rest = (1.0 - known) / len(unknown) if unknown else 0.0
+    weights = np.array([CITY_WEIGHTS.get(c, rest) for c in cities], dtype=float)
+    return weights / weights.sum()
+
+
+def make_hotspots(rng, bounds):
+    """Hotspot centers, power-law weights and a dominant category per hotspot"""
+    lat = rng.uniform(*bounds['lat'], HOTSPOTS_PER_CITY)
+    lng = rng.uniform(*bounds['lng'], HOTSPOTS_PER_CITY)
+    weights = power_law(HOTSPOTS_PER_CITY, 1.0)[rng.permutation(HOTSPOTS_PER_CITY)]
+    lean = rng.choice(len(CATEGORIES), HOTSPOTS_PER_CITY, p=power_law(len(CATEGORIES), CATEGORY_EXPONENT))
+    return {'lat': lat, 'lng': lng, 'weights': weights, 'lean': lean}
+
+
+def generate_staff(rng, writer, cities, officers_per_dept, civilians, password_hash, now):
+    """Insert staff and civilians; returns ({(city, dept): [officer ids]}, [civilian ids], [officer ids])"""
+    officers_by_city_dept = {}
+    officer_ids = []
+    users, profiles = [], []
+    for city in cities:
+        for dept in DEPARTMENTS:
+            head_id, *ids = uuids(rng, officers_per_dept + 1)
+            users.append({'id': head_id, 'email': f'head.{dept.lower()}.{city}@bench.urbaneye.in',
+                          'name': f'Head {dept} {city.title()}', 'role': 'dept_head', 'department': dept,
+                          'password_hash': password_hash, 'created_at': now - 400 * DAY})
+            for j, officer_id in enumerate(ids):
+                users.append({'id': officer_id, 'email': f'fo.{dept.lower()}{j + 1}.{city}@bench.urbaneye.in',
+                              'name': f'Officer {dept} {j + 1} {city.title()}', 'role': 'field_officer',
+                              'department': dept, 'password_hash': password_hash,
+                              'created_at': now - int(rng.integers(30, 400)) * DAY})
+            officers_by_city_dept[(city, dept)] = ids
+            officer_ids.extend(ids)
+            for staff_id in [head_id] + ids:
+                profiles.append({'id': uuids(rng, 1)[0], 'user_id': staff_id,
+                                 'designation': 'Department Head' if staff_id == head_id else 'Field Officer',
+                                 'joining_date': (datetime.fromtimestamp(now, timezone.utc)
+                                                  - timedelta(days=int(rng.integers(30, 2000)))).strftime('%Y-%m-%d'),
+                                 'basic_salary': float(90000 if staff_id == head_id else rng.integers(25, 45) * 1000),
+                                 'bank_account_no': None, 'ifsc_code': None})
+    writer.write(User, users)
+    writer.write(EmployeeProfile, profiles)
+    db.session.commit()
+
+    civilian_ids = []
+    for start in range(0, civilians, writer.chunk_size):
+        n = min(writer.chunk_size, civilians - start)
+        ids = uuids(rng, n)
+        joined = (now - rng.integers(0, 365 * DAY, n)).tolist()
+        writer.write(User, [{'id': ids[i], 'email': f'citizen{start + i + 1}@bench.urbaneye.in',
+                             'name': f'Citizen {start + i + 1}', 'role': 'civilian', 'department': None,
+                             'password_hash': password_hash, 'created_at': joined[i]} for i in range(n)])
+        db.session.commit()
+        civilian_ids.extend(ids)
+    return officers_by_city_dept, civilian_ids, officer_ids
+
+
+def generate_reports(rng, writer, cities, total, days, officers_by_city_dept, civilian_ids, now):
+    hotspots = {city: make_hotspots(rng, CITY_REGISTRY[city]['bounds']) for city in cities}
+    category_p = power_law(len(CATEGORIES), CATEGORY_EXPONENT)
+    departments = [DEPT_MAPPING.get(c, 'General') for c in CATEGORIES]
+    civilian_ids = np.array(civilian_ids, dtype=object)
+
+    for start in range(0, total, writer.chunk_size):
+        n = min(writer.chunk_size, total - start)
+        city_idx = rng.choice(len(cities), n, p=city_weights(cities))
+        lat = np.empty(n)
+        lng = np.empty(n)
+        category = rng.choice(len(CATEGORIES), n, p=category_p)
+        for c, city in enumerate(cities):
+            mask = city_idx == c
+            m = int(mask.sum())
+            if not m:
+                continue
+            spots = hotspots[city]
+            bounds = CITY_REGISTRY[city]['bounds']
+            spot = rng.choice(HOTSPOTS_PER_CITY, m, p=spots['weights'])
+            city_lat = spots['lat'][spot] + rng.normal(0, HOTSPOT_SIGMA_DEG, m)
+            city_lng = spots['lng'][spot] + rng.normal(0, HOTSPOT_SIGMA_DEG, m)
+            background = rng.random(m) < BACKGROUND_SHARE
+            city_lat[background] = rng.uniform(*bounds['lat'], int(background.sum()))
+            city_lng[background] = rng.uniform(*bounds['lng'], int(background.sum()))
+            lat[mask] = np.clip(city_lat, *bounds['lat'])
+            lng[mask] = np.clip(city_lng, *bounds['lng'])
+            # Half of the hotspot reports take the hotspot's leaning category
+            leans = (rng.random(m) < 0.5) & ~background
+            city_category = category[mask]
+            city_category[leans] = spots['lean'][spot[leans]]
+            category[mask] = city_category
+
+        # Recent days are busier: age = days * u^1.5
+        age = (days * DAY * rng.random(n) ** 1.5).astype(np.int64)
+        created_at = now - age
+        severe = np.isin(category, [CATEGORIES.index(c) for c in SEVERE_CATEGORIES])
+        severity = np.where(severe, rng.choice(4, n, p=SEVERITY_P['severe']), rng.choice(4, n, p=SEVERITY_P['normal']))
+        # Older reports are more likely resolved
+        age_days = age / DAY
+        roll = rng.random(n)
+        resolved = roll < np.clip(age_days / 30, 0, 0.9)
+        in_progress = ~resolved & (roll < np.clip(age_days / 30, 0, 0.9) + 0.15)
+        assigned = ~resolved & ~in_progress & (roll < np.clip(age_days / 30, 0, 0.9) + 0.3)
+        assign_delay = rng.integers(3600, 3 * DAY, n)
+        resolve_delay = rng.integers(DAY, 20 * DAY, n)
+        reporter = civilian_ids[rng.integers(0, len(civilian_ids), n)] if len(civilian_ids) else [None] * n
+        officer_pick = rng.random(n)
+        ids = uuids(rng, n)
+        job_ids = uuids(rng, n)
+
+        reports, logs, jobs, job_skills = [], [], [], []
+        lat, lng, created_at = lat.tolist(), lng.tolist(), created_at.tolist()
+        for i in range(n):
+            dept = departments[category[i]]
+            status = 'resolved' if resolved[i] else 'in_progress' if in_progress[i] else 'assigned' if assigned[i] else 'open'
+            officers = officers_by_city_dept.get((cities[city_idx[i]], dept)) or []
+            assigned_to = officers[int(officer_pick[i] * len(officers))] if officers and status != 'open' else None
+            if assigned_to is None:
+                status = 'open'
+            reports.append({'id': ids[i], 'category': CATEGORIES[category[i]], 'department': dept,
+                            'description': f'{CATEGORIES[category[i]].replace("_", " ").capitalize()} reported by resident',
+                            'severity': SEVERITIES[severity[i]], 'status': status, 'user_id': reporter[i],
+                            'assigned_to': assigned_to, 'latitude': round(lat[i], 6), 'longitude': round(lng[i], 6),
+                            'image_url': None, 'created_at': created_at[i]})
+            logs.append({'report_id': ids[i], 'status': 'open', 'message': 'Issue reported by citizen',
+                         'updated_by': reporter[i], 'timestamp': created_at[i]})
+            if status == 'open':
+                continue
+            assigned_at = min(created_at[i] + int(assign_delay[i]), now)
+            logs.append({'report_id': ids[i], 'status': 'assigned', 'message': 'Assigned to field officer',
+                         'updated_by': None, 'timestamp': assigned_at})
+            completed_at = None
+            if status == 'resolved':
+                completed_at = min(assigned_at + int(resolve_delay[i]), now)
+                logs.append({'report_id': ids[i], 'status': 'resolved', 'message': 'Issue resolved',
+                             'updated_by': assigned_to, 'timestamp': completed_at})
+            jobs.append({'id': job_ids[i], 'report_id': ids[i], 'worker_id': None,
+                         'status': 'completed' if status == 'resolved' else 'in_progress' if status == 'in_progress' else 'posted',
+                         'service_type': 'municipal', 'quoted_price': 0.0, 'proof_image_url': None,
+                         'started_at': assigned_at, 'completed_at': completed_at, 'created_at': assigned_at})
+            job_skills.extend(job_skill_rows(job_ids[i], CATEGORIES[category[i]]))
+
+        writer.write(Report, reports)
+        writer.write(ReportLog, logs)
+        writer.write(Job, jobs)
+        writer.write(JobSkill, job_skills)
+        db.session.commit()
+        yield start + n
+
+
+def generate_bookings(rng, writer, total, civilian_ids, now):
+    if not civilian_ids:
+        return
+    for start in range(0, total, writer.chunk_size):
+        n = min(writer.chunk_size, total - start)
+        ids = uuids(rng, n)
+        users = rng.integers(0, len(civilian_ids), n).tolist()
+        created = (now - rng.integers(0, 180 * DAY, n)).tolist()
+        service = rng.choice(len(SERVICE_TYPES), n, p=[0.8, 0.2]).tolist()
+        done = (rng.random(n) < 0.7).tolist()
+        writer.write(Booking, [{
+            'id': ids[i], 'user_id': civilian_ids[users[i]], 'report_id': None, 'worker_id': None,
+            'service_type': SERVICE_TYPES[service[i]], 'time_slot': 'today_morning', 'scheduled_at': created[i] + DAY,
+            'status': 'completed' if done[i] else 'confirmed', 'amount': 299.0 if service[i] == 0 else 499.0,
+            'payment_status': 'paid', 'worker_name': None, 'worker_phone': None, 'worker_rating': None,
+            'eta_minutes': 30, 'created_at': created[i], 'updated_at': created[i]
+        } for i in range(n)])
+        db.session.commit()
+
+
+def generate_attendance(rng, writer, officer_ids, days, now):
+    today = datetime.fromtimestamp(now, timezone.utc).date()
+    rows = []
+    for d in range(days):
+        date = today - timedelta(days=d)
+        roll = rng.random(len(officer_ids))
+        minutes = rng.integers(0, 60, len(officer_ids))
+        ids = uuids(rng, len(officer_ids))
+        for i, officer_id in enumerate(officer_ids):
+            status = 'present' if roll[i] < 0.8 else 'late' if roll[i] < 0.9 else 'absent'
+            check_in = None if status == 'absent' else dt_time(9 if status == 'present' else 10, int(minutes[i]))
+            rows.append({'id': ids[i], 'user_id': officer_id, 'date': date, 'check_in': check_in,
+                         'check_out': None if status == 'absent' else dt_time(17 + int(minutes[i]) % 2, int(minutes[i])),
+                         'status': status})
+        if len(rows) >= writer.chunk_size:
+            writer.write(Attendance, rows)
+            db.session.commit()
+            rows = []
+    writer.write(Attendance, rows)
+    db.session.commit()
+
+
+def main():
+    midnight = int(datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+    parser = argparse.ArgumentParser(description='Generate a reproducible benchmark dataset')
+    parser.add_argument('--reports', type=int, default=100000)
+    parser.add_argument('--civilians', type=int, default=10000)
+    parser.add_argument('--officers-per-dept', type=int, default=10, help='field officers per city and department')
+    parser.add_argument('--bookings', type=int, default=20000)
+    parser.add_argument('--attendance-days', type=int, default=90)
+    parser.add_argument('--days', type=int, default=365, help='report timeline length')
+    parser.add_argument('--cities', default=','.join(CITY_REGISTRY))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--now', type=int, default=midnight, help='epoch the timeline ends at (default: today 00:00 UTC)')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--password', default='bench123')
+    args = parser.parse_args()
+
+    cities = [c.strip() for c in args.cities.split(',') if c.strip()]
+    unknown = [c for c in cities if c not in CITY_REGISTRY]
+    if unknown:
+        parser.error(f'Unknown cities {unknown}; known: {list(CITY_REGISTRY)}')
+
+    rng = np.random.default_rng(args.seed)
+    started = time.time()
+    with app.app_context():
+        db.create_all()
+        if User.query.filter(User.email.like('%@bench.urbaneye.in')).first():
+            print('Benchmark dataset already present (users @bench.urbaneye.in); use a fresh DATABASE_URL')
+            return 1
+        writer = RowWriter(args.chunk_size)
+        password_hash = auth_utils.hash_password(args.password)
+        print(f"Generating into {db.engine.url.render_as_string(hide_password=True)} "
+              f"({'COPY' if writer.use_copy else 'executemany'}, seed {args.seed})")
+
+        officers_by_city_dept, civilian_ids, officer_ids = generate_staff(
+            rng, writer, cities, args.officers_per_dept, args.civilians, password_hash, args.now)
+        print(f"  staff and civilians: {len(officer_ids)} officers, {len(civilian_ids)} civilians")
+
+        for done in generate_reports(rng, writer, cities, args.reports, args.days,
+                                     officers_by_city_dept, civilian_ids, args.now):
+            elapsed = time.time() - started
+            print(f"\r  reports: {done}/{args.reports} ({done / max(elapsed, 1e-9):,.0f}/s)", end='', flush=True)
+        print()
+        generate_bookings(rng, writer, args.bookings, civilian_ids, args.now)
+        generate_attendance(rng, writer, officer_ids, args.attendance_days, args.now)
+
+    password_service.shutdown()
+    elapsed = time.time() - started
+    total = sum(writer.counts.values())
+    print(f"Done in {elapsed:.1f}s: {total:,} rows ({total / elapsed:,.0f} rows/s)")
+    for table, count in sorted(writer.counts.items()):
+        print(f"  {table:18} {count:>12,}")
+    print(f"Logins: any *@bench.urbaneye.in account, password '{args.password}'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Bulk-import users from a CSV or JSON file.
+
+CSV needs a header row: email,name,role,department,password
+(or password_hash with an existing bcrypt hash). JSON is a list of objects
+with the same keys.
+
+Usage:
+    python import_users.py staff.csv [--role field_officer] [--rounds 10] [--dry-run] [--report results.json]
+"""
+import sys
+import json
+import argparse
+
+from app import app
+from utils.user_import import import_users, parse_csv
+from utils.password_service import password_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-import users from CSV or JSON')
+    parser.add_argument('path')
+    parser.add_argument('--role', help='Role for rows without one')
+    parser.add_argument('--rounds', type=int, help='bcrypt work factor for the imported hashes (at least 10)')
+    parser.add_argument('--dry-run', action='store_true', help='Validate and check duplicates only')
+    parser.add_argument('--report', help='Write per-row results to this JSON file')
+    args = parser.parse_args()
+
+    with open(args.path, encoding='utf-8-sig') as f:
+        text = f.read()
+    rows = json.loads(text) if text.lstrip().startswith('[') else parse_csv(text)
+
+    with app.app_context():
+        summary = import_users(rows, default_role=args.role, rounds=args.rounds, dry_run=args.dry_run)
+    password_service.shutdown()
+
+    print(f"{len(rows)} rows: {summary['created']} created, {summary['duplicates']} duplicates, "
+          f"{summary['invalid']} invalid in {summary['duration_ms']}ms{' (dry run)' if args.dry_run else ''}")
+    for result in summary['results']:
+        if result['status'] in ('duplicate', 'invalid'):
+            print(f"  row {result['row']} {result['email']}: {result['status']} - {result['message']}")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(summary['results'], f, indent=2)
+    return 1 if summary['invalid'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Migration: one attendance row per employee per day, one payroll row per
+employee per month.
+
+Collapses duplicate (user_id, date) rows left by the old read-then-insert
+check-in, then replaces ix_attendance_user_date with the unique index
+uq_attendance_user_date that the ON CONFLICT check-ins rely on. Of each set
+of duplicates the first row with a check-in is kept; a missing check-out is
+filled in from the others.
+
+Likewise collapses duplicate (user_id, year, month) payroll rows (payroll runs
+next to per-request inserts) and adds uq_payroll_user_month for the payroll
+upserts. A paid row is kept over pending ones. Safe to re-run.
+
+Usage:
+    python migrate_attendance_unique.py
+"""
+import sys
+
+from sqlalchemy import text
+
+from app import app, db
+from models import Attendance, Payroll
+
+
+def dedupe_attendance(conn):
+    """Collapse duplicate (user_id, date) rows into one; returns the number of rows removed"""
+    groups = conn.execute(text(
+        'SELECT user_id, "date" FROM attendance GROUP BY user_id, "date" HAVING COUNT(*) > 1')).all()
+    removed = 0
+    for user_id, day in groups:
+        rows = conn.execute(text(
+            'SELECT id, check_in, check_out FROM attendance WHERE user_id = :user_id AND "date" = :day ORDER BY id'),
+            {'user_id': user_id, 'day': day}).all()
+        keep = next((r for r in rows if r.check_in is not None), rows[0])
+        check_out = keep.check_out or next((r.check_out for r in rows if r.check_out is not None), None)
+        if check_out is not None and keep.check_out is None:
+            conn.execute(text('UPDATE attendance SET check_out = :check_out WHERE id = :id'),
+                         {'check_out': check_out, 'id': keep.id})
+        extra = [r.id for r in rows if r.id != keep.id]
+        conn.execute(Attendance.__table__.delete().where(Attendance.__table__.c.id.in_(extra)))
+        removed += len(extra)
+    return removed
+
+
+def dedupe_payroll(conn):
+    """Collapse duplicate (user_id, year, month) payroll rows into one; returns the number of rows removed"""
+    groups = conn.execute(text(
+        'SELECT user_id, year, month FROM payroll GROUP BY user_id, year, month HAVING COUNT(*) > 1')).all()
+    removed = 0
+    for user_id, year, month in groups:
+        rows = conn.execute(text(
+            'SELECT id, status, payment_date FROM payroll '
+            'WHERE user_id = :user_id AND year = :year AND month = :month ORDER BY id'),
+            {'user_id': user_id, 'year': year, 'month': month}).all()
+        paid = [r for r in rows if r.status == 'paid']
+        keep = max(paid, key=lambda r: r.payment_date or 0) if paid else rows[0]
+        extra = [r.id for r in rows if r.id != keep.id]
+        conn.execute(Payroll.__table__.delete().where(Payroll.__table__.c.id.in_(extra)))
+        removed += len(extra)
+    return removed
+
+
+def run_migration():
+    with app.app_context():
+        print("Enforcing one attendance row per employee per day...")
+        with db.engine.begin() as conn:
+            removed = dedupe_attendance(conn)
+            print(f"[OK] {removed} duplicate attendance rows removed")
+            conn.execute(text('DROP INDEX IF EXISTS ix_attendance_user_date'))
+            for index in Attendance.__table__.indexes:
+                index.create(conn, checkfirst=True)
+        print(f"[OK] attendance indexes: {sorted(i.name for i in Attendance.__table__.indexes)}")
+
+        print("Enforcing one payroll row per employee per month...")
+        with db.engine.begin() as conn:
+            print(f"[OK] {dedupe_payroll(conn)} duplicate payroll rows removed")
+            for index in Payroll.__table__.indexes:
+                index.create(conn, checkfirst=True)
+        print(f"[OK] payroll indexes: {sorted(i.name for i in Payroll.__table__.indexes)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_migration())
@@ -0,0 +1,42 @@
+"""
+Migration: indexes behind gig job matching (utils/job_matching.py).
+
+Adds ix_reports_lat_lng on reports and fills job_skills (the table itself is
+created on app start) for existing jobs that have no rows yet, from their
+report's category. Safe to re-run.
+
+Usage:
+    python migrate_job_matching.py
+"""
+import sys
+
+from app import app, db
+from models import Report, Job, JobSkill
+from utils.bulk_seed import bulk_insert
+from utils.job_matching import job_skill_rows
+
+CHUNK_SIZE = 5000
+
+
+def run_migration():
+    with app.app_context():
+        print("Preparing reports and jobs for job matching...")
+        with db.engine.begin() as conn:
+            for index in Report.__table__.indexes:
+                index.create(conn, checkfirst=True)
+        print(f"[OK] reports indexes: {sorted(i.name for i in Report.__table__.indexes)}")
+
+        indexed = db.select(JobSkill.job_id).where(JobSkill.job_id == Job.id).exists()
+        missing = db.session.execute(
+            db.select(Job.id, Report.category).join(Report, Report.id == Job.report_id).where(~indexed)).all()
+        rows = []
+        for job_id, category in missing:
+            rows.extend(job_skill_rows(job_id, category))
+        bulk_insert(JobSkill, rows, chunk_size=CHUNK_SIZE)
+        db.session.commit()
+        print(f"[OK] {len(rows)} job_skills rows added for {len(missing)} jobs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_migration())
@@ -0,0 +1,171 @@
+"""
+Migration: typed temporal columns for attendance and payroll.
+
+    attendance.date             'YYYY-MM-DD' text  -> DATE
+    attendance.check_in / out   'HH:MM AM' text    -> TIME
+    payroll.month               'October 2024'     -> month number (SMALLINT; year is unchanged)
+
+plus the indexes uq_attendance_user_date, ix_attendance_date,
+ix_payroll_year_month and uq_payroll_user_month. Duplicates are collapsed
+before the unique indexes are built (see migrate_attendance_unique.py), once
+the values are typed: "October 2024" and "2024-10" are the same month. The API
+still returns the old text formats.
+
+Both dialects parse the legacy text with the same Python functions
+(parse_clock, parse_payroll_month, which also read "October" or "2024-10"
+with the year column). PostgreSQL first rewrites each row's text in canonical
+form (ISO date and time, month number), then converts in place with ALTER
+COLUMN ... TYPE ... USING a plain cast, all in one transaction. Elsewhere
+(SQLite cannot change a column's type) each table is copied into a typed
+<table>_typed table in chunks, then the old table is dropped and the new one
+renamed; a failure before the swap leaves the old table untouched. Columns
+that are already typed are skipped, so the script is safe to re-run.
+
+Usage:
+    python migrate_temporal_columns.py
+"""
+import sys
+from datetime import date, datetime
+
+from sqlalchemy import text, inspect, Date, Integer
+
+from app import app, db
+from models import User, Attendance, Payroll
+from utils.hr_reports import parse_clock, parse_payroll_month
+from migrate_attendance_unique import dedupe_attendance, dedupe_payroll
+
+CHUNK_SIZE = 5000
+
+# Run after normalize_postgres has rewritten the values in canonical text form
+POSTGRES_SQL = {
+    'attendance': """
+        ALTER TABLE attendance
+            ALTER COLUMN "date" TYPE DATE USING "date"::date,
+            ALTER COLUMN check_in TYPE TIME USING check_in::time,
+            ALTER COLUMN check_out TYPE TIME USING check_out::time
+    """,
+    'payroll': """
+        ALTER TABLE payroll
+            ALTER COLUMN month TYPE SMALLINT USING month::smallint
+    """
+}
+# Text columns each conversion retypes, and other columns it may correct (the year of "October 2024")
+TYPED_COLUMNS = {
+    'attendance': ['date', 'check_in', 'check_out'],
+    'payroll': ['month'],
+}
+CORRECTED_COLUMNS = {
+    'attendance': [],
+    'payroll': ['year'],
+}
+
+
+def typed_attendance(row):
+    day = row['date']
+    row['date'] = day if isinstance(day, date) else datetime.strptime(str(day).strip()[:10], '%Y-%m-%d').date()
+    for column in ('check_in', 'check_out'):
+        if row[column] in (None, ''):
+            row[column] = None
+        elif isinstance(row[column], str):
+            row[column] = parse_clock(row[column], column)
+    return row
+
+
+def typed_payroll(row):
+    if isinstance(row['month'], str) and not row['month'].isdigit():
+        row['year'], row['month'] = parse_payroll_month(row['month'], row['year'])
+    else:
+        row['month'] = int(row['month'])
+    return row
+
+
+def already_typed(inspector, table, column, kind):
+    columns = {c['name']: c['type'] for c in inspector.get_columns(table)}
+    return isinstance(columns[column], kind)
+
+
+def normalize_postgres(conn, model, convert):
+    """Rewrite the legacy text of `model`'s typed columns as ISO dates/times and month numbers, by id in chunks"""
+    table = model.__table__
+    typed_columns, corrected_columns = TYPED_COLUMNS[table.name], CORRECTED_COLUMNS[table.name]
+    columns = typed_columns + corrected_columns
+    # Textual UPDATE: the model's column types are already the typed ones
+    statement = text(f'UPDATE {table.name} SET ' + ', '.join(f'"{c}" = :{c}' for c in columns) + ' WHERE id = :_id')
+    last_id, rewritten = '', 0
+    while True:
+        rows = conn.execute(text(f'SELECT * FROM {table.name} WHERE id > :last_id ORDER BY id LIMIT {CHUNK_SIZE}'),
+                            {'last_id': last_id}).mappings().all()
+        if not rows:
+            return rewritten
+        updates = []
+        for row in rows:
+            typed = convert(dict(row))
+            update = {'_id': row['id'], **{column: typed[column] for column in corrected_columns}}
+            for column in typed_columns:
+                value = typed[column]
+                update[column] = value.isoformat() if hasattr(value, 'isoformat') else \
+                    None if value is None else str(value)
+            updates.append(update)
+        conn.execute(statement, updates)
+        rewritten += len(updates)
+        last_id = rows[-1]['id']
+        print(f"  {table.name}: {rewritten} rows normalized")
+
+
+def rebuild_sqlite(conn, model, convert):
+    """Copy `model`'s table into a typed <table>_typed, then swap it in"""
+    table = model.__table__
+    typed_name = f'{table.name}_typed'
+    metadata = db.MetaData()
+    User.__table__.to_metadata(metadata)    # target of the user_id foreign key
+    typed = table.to_metadata(metadata, name=typed_name)
+    # Unique indexes are built after the swap, once duplicates are collapsed
+    for index in [i for i in typed.indexes if i.unique]:
+        typed.indexes.discard(index)
+    # Index names are global in SQLite; the untyped table has none of the new ones
+    conn.execute(text(f'DROP TABLE IF EXISTS {typed_name}'))
+    typed.create(conn)
+
+    copied = 0
+    result = conn.execution_options(yield_per=CHUNK_SIZE).execute(text(f'SELECT * FROM {table.name}'))
+    for rows in result.mappings().partitions(CHUNK_SIZE):
+        conn.execute(typed.insert(), [convert(dict(r)) for r in rows])
+        copied += len(rows)
+        print(f"  {table.name}: {copied} rows copied")
+
+    conn.execute(text(f'DROP TABLE {table.name}'))
+    conn.execute(text(f'ALTER TABLE {typed_name} RENAME TO {table.name}'))
+    return copied
+
+
+def run_migration():
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        inspector = inspect(db.engine)
+        steps = [
+            (Attendance, 'date', Date, typed_attendance, dedupe_attendance),
+            (Payroll, 'month', Integer, typed_payroll, dedupe_payroll),
+        ]
+        print(f"Migrating attendance/payroll to typed temporal columns ({dialect})...")
+        for model, column, kind, convert, dedupe in steps:
+            name = model.__tablename__
+            if already_typed(inspector, name, column, kind):
+                print(f"[OK] {name}.{column} is already typed")
+            else:
+                with db.engine.begin() as conn:
+                    if dialect == 'postgresql':
+                        normalize_postgres(conn, model, convert)
+                        conn.execute(text(POSTGRES_SQL[name]))
+                    else:
+                        rebuild_sqlite(conn, model, convert)
+                print(f"[OK] {name} converted")
+            with db.engine.begin() as conn:
+                print(f"[OK] {dedupe(conn)} duplicate {name} rows removed")
+                for index in model.__table__.indexes:
+                    index.create(conn, checkfirst=True)
+            print(f"[OK] {name} indexes: {sorted(i.name for i in model.__table__.indexes)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_migration())
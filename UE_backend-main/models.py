@@ -2,11 +2,14 @@ from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import uuid
 import time
+import calendar
 
 db = SQLAlchemy()
 
 class User(db.Model):
     __tablename__ = 'users'
+    # Keyset pagination order (utils/pagination.py)
+    __table_args__ = (db.Index('ix_users_created_id', 'created_at', 'id'),)
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -27,6 +30,8 @@ class User(db.Model):
 
 class Report(db.Model):
     __tablename__ = 'reports'
+    # Bounding-box lookups around a point (job matching, utils/job_matching.py)
+    __table_args__ = (db.Index('ix_reports_lat_lng', 'latitude', 'longitude'),)
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     category = db.Column(db.String(50), nullable=False)
@@ -110,6 +115,8 @@ class Worker(db.Model):
 
 class Job(db.Model):
     __tablename__ = 'jobs'
+    # Keyset pagination order (utils/pagination.py)
+    __table_args__ = (db.Index('ix_jobs_status_created_id', 'status', 'created_at', 'id'),)
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     report_id = db.Column(db.String(36), db.ForeignKey('reports.id'), nullable=False)
@@ -139,9 +146,19 @@ class Job(db.Model):
             'completed_at': self.completed_at
         }
 
+class JobSkill(db.Model):
+    __tablename__ = 'job_skills'
+    # Inverted index: skill -> jobs needing it (primary key), plus job -> skills
+    __table_args__ = (db.Index('ix_job_skills_job', 'job_id'),)
+    
+    skill = db.Column(db.String(50), primary_key=True) # e.g. "road_repair"
+    job_id = db.Column(db.String(36), db.ForeignKey('jobs.id'), primary_key=True)
+
 class Booking(db.Model):
     """Urban Company style booking for civic services"""
     __tablename__ = 'bookings'
+    # Keyset pagination order (utils/pagination.py)
+    __table_args__ = (db.Index('ix_bookings_user_created_id', 'user_id', 'created_at', 'id'),)
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
@@ -190,6 +207,8 @@ class Booking(db.Model):
 class NGORequest(db.Model):
     """NGO help request from civilians"""
     __tablename__ = 'ngo_requests'
+    # Keyset pagination order (utils/pagination.py)
+    __table_args__ = (db.Index('ix_ngo_requests_user_created_id', 'user_id', 'created_at', 'id'),)
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
@@ -262,32 +281,43 @@ class EmployeeProfile(db.Model):
 
 class Attendance(db.Model):
     __tablename__ = 'attendance'
+    # One row per employee per day (check-in upserts, utils/attendance.py); also serves
+    # per-employee history. Date-range listings / monthly aggregates use ix_attendance_date.
+    __table_args__ = (
+        db.Index('uq_attendance_user_date', 'user_id', 'date', unique=True),
+        db.Index('ix_attendance_date', 'date'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     
-    date = db.Column(db.String(20), nullable=False) # YYYY-MM-DD
-    check_in = db.Column(db.String(20), nullable=True) # HH:MM AM/PM
-    check_out = db.Column(db.String(20), nullable=True)
+    date = db.Column(db.Date, nullable=False)
+    check_in = db.Column(db.Time, nullable=True)
+    check_out = db.Column(db.Time, nullable=True)
     status = db.Column(db.String(20), default='absent') # present, absent, late, half_day
     
     def to_dict(self):
         return {
             'id': self.id,
             'user_id': self.user_id,
-            'date': self.date,
-            'check_in': self.check_in,
-            'check_out': self.check_out,
+            'date': self.date.strftime('%Y-%m-%d') if self.date else None, # YYYY-MM-DD
+            'check_in': self.check_in.strftime('%I:%M %p') if self.check_in else None, # HH:MM AM/PM
+            'check_out': self.check_out.strftime('%I:%M %p') if self.check_out else None,
             'status': self.status
         }
 
 class Payroll(db.Model):
     __tablename__ = 'payroll'
+    # Month listings and payroll runs (utils/payroll.py); one row per employee per month
+    __table_args__ = (
+        db.Index('ix_payroll_year_month', 'year', 'month'),
+        db.Index('uq_payroll_user_month', 'user_id', 'year', 'month', unique=True),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     
-    month = db.Column(db.String(20), nullable=False) # e.g. "October 2024"
+    month = db.Column(db.SmallInteger, nullable=False) # 1-12
     year = db.Column(db.Integer, nullable=False)
     
     base_salary = db.Column(db.Float, nullable=False)
@@ -302,9 +332,11 @@ class Payroll(db.Model):
         return {
             'id': self.id,
             'user_id': self.user_id,
-            'month': self.month,
+            'month': f"{calendar.month_name[self.month]} {self.year}", # e.g. "October 2024"
             'year': self.year,
             'base_salary': self.base_salary,
+            'deductions': self.deductions,
+            'bonus': self.bonus,
             'net_salary': self.net_salary,
             'status': self.status,
             'payment_date': self.payment_date
@@ -312,6 +344,8 @@ class Payroll(db.Model):
 
 class Candidate(db.Model):
     __tablename__ = 'candidates'
+    # Keyset pagination order (utils/pagination.py)
+    __table_args__ = (db.Index('ix_candidates_created_id', 'created_at', 'id'),)
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     
@@ -334,3 +368,83 @@ class Candidate(db.Model):
             'status': self.status,
             'applied_at': self.created_at
         }
+
+class PredictionSnapshot(db.Model):
+    """Stored output of one background prediction run"""
+    __tablename__ = 'prediction_snapshots'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    city = db.Column(db.String(50), nullable=False, index=True)
+    
+    engine = db.Column(db.String(20), nullable=False) # langchain, legacy, cached, statistical, unavailable
+    payload = db.Column(db.JSON, nullable=False) # Response body served by /gov/predictions
+    inputs = db.Column(db.JSON, nullable=True) # weather/news context and report sample used
+    trigger = db.Column(db.String(20), default='schedule') # schedule, on_demand, cold_start
+    
+    started_at = db.Column(db.Integer, nullable=False)
+    duration_ms = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.Integer, default=lambda: int(time.time()), index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'city': self.city,
+            'engine': self.engine,
+            'trigger': self.trigger,
+            'generated_at': self.created_at,
+            'duration_ms': self.duration_ms
+        }
+
+class JobLock(db.Model):
+    """Cross-worker lease so only one process runs a background job at a time"""
+    __tablename__ = 'job_locks'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.Float, nullable=False)
+
+class UserImportJob(db.Model):
+    """A bulk user import run in the background; `summary` holds its per-row results once done"""
+    __tablename__ = 'user_import_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = db.Column(db.String(20), nullable=False, default='queued') # queued, running, done, failed
+    total_rows = db.Column(db.Integer, nullable=False)
+    summary = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    
+    created_at = db.Column(db.Integer, default=lambda: int(time.time()))
+    finished_at = db.Column(db.Integer, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'total_rows': self.total_rows,
+            'summary': self.summary,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+class WeatherObservation(db.Model):
+    """Hourly weather per city, ingested from Open-Meteo by the weather backfill job"""
+    __tablename__ = 'weather_observations'
+    __table_args__ = (db.UniqueConstraint('city', 'observed_at', name='uq_weather_city_hour'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    city = db.Column(db.String(50), nullable=False)
+    observed_at = db.Column(db.Integer, nullable=False) # Unix time of the hour (UTC)
+    
+    temperature = db.Column(db.Float, nullable=True) # °C
+    rain = db.Column(db.Float, nullable=True) # mm in the hour
+    wind_speed = db.Column(db.Float, nullable=True) # km/h
+    
+    def to_dict(self):
+        return {
+            'city': self.city,
+            'observed_at': self.observed_at,
+            'temperature': self.temperature,
+            'rain': self.rain,
+            'wind_speed': self.wind_speed
+        }
@@ -0,0 +1,40 @@
+"""
+Run the monthly payroll for all department staff (see utils/payroll.py).
+
+Usage:
+    python run_payroll.py [--month 2024-10] [--department Roads] [--dry-run]
+"""
+import sys
+import argparse
+from datetime import datetime
+
+from app import app
+from utils.payroll import run_payroll
+from utils.hr_reports import HRQueryError
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute and upsert the payroll for a month')
+    parser.add_argument('--month', default=datetime.now().strftime('%Y-%m'), help='YYYY-MM (default current month)')
+    parser.add_argument('--department', help='Only staff of this department')
+    parser.add_argument('--dry-run', action='store_true', help='Compute totals without writing')
+    args = parser.parse_args()
+
+    try:
+        with app.app_context():
+            summary = run_payroll(args.month, department=args.department, dry_run=args.dry_run)
+    except HRQueryError as e:
+        print(e)
+        return 2
+
+    totals = summary['totals']
+    print(f"{summary['month']}: {summary['employees']} employees, {summary['created']} created, "
+          f"{summary['updated']} updated, {summary['skipped_paid']} already paid in {summary['duration_ms']}ms"
+          f"{' (dry run)' if args.dry_run else ''}")
+    print(f"  base {totals['base_salary']:.2f}  deductions {totals['deductions']:.2f}  "
+          f"bonus {totals['bonus']:.2f}  net {totals['net_salary']:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,109 +1,205 @@
+"""
+Seed users and reports from users.json / reports.json (JSON array or NDJSON).
+
+Files are stream-parsed, so memory stays flat regardless of file size. Each
+batch does one IN query for the keys it already has and inserts the rest with
+executemany, committing every --commit-size records. After each commit the
+record count and byte offset are saved to <file>.checkpoint, with the file's
+size and mtime; a rerun seeks to that offset and resumes (--restart ignores
+it), and refuses a checkpoint written for a different version of the file. Report ids are derived from the file name and record
+position, so re-loading a batch after a crash never duplicates it.
+
+Usage:
+    python seed_db.py [--users users.json] [--reports reports.json]
+                      [--batch-size 1000] [--commit-size 5000] [--restart]
+"""
+import os
+import json
+import time
+import uuid
+import random
+import argparse
+
 from app import app, db
 from models import User, Report, ReportLog
-import uuid
-import json
-import auth_utils
+from utils.json_stream import iter_json_records
+from utils.bulk_seed import bulk_insert, existing_values
+
+# Department Mapping
+DEPT_MAPPING = {
+    'pothole': 'Roads',
+    'street_light': 'Roads',
+    'traffic_signal': 'Roads',
+    'sidewalk': 'Roads',
+    'infrastructure': 'Roads',
+    'garbage': 'Waste',
+    'illegal_dumping': 'Waste',
+    'sewage': 'Water',
+    'drainage': 'Water',
+    'waterlogging': 'Water'
+}
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def read_checkpoint(path):
+    """(records done, byte offset past them) saved for `path`; (0, 0) without a checkpoint"""
+    try:
+        with open(f'{path}.checkpoint') as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return 0, 0
+    if checkpoint.get('file') != file_signature(path):
+        raise ValueError(f"{path} changed since its checkpoint was written; rerun with --restart")
+    return checkpoint['records'], checkpoint['offset']
+
+
+def write_checkpoint(path, records, offset):
+    tmp = f'{path}.checkpoint.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'records': records, 'offset': offset, 'file': file_signature(path)}, f)
+    os.replace(tmp, f'{path}.checkpoint')
+
+
+def insert_users(batch):
+    """batch: [(index, user dict)]; returns rows inserted"""
+    existing = existing_values(User.email, [u['email'] for _, u in batch])
+    rows = []
+    for _, u in batch:
+        if u['email'] in existing:
+            continue
+        existing.add(u['email'])
+        rows.append({
+            'id': u.get('id') or str(uuid.uuid4()),
+            'email': u['email'],
+            'password_hash': u['password_hash'],
+            'name': u['name'],
+            'role': u['role'],
+            'department': u.get('department'),
+            'created_at': u.get('created_at') or int(time.time())
+        })
+    return bulk_insert(User, rows)
 
-def seed_db():
+
+def report_inserter(source, officer_id):
+    name = os.path.basename(source)
+
+    def insert_reports(batch):
+        """batch: [(index, legacy report dict with 'issues')]; returns rows inserted"""
+        reports, logs = [], []
+        for index, item in batch:
+            timestamp = item.get('timestamp')
+            for n, issue in enumerate(item.get('issues', [])):
+                category = issue.get('category')
+                report_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f'urbaneye-seed:{name}:{index}:{n}'))
+                # Assign 30% of reports to the first field officer for testing
+                assigned = officer_id is not None and random.random() < 0.3
+                reports.append({
+                    'id': report_id,
+                    'category': category,
+                    'department': DEPT_MAPPING.get(category, 'General'),
+                    'description': issue.get('description'),
+                    'severity': issue.get('severity'),
+                    'latitude': item.get('latitude'),
+                    'longitude': item.get('longitude'),
+                    'status': 'assigned' if assigned else 'open',
+                    'assigned_to': officer_id if assigned else None,
+                    'created_at': timestamp
+                })
+                logs.append({
+                    'report_id': report_id,
+                    'status': 'open',
+                    'message': 'Issue ported from legacy system',
+                    'timestamp': timestamp
+                })
+        existing = existing_values(Report.id, [r['id'] for r in reports])
+        if existing:
+            reports = [r for r in reports if r['id'] not in existing]
+            logs = [l for l in logs if l['report_id'] not in existing]
+        bulk_insert(Report, reports)
+        bulk_insert(ReportLog, logs)
+        return len(reports)
+
+    return insert_reports
+
+
+def load(path, insert_batch, batch_size, commit_size, restart):
+    """Stream `path` through insert_batch in batches, committing and checkpointing every commit_size records"""
+    start, offset = (0, 0) if restart else read_checkpoint(path)
+    if start:
+        print(f"Resuming {path} after record {start}")
+    batch = []
+    batch_end = offset
+    uncommitted = 0
+    inserted = 0
+    position = start
+
+    def flush():
+        nonlocal batch, inserted, uncommitted, position, offset
+        if batch:
+            inserted += insert_batch(batch)
+            uncommitted += len(batch)
+            position = batch[-1][0] + 1
+            offset = batch_end
+            batch = []
+
+    def commit():
+        nonlocal uncommitted
+        db.session.commit()
+        write_checkpoint(path, position, offset)
+        uncommitted = 0
+        print(f"  {path}: {position} records read, {inserted} rows inserted")
+
+    # Seek straight past the checkpointed records instead of decoding them again
+    for index, (record, batch_end) in enumerate(iter_json_records(path, offset), start=start):
+        batch.append((index, record))
+        if len(batch) >= batch_size:
+            flush()
+            if uncommitted >= commit_size:
+                commit()
+    flush()
+    commit()
+    return inserted
+
+
+def seed_db(users_path='users.json', reports_path='reports.json', batch_size=1000, commit_size=5000, restart=False):
     with app.app_context():
         # --- USERS SEEDING ---
-        if User.query.first():
-            print("Users already seeded.")
-        else:
-            print("Seeding database from users.json...")
+        if os.path.exists(users_path):
+            print(f"Seeding database from {users_path}...")
             try:
-                with open('users.json', 'r') as f:
-                    users_data = json.load(f)
-                
-                for u in users_data:
-                    # Check if user exists (redundancy check)
-                    if not User.query.filter_by(email=u['email']).first():
-                        user = User(
-                            id=u.get('id', str(uuid.uuid4())),
-                            email=u['email'],
-                            password_hash=u['password_hash'],
-                            name=u['name'],
-                            role=u['role'],
-                            department=u.get('department')
-                        )
-                        db.session.add(user)
-                
-                db.session.commit()
-                print(f"Successfully seeded {len(users_data)} users!")
-            except FileNotFoundError:
-                print("users.json not found, skipping user seed.")
+                count = load(users_path, insert_users, batch_size, commit_size, restart)
+                print(f"Successfully seeded {count} users!")
             except Exception as e:
+                db.session.rollback()
                 print(f"Error seeding users: {e}")
+        else:
+            print(f"{users_path} not found, skipping user seed.")
 
         # --- REPORTS SEEDING ---
-        if Report.query.first():
-             print("Reports already seeded.")
-        else:
-            print("Seeding database from reports.json...")
+        if os.path.exists(reports_path):
+            print(f"Seeding database from {reports_path}...")
             try:
-                with open('reports.json', 'r') as f:
-                    reports_data = json.load(f)
-                
-                # Department Mapping
-                DEPT_MAPPING = {
-                    'pothole': 'Roads',
-                    'street_light': 'Roads',
-                    'traffic_signal': 'Roads',
-                    'sidewalk': 'Roads',
-                    'infrastructure': 'Roads',
-                    'garbage': 'Waste',
-                    'illegal_dumping': 'Waste',
-                    'sewage': 'Water',
-                    'drainage': 'Water',
-                    'waterlogging': 'Water'
-                }
-
-                report_count = 0
-                for item in reports_data:
-                    timestamp = item.get('timestamp')
-                    lat = item.get('latitude')
-                    lng = item.get('longitude')
-                    
-                    for issue in item.get('issues', []):
-                        category = issue.get('category')
-                        department = DEPT_MAPPING.get(category, 'General')
-                        
-                        report = Report(
-                            category=category,
-                            department=department,
-                            description=issue.get('description'),
-                            severity=issue.get('severity'),
-                            latitude=lat,
-                            longitude=lng,
-                            status='open',
-                            created_at=timestamp
-                        )
-                        
-                        log = ReportLog(
-                            status='open',
-                            message='Issue ported from legacy system',
-                            timestamp=timestamp
-                        )
-                        report.logs.append(log)
-                        
-                        # Assign 30% of reports to field_officer_1 for testing
-                        import random
-                        if random.random() < 0.3:
-                            officer = User.query.filter_by(role='field_officer').first()
-                            if officer:
-                                report.assigned_to = officer.id
-                                report.status = 'assigned'
-
-                        db.session.add(report)
-                        report_count += 1
-                
-                db.session.commit()
-                print(f"Successfully seeded {report_count} reports!")
-
-            except FileNotFoundError:
-                print("reports.json not found, skipping report seed.")
+                officer_id = db.session.execute(
+                    db.select(User.id).where(User.role == 'field_officer').limit(1)).scalar()
+                count = load(reports_path, report_inserter(reports_path, officer_id), batch_size, commit_size, restart)
+                print(f"Successfully seeded {count} reports!")
             except Exception as e:
+                db.session.rollback()
                 print(f"Error seeding reports: {e}")
+        else:
+            print(f"{reports_path} not found, skipping report seed.")
+
 
 if __name__ == '__main__':
-    seed_db()
+    parser = argparse.ArgumentParser(description='Stream users/reports JSON or NDJSON into the database')
+    parser.add_argument('--users', default='users.json')
+    parser.add_argument('--reports', default='reports.json')
+    parser.add_argument('--batch-size', type=int, default=1000, help='records per existence check and insert')
+    parser.add_argument('--commit-size', type=int, default=5000, help='records per commit and checkpoint')
+    parser.add_argument('--restart', action='store_true', help='ignore checkpoints and start from the first record')
+    args = parser.parse_args()
+    seed_db(args.users, args.reports, args.batch_size, args.commit_size, args.restart)
@@ -0,0 +1,98 @@
+"""
+Local stand-in for Google's OAuth2 cert endpoint, plus an ID-token minter.
+
+Generates an RSA key and a self-signed cert on start, serves them in Google's
+{kid: x509 PEM} format with a Cache-Control max-age, and signs ID tokens the
+verifier accepts. Lets GoogleOAuth be exercised without network access.
+
+Usage:
+    python stub_google_certs.py [port]     # prints a sample token for GOOGLE_CLIENT_ID
+    GOOGLE_CERTS_URL=http://127.0.0.1:8091/oauth2/v1/certs GOOGLE_CLIENT_ID=test-client python app.py
+
+Or in-process:
+    stub = start_stub_server(0)
+    token = stub.mint_id_token('test-client', 'someone@example.com')
+"""
+import os
+import sys
+import json
+import time
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.auth import crypt, jwt
+
+KEY_ID = 'stub-key-1'
+
+
+def _generate_key_and_cert():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'stub-google-certs')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = x509.CertificateBuilder().subject_name(name).issuer_name(name)\
+        .public_key(key.public_key()).serial_number(x509.random_serial_number())\
+        .not_valid_before(now - datetime.timedelta(days=1)).not_valid_after(now + datetime.timedelta(days=30))\
+        .sign(key, hashes.SHA256())
+    key_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption()).decode()
+    cert_pem = cert.public_bytes(serialization.Encoding.PEM).decode()
+    return key_pem, cert_pem
+
+
+class GoogleCertsStub(ThreadingHTTPServer):
+    def __init__(self, address, max_age=3600):
+        super().__init__(address, _CertsHandler)
+        key_pem, self.cert_pem = _generate_key_and_cert()
+        self.signer = crypt.RSASigner.from_string(key_pem, KEY_ID)
+        self.max_age = max_age
+        self.requests_served = 0
+
+    @property
+    def certs_url(self):
+        return f'http://{self.server_address[0]}:{self.server_port}/oauth2/v1/certs'
+
+    def mint_id_token(self, audience, email, name='Stub User', lifetime=3600, issuer='https://accounts.google.com'):
+        now = int(time.time())
+        payload = {
+            'iss': issuer, 'aud': audience, 'sub': email, 'email': email,
+            'email_verified': True, 'name': name, 'iat': now, 'exp': now + lifetime
+        }
+        return jwt.encode(self.signer, payload).decode()
+
+
+class _CertsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/oauth2/v1/certs':
+            self.send_error(404)
+            return
+        self.server.requests_served += 1
+        payload = json.dumps({KEY_ID: self.server.cert_pem}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Cache-Control', f'public, max-age={self.server.max_age}, must-revalidate, no-transform')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=8091, host='127.0.0.1', max_age=3600):
+    """Start the stub in a daemon thread; port 0 picks a free port"""
+    server = GoogleCertsStub((host, port), max_age=max_age)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8091
+    server = GoogleCertsStub(('127.0.0.1', port))
+    print(f"Google certs stub on {server.certs_url}")
+    print(f"Sample ID token: {server.mint_id_token(os.getenv('GOOGLE_CLIENT_ID', 'test-client'), 'stub.user@example.com')}")
+    server.serve_forever()
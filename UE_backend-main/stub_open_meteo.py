@@ -0,0 +1,96 @@
+"""
+Local stand-in for the Open-Meteo forecast API.
+
+Serves deterministic hourly data (temperature_2m, rain, wind_speed_10m) for the
+requested past_days/forecast_days, plus a `current` block, so the weather
+backfill job and prediction context can run without network access.
+
+Usage:
+    python stub_open_meteo.py [port]
+    OPEN_METEO_URL=http://127.0.0.1:8090/v1/forecast python app.py
+
+Or in-process: server = start_stub_server(0); server.server_port
+"""
+import sys
+import json
+import math
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def synthetic_hour(t, lat):
+    """Daily temperature cycle and a rain spell every few days, varying with latitude"""
+    hour_of_day = (t // 3600) % 24
+    day = t // 86400
+    temperature = round(28 + abs(lat) / 10 + 8 * math.sin((hour_of_day - 9) / 24 * 2 * math.pi), 1)
+    rain = round(2.5 * max(0.0, math.sin(day * 1.3) - 0.6) * (hour_of_day % 6 == 0), 1)
+    wind = round(8 + 4 * math.cos(t / 7200), 1)
+    return temperature, rain, wind
+
+
+class OpenMeteoStubHandler(BaseHTTPRequestHandler):
+    requests_served = 0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/v1/forecast':
+            self.send_error(404)
+            return
+        OpenMeteoStubHandler.requests_served += 1
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        lat = float(params.get('latitude', 0))
+        lng = float(params.get('longitude', 0))
+        past_days = int(params.get('past_days', 0))
+        forecast_days = int(params.get('forecast_days', 7))
+
+        now = int(time.time())
+        start = (now // 86400 - past_days) * 86400
+        end = (now // 86400 + forecast_days) * 86400
+        times = list(range(start, end, 3600))
+        hours = [synthetic_hour(t, lat) for t in times]
+        current = synthetic_hour(now - now % 900, lat)
+
+        unixtime = params.get('timeformat') == 'unixtime'
+        body = {
+            'latitude': lat,
+            'longitude': lng,
+            'timezone': 'GMT',
+            'current': {
+                'time': now - now % 900 if unixtime else time.strftime('%Y-%m-%dT%H:%M', time.gmtime(now - now % 900)),
+                'temperature_2m': current[0],
+                'rain': current[1],
+                'showers': 0.0,
+                'wind_speed_10m': current[2]
+            },
+            'hourly': {
+                'time': times if unixtime else [time.strftime('%Y-%m-%dT%H:%M', time.gmtime(t)) for t in times],
+                'temperature_2m': [h[0] for h in hours],
+                'rain': [h[1] for h in hours],
+                'wind_speed_10m': [h[2] for h in hours]
+            }
+        }
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=8090, host='127.0.0.1'):
+    """Start the stub in a daemon thread; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), OpenMeteoStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8090
+    server = ThreadingHTTPServer(('127.0.0.1', port), OpenMeteoStubHandler)
+    print(f"Open-Meteo stub on http://127.0.0.1:{port}/v1/forecast")
+    server.serve_forever()
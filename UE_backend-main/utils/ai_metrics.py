@@ -0,0 +1,136 @@
+"""
+In-process metrics for Gemini / LangChain calls.
+
+Every model invocation records latency, prompt/response token counts, the key
+index it ran on, its caller and an outcome (ok, 429, error, parse_fallback).
+Metrics are exposed in Prometheus text format and as a JSON summary. Values
+are per worker process; Prometheus should scrape each worker (or aggregate by
+the `instance` label) when running under gunicorn.
+"""
+import threading
+from collections import defaultdict
+
+from utils.gemini_pool import is_quota_error
+
+# Seconds; model calls range from sub-second text prompts to 30s+ chains
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+
+OUTCOME_OK = 'ok'
+OUTCOME_QUOTA = '429'
+OUTCOME_ERROR = 'error'
+OUTCOME_PARSE_FALLBACK = 'parse_fallback'
+
+
+def outcome_for(error):
+    """Map an exception raised by a model call to its outcome label"""
+    return OUTCOME_QUOTA if is_quota_error(error) else OUTCOME_ERROR
+
+
+def token_usage(response):
+    """(prompt_tokens, response_tokens) from a Gemini response or a LangChain message"""
+    usage = getattr(response, 'usage_metadata', None)
+    if not usage:
+        return 0, 0
+    if isinstance(usage, dict):
+        # LangChain AIMessage.usage_metadata
+        return usage.get('input_tokens', 0) or 0, usage.get('output_tokens', 0) or 0
+    return getattr(usage, 'prompt_token_count', 0) or 0, getattr(usage, 'candidates_token_count', 0) or 0
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+    def quantile(self, q):
+        """Upper bucket bound containing the q-th observation"""
+        if not self.count:
+            return None
+        target = q * self.count
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if self.buckets[i] >= target:
+                return bound
+        return float('inf')
+
+
+class AIMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = defaultdict(int)       # (caller, key, outcome) -> count
+        self._tokens = defaultdict(int)      # (caller, key, kind) -> tokens
+        self._latency = defaultdict(_Histogram)  # caller -> histogram
+
+    def record_call(self, caller, key_index, outcome, latency=None, prompt_tokens=0, response_tokens=0):
+        key = 'global' if key_index is None else str(key_index)
+        with self._lock:
+            self._calls[(caller, key, outcome)] += 1
+            if latency is not None:
+                self._latency[caller].observe(latency)
+            if prompt_tokens:
+                self._tokens[(caller, key, 'prompt')] += prompt_tokens
+            if response_tokens:
+                self._tokens[(caller, key, 'response')] += response_tokens
+
+    def record_parse_fallback(self, caller):
+        """A call succeeded but its output could not be parsed"""
+        self.record_call(caller, None, OUTCOME_PARSE_FALLBACK)
+
+    def render_prometheus(self):
+        lines = [
+            '# HELP gemini_calls_total Model invocations by caller, key index and outcome',
+            '# TYPE gemini_calls_total counter',
+        ]
+        with self._lock:
+            for (caller, key, outcome), value in sorted(self._calls.items()):
+                lines.append(f'gemini_calls_total{{caller="{caller}",key="{key}",outcome="{outcome}"}} {value}')
+
+            lines += [
+                '# HELP gemini_tokens_total Prompt and response tokens by caller and key index',
+                '# TYPE gemini_tokens_total counter',
+            ]
+            for (caller, key, kind), value in sorted(self._tokens.items()):
+                lines.append(f'gemini_tokens_total{{caller="{caller}",key="{key}",kind="{kind}"}} {value}')
+
+            lines += [
+                '# HELP gemini_call_latency_seconds Model call latency by caller',
+                '# TYPE gemini_call_latency_seconds histogram',
+            ]
+            for caller, hist in sorted(self._latency.items()):
+                for bound, value in zip(LATENCY_BUCKETS, hist.buckets):
+                    lines.append(f'gemini_call_latency_seconds_bucket{{caller="{caller}",le="{bound}"}} {value}')
+                lines.append(f'gemini_call_latency_seconds_bucket{{caller="{caller}",le="+Inf"}} {hist.count}')
+                lines.append(f'gemini_call_latency_seconds_sum{{caller="{caller}"}} {hist.sum:.6f}')
+                lines.append(f'gemini_call_latency_seconds_count{{caller="{caller}"}} {hist.count}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        callers = {}
+        keys = {}
+        with self._lock:
+            for (caller, key, outcome), value in self._calls.items():
+                entry = callers.setdefault(caller, {'calls': {}, 'tokens': {'prompt': 0, 'response': 0}})
+                entry['calls'][outcome] = entry['calls'].get(outcome, 0) + value
+                key_entry = keys.setdefault(key, {'calls': {}, 'tokens': {'prompt': 0, 'response': 0}})
+                key_entry['calls'][outcome] = key_entry['calls'].get(outcome, 0) + value
+            for (caller, key, kind), value in self._tokens.items():
+                callers.setdefault(caller, {'calls': {}, 'tokens': {'prompt': 0, 'response': 0}})['tokens'][kind] += value
+                keys.setdefault(key, {'calls': {}, 'tokens': {'prompt': 0, 'response': 0}})['tokens'][kind] += value
+            for caller, hist in self._latency.items():
+                callers[caller]['latency'] = {
+                    'count': hist.count,
+                    'avg_seconds': round(hist.sum / hist.count, 3) if hist.count else None,
+                    'p50_seconds': hist.quantile(0.5),
+                    'p95_seconds': hist.quantile(0.95)
+                }
+        return {'callers': callers, 'keys': keys}
+
+
+metrics = AIMetrics()
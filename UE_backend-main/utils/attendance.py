@@ -0,0 +1,74 @@
+"""
+Attendance writes keyed on the unique (user_id, date) index.
+
+Check-ins are INSERT ... ON CONFLICT (user_id, date) statements instead of a
+read followed by an insert, so concurrent or repeated check-ins for the same
+employee and day cannot create a second row. A whole shift is marked with a
+single multi-row INSERT. Needs PostgreSQL or SQLite 3.24+ (ON CONFLICT).
+"""
+import os
+import uuid
+
+from models import db, User, Attendance
+from utils.bulk_seed import dialect_insert
+from utils.hr_reports import ATTENDANCE_STATUSES, HRQueryError
+
+SHIFT_CHECKIN_MAX = int(os.getenv('SHIFT_CHECKIN_MAX', 1000))
+STAFF_ROLES = ['dept_head', 'field_officer']
+CONFLICT_KEY = ['user_id', 'date']
+
+
+def _check_status(status):
+    if status not in ATTENDANCE_STATUSES:
+        raise HRQueryError(f'Invalid status. Must be one of: {ATTENDANCE_STATUSES}')
+
+
+def mark_attendance(user_id, day, check_in, status='present', check_out=None):
+    """
+    Check `user_id` in for `day` (the first check-in of the day wins), or with
+    `check_out` also record the check-out on the existing row. Returns the row.
+    """
+    _check_status(status)
+    statement = dialect_insert(Attendance).values(id=str(uuid.uuid4()), user_id=user_id, date=day,
+                                 check_in=check_in, status=status)
+    if check_out is not None:
+        statement = statement.on_conflict_do_update(index_elements=CONFLICT_KEY, set_={'check_out': check_out})
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=CONFLICT_KEY)
+    db.session.execute(statement)
+    db.session.commit()
+    return Attendance.query.filter_by(user_id=user_id, date=day).first()
+
+
+def check_in_shift(user_ids, day, check_in, status='present', department=None):
+    """
+    Mark every staff member in `user_ids` (optionally limited to `department`)
+    with one INSERT ... ON CONFLICT DO NOTHING; employees already marked for
+    `day` keep their row. Returns {'checked_in', 'already_marked', 'unknown'}.
+    """
+    _check_status(status)
+    if not all(isinstance(u, str) for u in user_ids):
+        raise HRQueryError('user_ids must be a list of user id strings')
+    user_ids = list(dict.fromkeys(u for u in user_ids if u))
+    if not user_ids:
+        raise HRQueryError('user_ids must be a non-empty list')
+    if len(user_ids) > SHIFT_CHECKIN_MAX:
+        raise HRQueryError(f'Too many employees ({len(user_ids)}); the limit is {SHIFT_CHECKIN_MAX}')
+
+    query = db.select(User.id).where(User.id.in_(user_ids), User.role.in_(STAFF_ROLES))
+    if department:
+        query = query.where(User.department == department)
+    staff = set(db.session.execute(query).scalars())
+
+    rows = [{'id': str(uuid.uuid4()), 'user_id': user_id, 'date': day, 'check_in': check_in,
+             'check_out': None, 'status': status} for user_id in user_ids if user_id in staff]
+    inserted = 0
+    if rows:
+        result = db.session.execute(dialect_insert(Attendance).values(rows).on_conflict_do_nothing(index_elements=CONFLICT_KEY))
+        inserted = result.rowcount
+    db.session.commit()
+    return {
+        'checked_in': inserted,
+        'already_marked': len(rows) - inserted,
+        'unknown': [user_id for user_id in user_ids if user_id not in staff]
+    }
@@ -0,0 +1,95 @@
+"""
+Set-based bulk insert helpers for the seeders and importers.
+
+Rows are built as plain dicts with their ids generated up front, so children
+(report logs, ...) can reference parents without a flush. They are inserted
+with executemany in chunks. Existence checks are one IN query per chunk of
+keys instead of one query per row. Nothing here commits; callers own the
+transaction.
+"""
+import os
+import time
+import uuid
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, User
+
+SEED_CHUNK_SIZE = int(os.getenv('SEED_CHUNK_SIZE', 1000))
+# Upper bound on rows generated per seeder call (secret-key seed endpoints and scripts)
+SEED_MAX_ROWS = int(os.getenv('SEED_MAX_ROWS', 50000))
+# /reports/seed takes no credentials, so it keeps its original small cap
+PUBLIC_SEED_MAX_ROWS = 50
+# Keeps IN lists under SQLite's bound-parameter limit
+IN_CHUNK_SIZE = 500
+
+
+def bulk_insert(model, rows, chunk_size=SEED_CHUNK_SIZE):
+    """executemany INSERT of `rows` (dicts with identical keys) in chunks; returns the row count"""
+    # Core insert on the table: the ORM bulk path regroups rows by which keys are None,
+    # which splits a chunk into many small statements when nullable columns alternate
+    statement = model.__table__.insert()
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(statement, rows[start:start + chunk_size])
+    return len(rows)
+
+
+def dialect_insert(model):
+    """INSERT on `model`'s table that supports on_conflict_do_nothing/do_update (PostgreSQL, SQLite 3.24+)"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(model.__table__)
+    if dialect == 'sqlite':
+        return sqlite.insert(model.__table__)
+    raise RuntimeError(f'Upserts need PostgreSQL or SQLite, not {dialect}')
+
+
+def existing_values(column, values):
+    """The subset of `values` already present in `column`"""
+    values = list(set(values))
+    found = set()
+    for start in range(0, len(values), IN_CHUNK_SIZE):
+        chunk = values[start:start + IN_CHUNK_SIZE]
+        found.update(v for (v,) in db.session.execute(db.select(column).where(column.in_(chunk))))
+    return found
+
+
+def ensure_users(specs, now=None):
+    """
+    Insert the users in `specs` (dicts with email, name, role, password_hash and
+    optionally department) whose email is not taken yet.
+    Returns ({email: id} for every spec, set of emails created).
+    """
+    now = now or int(time.time())
+    emails = [s['email'] for s in specs]
+    ids = {}
+    for start in range(0, len(emails), IN_CHUNK_SIZE):
+        chunk = emails[start:start + IN_CHUNK_SIZE]
+        ids.update(db.session.execute(db.select(User.email, User.id).where(User.email.in_(chunk))).all())
+    rows = []
+    for spec in specs:
+        if spec['email'] in ids:
+            continue
+        row = {'department': None, 'created_at': now, **spec, 'id': str(uuid.uuid4())}
+        ids[spec['email']] = row['id']
+        rows.append(row)
+    bulk_insert(User, rows)
+    return ids, {r['email'] for r in rows}
+
+
+def report_rows(specs, now=None):
+    """
+    Split report specs (Report column dicts, each with an optional 'logs' list of
+    {status, message} dicts) into (report rows, report_log rows) ready for bulk_insert.
+    """
+    now = now or int(time.time())
+    reports, logs = [], []
+    for spec in specs:
+        spec = dict(spec)
+        spec_logs = spec.pop('logs', [])
+        spec.setdefault('id', str(uuid.uuid4()))
+        spec.setdefault('created_at', now)
+        reports.append(spec)
+        for log in spec_logs:
+            logs.append({'report_id': spec['id'], 'timestamp': spec['created_at'], 'updated_by': None, **log})
+    return reports, logs
@@ -0,0 +1,38 @@
+"""
+Per-key pool of pre-built LangChain chains.
+
+Building a ChatGoogleGenerativeAI client (and its HTTP connection pool) and a
+prompt with parser format instructions costs more than formatting the prompt
+itself. The chain for each API key is built on first use and reused by every
+later request, so the underlying HTTP connections stay warm.
+"""
+import threading
+
+
+class ChainPool:
+    def __init__(self, prompt, build_llm):
+        """
+        prompt: a Runnable shared by every chain (built once by the caller).
+        build_llm(api_key) returns the chat model for one key.
+        """
+        self.prompt = prompt
+        self._build_llm = build_llm
+        self._chains = {}   # api_key -> prompt | llm
+        self._lock = threading.Lock()
+
+    def get(self, api_key):
+        chain = self._chains.get(api_key)
+        if chain is None:
+            with self._lock:
+                chain = self._chains.get(api_key)
+                if chain is None:
+                    chain = self.prompt | self._build_llm(api_key)
+                    self._chains[api_key] = chain
+        return chain
+
+    def clear(self):
+        with self._lock:
+            self._chains.clear()
+
+    def __len__(self):
+        return len(self._chains)
@@ -0,0 +1,107 @@
+"""
+Circuit breaker with a latency budget for outbound AI calls.
+
+closed    -> calls go through; failures and over-budget calls are counted
+open      -> calls fail immediately with CircuitOpenError until the recovery timeout passes
+half_open -> a single probe call is let through; success closes the circuit, failure re-opens it
+"""
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"Circuit '{name}' is open, retry after {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name, latency_budget, failure_threshold=3, recovery_timeout=30, is_failure=None):
+        self.name = name
+        self.latency_budget = latency_budget  # seconds; slower calls count as failures
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        # Predicate deciding which exceptions count against the dependency
+        self.is_failure = is_failure or (lambda e: True)
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self):
+        """True while calls would be rejected without reaching the dependency"""
+        return self.state == OPEN
+
+    def _retry_after(self):
+        return max(1, int(self.recovery_timeout - (time.monotonic() - self._opened_at)))
+
+    def _acquire(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            if self._state == OPEN and time.monotonic() - self._opened_at < self.recovery_timeout:
+                raise CircuitOpenError(self.name, self._retry_after())
+            # Recovery timeout elapsed: allow exactly one probe
+            if self._probe_in_flight:
+                raise CircuitOpenError(self.name, self._retry_after())
+            self._state = HALF_OPEN
+            self._probe_in_flight = True
+            return True
+
+    def _record(self, ok, probe):
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+            if ok:
+                if self._state != CLOSED:
+                    logger.info(f"Circuit '{self.name}' closed")
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(f"Circuit '{self.name}' opened after {self._failures} failure(s)")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def call(self, func, *args, **kwargs):
+        """Run func through the breaker"""
+        probe = self._acquire()
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._record(not self.is_failure(e), probe)
+            raise
+        elapsed = time.monotonic() - started
+        if elapsed > self.latency_budget:
+            logger.warning(f"Circuit '{self.name}': call took {elapsed:.1f}s (budget {self.latency_budget}s)")
+        self._record(elapsed <= self.latency_budget, probe)
+        return result
+
+    def to_dict(self):
+        return {
+            'state': self.state,
+            'failures': self._failures,
+            'latency_budget': self.latency_budget
+        }
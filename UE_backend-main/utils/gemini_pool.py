@@ -0,0 +1,256 @@
+"""
+Gemini key pool with health state shared across worker processes.
+
+Each call leases one key and talks to Gemini through a client bound to that
+key, so nothing calls the process-wide `genai.configure()` and concurrent
+requests never switch keys under each other. Cooldowns, error counts and
+latency live in a small shared store (SQLite by default) so that once one
+gunicorn worker sees a key hit its quota, every worker skips it.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import itertools
+import threading
+import importlib
+from contextlib import contextmanager
+
+import google.generativeai as genai
+from google.generativeai.client import _ClientManager
+
+logger = logging.getLogger(__name__)
+
+# How long a key is skipped after a quota (429) error
+KEY_COOLDOWN_SECONDS = int(os.getenv('GEMINI_KEY_COOLDOWN_SECONDS', 60))
+# Error rates are computed over this rolling window
+ERROR_WINDOW_SECONDS = int(os.getenv('GEMINI_KEY_ERROR_WINDOW_SECONDS', 300))
+
+
+class KeysExhaustedError(Exception):
+    """Raised when every Gemini key is cooling down or already tried"""
+    pass
+
+
+def is_quota_error(error):
+    """Check for Quota (429) or Resource Exhausted errors"""
+    error_msg = str(error).lower()
+    return "429" in error_msg or "quota" in error_msg or "resource exhausted" in error_msg
+
+
+def key_id(api_key):
+    """Stable identifier for a key that is safe to store and log"""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+
+# =====================
+# HEALTH STORES
+# =====================
+
+class MemoryHealthStore:
+    """Process-local store (single worker / development)"""
+
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self, key_ids):
+        with self._lock:
+            return {k: dict(self._rows[k]) for k in key_ids if k in self._rows}
+
+    def record(self, kid, ok, latency_ms=None, cooldown_until=None):
+        now = time.time()
+        with self._lock:
+            row = self._rows.setdefault(kid, {
+                'cooldown_until': 0.0, 'window_start': now,
+                'ok_count': 0, 'error_count': 0, 'latency_ms': None
+            })
+            if row['window_start'] < now - ERROR_WINDOW_SECONDS:
+                row.update(window_start=now, ok_count=0, error_count=0)
+            row['ok_count' if ok else 'error_count'] += 1
+            if latency_ms is not None:
+                row['latency_ms'] = latency_ms if row['latency_ms'] is None \
+                    else row['latency_ms'] * 0.8 + latency_ms * 0.2
+            if cooldown_until is not None:
+                row['cooldown_until'] = max(row['cooldown_until'], cooldown_until)
+
+
+class SQLiteHealthStore:
+    """Store shared by every process on the host through one SQLite file"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(tempfile.gettempdir(), 'urbaneye_gemini_keys.db')
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS gemini_key_health (
+                    key_id TEXT PRIMARY KEY,
+                    cooldown_until REAL NOT NULL DEFAULT 0,
+                    window_start REAL NOT NULL,
+                    ok_count INTEGER NOT NULL DEFAULT 0,
+                    error_count INTEGER NOT NULL DEFAULT 0,
+                    latency_ms REAL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def snapshot(self, key_ids):
+        if not key_ids:
+            return {}
+        placeholders = ','.join('?' for _ in key_ids)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT key_id, cooldown_until, window_start, ok_count, error_count, latency_ms "
+                f"FROM gemini_key_health WHERE key_id IN ({placeholders})", list(key_ids)
+            ).fetchall()
+        return {
+            r[0]: {'cooldown_until': r[1], 'window_start': r[2], 'ok_count': r[3],
+                   'error_count': r[4], 'latency_ms': r[5]}
+            for r in rows
+        }
+
+    def record(self, kid, ok, latency_ms=None, cooldown_until=None):
+        now = time.time()
+        # Single atomic upsert; SET expressions see the pre-update row
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO gemini_key_health
+                    (key_id, cooldown_until, window_start, ok_count, error_count, latency_ms)
+                VALUES (:kid, COALESCE(:cooldown, 0), :now, :ok, :err, :latency)
+                ON CONFLICT(key_id) DO UPDATE SET
+                    ok_count = CASE WHEN window_start < :floor THEN :ok ELSE ok_count + :ok END,
+                    error_count = CASE WHEN window_start < :floor THEN :err ELSE error_count + :err END,
+                    window_start = CASE WHEN window_start < :floor THEN :now ELSE window_start END,
+                    latency_ms = CASE
+                        WHEN :latency IS NULL THEN latency_ms
+                        WHEN latency_ms IS NULL THEN :latency
+                        ELSE latency_ms * 0.8 + :latency * 0.2 END,
+                    cooldown_until = MAX(cooldown_until, COALESCE(:cooldown, 0))
+            """, {
+                'kid': kid, 'now': now, 'floor': now - ERROR_WINDOW_SECONDS,
+                'ok': 1 if ok else 0, 'err': 0 if ok else 1,
+                'latency': latency_ms, 'cooldown': cooldown_until
+            })
+
+
+def create_health_store(spec=None):
+    """
+    Build the health store from GEMINI_KEY_STORE:
+    'memory', 'sqlite' / 'sqlite:///path/to.db', or 'package.module:ClassName'
+    for a production backend exposing snapshot() and record().
+    """
+    spec = spec if spec is not None else os.getenv('GEMINI_KEY_STORE', 'sqlite')
+    if spec == 'memory':
+        return MemoryHealthStore()
+    if spec == 'sqlite':
+        return SQLiteHealthStore()
+    if spec.startswith('sqlite:///'):
+        return SQLiteHealthStore(spec[len('sqlite:///'):])
+    module_name, _, class_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+# =====================
+# KEY POOL
+# =====================
+
+class KeyLease:
+    """A single key checked out for the duration of one model call"""
+
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+        self.api_key = pool.keys[index]
+
+    @property
+    def model(self):
+        return self.pool.model_for(self.index)
+
+    def model_named(self, model_name):
+        return self.pool.model_for(self.index, model_name)
+
+
+class GeminiKeyPool:
+    def __init__(self, keys, model_name, store=None):
+        self.keys = list(keys)
+        self.key_ids = [key_id(k) for k in self.keys]
+        self.model_name = model_name
+        self.store = store or create_health_store()
+        self._models = {}
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def model_for(self, index, model_name=None):
+        """GenerativeModel bound to its own client for key `index` (cached)"""
+        model_name = model_name or self.model_name
+        cache_key = (index, model_name)
+        model = self._models.get(cache_key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(cache_key)
+                if model is None:
+                    manager = _ClientManager()
+                    manager.configure(api_key=self.keys[index])
+                    model = genai.GenerativeModel(model_name)
+                    # Bind the per-key client so the SDK never falls back to the global one
+                    model._client = manager.get_default_client('generative')
+                    self._models[cache_key] = model
+        return model
+
+    def health(self):
+        """Shared health state per key index"""
+        snapshot = self.store.snapshot(self.key_ids)
+        now = time.time()
+        result = []
+        for index, kid in enumerate(self.key_ids):
+            row = snapshot.get(kid, {})
+            total = row.get('ok_count', 0) + row.get('error_count', 0)
+            result.append({
+                'index': index,
+                'key_id': kid,
+                'cooling_down': row.get('cooldown_until', 0) > now,
+                'cooldown_until': row.get('cooldown_until', 0),
+                'error_rate': round(row.get('error_count', 0) / total, 3) if total else 0.0,
+                'latency_ms': row.get('latency_ms')
+            })
+        return result
+
+    def choose(self, exclude=()):
+        """Pick a healthy key: skip cooldowns, prefer low error rate, round-robin ties"""
+        start = next(self._round_robin) % len(self.keys)
+        candidates = []
+        for entry in self.health():
+            if entry['index'] in exclude or entry['cooling_down']:
+                continue
+            rotation = (entry['index'] - start) % len(self.keys)
+            candidates.append((round(entry['error_rate'], 1), rotation, entry['index']))
+        if not candidates:
+            return None
+        return min(candidates)[2]
+
+    @contextmanager
+    def lease(self, exclude=()):
+        """Check out a key; the outcome of the block is written back to the shared store"""
+        index = self.choose(exclude)
+        if index is None:
+            raise KeysExhaustedError("All Gemini keys exhausted")
+        kid = self.key_ids[index]
+        started = time.monotonic()
+        try:
+            yield KeyLease(self, index)
+        except Exception as e:
+            cooldown_until = None
+            if is_quota_error(e):
+                cooldown_until = time.time() + KEY_COOLDOWN_SECONDS
+                logger.error(f"Quota exceeded on Key {index}. Cooling down for {KEY_COOLDOWN_SECONDS}s")
+            self.store.record(kid, ok=False, cooldown_until=cooldown_until)
+            raise
+        else:
+            self.store.record(kid, ok=True, latency_ms=(time.monotonic() - started) * 1000)
@@ -0,0 +1,97 @@
+"""
+Google ID-token verification with cached signing certs.
+
+google.oauth2.id_token fetches Google's certs on every call. Here the verifier
+is built once: certs are fetched over a pooled requests.Session and reused
+until their Cache-Control max-age runs out, and a verified credential is
+memoized until its own `exp`, so a client retrying the same sign-in costs
+nothing. GOOGLE_CERTS_URL can point at a local stub (stub_google_certs.py).
+"""
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from google.oauth2 import id_token
+from google.auth.transport import requests as google_requests
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = os.getenv('GOOGLE_CERTS_URL', 'https://www.googleapis.com/oauth2/v1/certs')
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+# Used when the cert response carries no max-age
+DEFAULT_CERTS_TTL_SECONDS = 3600
+MAX_MEMOIZED_TOKENS = 1024
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+class CachingRequest:
+    """google.auth transport over a pooled session that caches GET responses per Cache-Control"""
+
+    def __init__(self, session=None):
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self._request = google_requests.Request(session=session)
+        self._cache = {}    # url -> (response, expires_at)
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def __call__(self, url, method='GET', body=None, headers=None, timeout=10, **kwargs):
+        if method != 'GET':
+            return self._request(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached and cached[1] > time.time():
+                return cached[0]
+            # Fetch under the lock so a burst of cold logins triggers one download
+            response = self._request(url, method='GET', headers=headers, timeout=timeout, **kwargs)
+            self.fetches += 1
+            if response.status == 200:
+                match = _MAX_AGE.search(response.headers.get('cache-control', ''))
+                ttl = int(match.group(1)) if match else DEFAULT_CERTS_TTL_SECONDS
+                self._cache[url] = (response, time.time() + ttl)
+            return response
+
+
+class GoogleTokenVerifier:
+    def __init__(self, client_id, certs_url=GOOGLE_CERTS_URL, transport=None,
+                 max_memoized=MAX_MEMOIZED_TOKENS, clock_skew_seconds=10):
+        self.client_id = client_id
+        self.certs_url = certs_url
+        self.transport = transport or CachingRequest()
+        self.max_memoized = max_memoized
+        self.clock_skew_seconds = clock_skew_seconds
+        self._verified = OrderedDict()   # sha256(credential) -> idinfo
+        self._lock = threading.Lock()
+
+    def verify(self, credential):
+        """Decoded claims of a valid Google ID token; raises ValueError if it is invalid"""
+        digest = hashlib.sha256(credential.encode('utf-8')).hexdigest()
+        now = time.time()
+        with self._lock:
+            idinfo = self._verified.get(digest)
+            if idinfo is not None:
+                if idinfo.get('exp', 0) > now:
+                    self._verified.move_to_end(digest)
+                    return idinfo
+                del self._verified[digest]
+
+        idinfo = id_token.verify_token(credential, self.transport, audience=self.client_id,
+                                       certs_url=self.certs_url, clock_skew_in_seconds=self.clock_skew_seconds)
+        if idinfo.get('iss') not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+
+        with self._lock:
+            self._verified[digest] = idinfo
+            while len(self._verified) > self.max_memoized:
+                self._verified.popitem(last=False)
+        return idinfo
@@ -0,0 +1,180 @@
+"""
+Attendance and payroll listings for the HR endpoints.
+
+Every listing is a single SELECT joining the HR table with users and
+projecting only the user columns the views show (name, role, department),
+instead of one User lookup per row. Monthly attendance counts are
+aggregated in SQL with SUM(CASE ...) grouped by employee.
+
+Dates, clock times and payroll months are typed columns; the API keeps the
+original text formats (YYYY-MM-DD, HH:MM AM/PM, "October 2024"), parsed and
+formatted here and in the models' to_dict.
+
+Query args understood by the helpers:
+    date         one day, YYYY-MM-DD (default today)
+    from, to     inclusive day range, YYYY-MM-DD (at most HR_MAX_RANGE_DAYS days)
+    month        YYYY-MM for attendance summaries, e.g. 2024-10
+    department   only employees of this department
+    limit, cursor  paging for attendance listings (see utils/pagination.py)
+"""
+import os
+import calendar
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, case, and_, or_
+
+from models import db, User, Attendance, Payroll
+from utils.pagination import PaginationError, parse_limit, encode_cursor, decode_cursor
+
+HR_MAX_RANGE_DAYS = int(os.getenv('HR_MAX_RANGE_DAYS', 92))
+ATTENDANCE_STATUSES = ['present', 'late', 'absent', 'half_day']
+
+
+class HRQueryError(ValueError):
+    pass
+
+
+def _parse_day(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise HRQueryError(f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+def date_range(args):
+    """(first day, last day) as dates from ?date= or ?from=&to= (default today)"""
+    if args.get('from') or args.get('to'):
+        start = _parse_day(args.get('from') or args.get('to'), 'from')
+        end = _parse_day(args.get('to') or args.get('from'), 'to')
+        if end < start:
+            raise HRQueryError("'to' is before 'from'")
+        if (end - start).days + 1 > HR_MAX_RANGE_DAYS:
+            raise HRQueryError(f'Date range is limited to {HR_MAX_RANGE_DAYS} days')
+    else:
+        start = end = _parse_day(args.get('date'), 'date') if args.get('date') else datetime.now().date()
+    return start, end
+
+
+def month_range(month):
+    """(first day, last day) as dates for a YYYY-MM month"""
+    try:
+        first = datetime.strptime(month, '%Y-%m').date()
+    except (TypeError, ValueError):
+        raise HRQueryError("'month' must be in YYYY-MM format")
+    last = first + timedelta(days=calendar.monthrange(first.year, first.month)[1] - 1)
+    return first, last
+
+
+def parse_clock(value, name='check_in'):
+    """A time of day from 'HH:MM AM/PM' (or 24-hour 'HH:MM')"""
+    for fmt in ('%I:%M %p', '%H:%M', '%H:%M:%S'):
+        try:
+            return datetime.strptime(str(value).strip().upper(), fmt).time()
+        except ValueError:
+            continue
+    raise HRQueryError(f"'{name}' must be a time like 09:30 AM")
+
+
+def parse_payroll_month(value, year=None):
+    """(year, month number) from "October 2024", "2024-10", or a month name / number plus `year`"""
+    text = str(value or '').strip()
+    for fmt in ('%B %Y', '%b %Y', '%Y-%m'):
+        try:
+            parsed = datetime.strptime(text, fmt)
+            return parsed.year, parsed.month
+        except ValueError:
+            continue
+    if year is not None:
+        for fmt in ('%B', '%b', '%m'):
+            try:
+                return int(year), datetime.strptime(text, fmt).month
+            except ValueError:
+                continue
+    raise HRQueryError("'month' must look like \"October 2024\" or 2024-10")
+
+
+def attendance_page(start, end, args, department=None, labels=('name', 'role')):
+    """
+    One page of attendance rows for [start, end] (newest day first, then by name),
+    with the employee's name and role under `labels`. Same shape and limit/cursor
+    args as utils.pagination.paginate; the cursor carries (date, name, id).
+    """
+    limit = parse_limit(args.get('limit'))
+    query = db.select(Attendance, User.name, User.role, User.department)\
+        .join(User, User.id == Attendance.user_id)\
+        .where(Attendance.date.between(start, end))
+    if department:
+        query = query.where(User.department == department)
+    if args.get('cursor'):
+        sort, after, row_id = decode_cursor(args['cursor'])
+        try:
+            day, name = datetime.strptime(after[0], '%Y-%m-%d').date(), after[1]
+        except (TypeError, ValueError, IndexError):
+            raise PaginationError('Invalid cursor')
+        if sort != 'attendance':
+            raise PaginationError('cursor was issued for a different listing')
+        query = query.where(or_(
+            Attendance.date < day,
+            and_(Attendance.date == day, or_(User.name > name, and_(User.name == name, Attendance.id > row_id)))))
+    query = query.order_by(Attendance.date.desc(), User.name, Attendance.id).limit(limit + 1)
+
+    rows = db.session.execute(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    name_key, role_key = labels
+    items = []
+    for log, name, role, dept in rows:
+        row = log.to_dict()
+        row[name_key] = name
+        row[role_key] = role
+        row['department'] = dept
+        items.append(row)
+    next_cursor = None
+    if has_more:
+        last, last_name = rows[-1][0], rows[-1][1]
+        next_cursor = encode_cursor('attendance', [last.date.isoformat(), last_name], last.id)
+    return {'items': items, 'limit': limit, 'next_cursor': next_cursor, 'has_more': has_more}
+
+
+def payroll_listing(month, department=None, labels=('name', 'role')):
+    """Payroll rows for `month` ("October 2024") with the employee's name and role under `labels`"""
+    year, month_number = parse_payroll_month(month)
+    query = db.select(Payroll, User.name, User.role, User.department)\
+        .join(User, User.id == Payroll.user_id)\
+        .where(Payroll.year == year, Payroll.month == month_number)
+    if department:
+        query = query.where(User.department == department)
+    query = query.order_by(User.name, Payroll.id)
+
+    name_key, role_key = labels
+    results = []
+    for record, name, role, dept in db.session.execute(query):
+        row = record.to_dict()
+        row[name_key] = name
+        row[role_key] = role
+        row['department'] = dept
+        results.append(row)
+    return results
+
+
+def attendance_summary(start, end, department=None):
+    """Per-employee status counts over [start, end], aggregated in one GROUP BY"""
+    counts = [func.sum(case((Attendance.status == status, 1), else_=0)).label(status)
+              for status in ATTENDANCE_STATUSES]
+    query = db.select(User.id, User.name, User.role, User.department,
+                      func.count(Attendance.id).label('days_recorded'), *counts)\
+        .join(Attendance, Attendance.user_id == User.id)\
+        .where(Attendance.date.between(start, end))\
+        .group_by(User.id, User.name, User.role, User.department)
+    if department:
+        query = query.where(User.department == department)
+    query = query.order_by(User.name, User.id)
+
+    return [{
+        'user_id': row.id,
+        'name': row.name,
+        'role': row.role,
+        'department': row.department,
+        'days_recorded': row.days_recorded,
+        **{status: int(getattr(row, status) or 0) for status in ATTENDANCE_STATUSES}
+    } for row in db.session.execute(query)]
@@ -0,0 +1,108 @@
+"""
+Incremental readers for large JSON-array and NDJSON files.
+
+A file is read in fixed-size blocks and yielded one record at a time with
+json.JSONDecoder.raw_decode, so memory use depends on the largest record,
+not the file size. Files whose first non-blank character is '[' are read as
+a JSON array; anything else as newline-delimited JSON. Each record comes with
+the byte offset just past it, so a reader can seek back there to resume.
+"""
+import io
+import json
+import codecs
+
+READ_BLOCK_CHARS = 1 << 16
+
+_decoder = json.JSONDecoder()
+_SEPARATORS = ' \t\r\n,'
+
+
+def _utf8_len(text):
+    return len(text.encode('utf-8'))
+
+
+def _iter_array(f, buffer, offset):
+    """buffer: text from inside the array (after '[' or a record) that starts at byte `offset`"""
+    pos = 0
+    eof = False
+    while True:
+        # Skip separators between elements (all one byte)
+        while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+            pos += 1
+            offset += 1
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+        try:
+            record, end = _decoder.raw_decode(buffer, pos)
+            # A number may be cut off at the block edge; only trust it once more input is in
+            complete = end < len(buffer) or eof or isinstance(record, (dict, list, str))
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            block = f.read(READ_BLOCK_CHARS)
+            eof = not block
+            # Drop the consumed prefix only when refilling, not per record
+            buffer = buffer[pos:] + block
+            pos = 0
+            if eof and not buffer.strip():
+                raise json.JSONDecodeError('Unterminated JSON array', buffer, 0)
+            continue
+        offset += _utf8_len(buffer[pos:end])
+        yield record, offset
+        pos = end
+
+
+def _iter_ndjson(f, pending, offset):
+    while True:
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            offset += _utf8_len(line) + 1
+            if line.strip():
+                yield json.loads(line), offset
+        block = f.read(READ_BLOCK_CHARS)
+        if not block:
+            break
+        pending += block
+    if pending.strip():
+        yield json.loads(pending), offset + _utf8_len(pending)
+
+
+def iter_json_records(path, offset=0):
+    """
+    Yield (record, end offset) for the elements of a JSON array file, or the
+    lines of an NDJSON file. The end offset is the byte position just past the
+    record; passing it back as `offset` resumes with the next record without
+    decoding the ones before it.
+    """
+    with open(path, 'rb') as raw:
+        start = len(codecs.BOM_UTF8) if raw.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8 else 0
+        raw.seek(start)
+        # newline='' keeps \r\n as is, so character counts map back to bytes
+        f = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        first_block = f.read(READ_BLOCK_CHARS)
+        while first_block and not first_block.strip():
+            block = f.read(READ_BLOCK_CHARS)
+            if not block:
+                return
+            first_block += block
+        if not first_block:
+            return
+        is_array = first_block.lstrip()[0] == '['
+
+        if offset:
+            # A UTF-8 position with no pending decoder state is its own seek cookie
+            f.seek(offset)
+            buffer = f.read(READ_BLOCK_CHARS)
+        elif is_array:
+            head = first_block.index('[') + 1
+            buffer, offset = first_block[head:], start + _utf8_len(first_block[:head])
+        else:
+            buffer, offset = first_block, start
+
+        if is_array:
+            yield from _iter_array(f, buffer, offset)
+        else:
+            yield from _iter_ndjson(f, buffer, offset)
@@ -0,0 +1,243 @@
+"""
+Sliding-window login throttle keyed by client IP and by email per client IP.
+
+Login runs bcrypt on every attempt, so unthrottled credential stuffing is a CPU
+DoS. A blocked key is rejected before any DB lookup or bcrypt call. Only
+failed attempts are counted, so successful logins from a whole office behind
+one NAT never block it. The email limit is kept per (email, IP): wrong
+passwords for an account only block that account from the IP sending them,
+so an attacker cannot lock its owner out from elsewhere. Guessing one account
+from many IPs is bounded by each IP's own limit. A key over its limit is
+blocked with exponential backoff (base, 2x, 4x, ... up to a cap). A successful
+login clears the email key for that IP.
+
+Attempt logs and blocks live in a pluggable backend (LOGIN_THROTTLE_STORE):
+'memory' for one process, 'sqlite' to share across workers on one host, or
+'package.module:ClassName' for a shared service (Redis, ...).
+"""
+import os
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+import importlib
+from collections import defaultdict, deque
+
+logger = logging.getLogger(__name__)
+
+LOGIN_IP_LIMIT = int(os.getenv('LOGIN_IP_LIMIT', 20))
+LOGIN_IP_WINDOW_SECONDS = int(os.getenv('LOGIN_IP_WINDOW_SECONDS', 60))
+LOGIN_EMAIL_LIMIT = int(os.getenv('LOGIN_EMAIL_LIMIT', 5))
+LOGIN_EMAIL_WINDOW_SECONDS = int(os.getenv('LOGIN_EMAIL_WINDOW_SECONDS', 300))
+LOGIN_BACKOFF_BASE_SECONDS = int(os.getenv('LOGIN_BACKOFF_BASE_SECONDS', 30))
+LOGIN_BACKOFF_MAX_SECONDS = int(os.getenv('LOGIN_BACKOFF_MAX_SECONDS', 3600))
+
+
+# =====================
+# BACKENDS
+# =====================
+
+class MemoryThrottleStore:
+    """Process-local store (single worker / development)"""
+
+    # Sweep idle keys every this many hits so memory stays bounded under a spray of IPs
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._hits = defaultdict(deque)
+        self._blocks = {}   # key -> (blocked_until, strikes)
+        self._lock = threading.Lock()
+        self._since_sweep = 0
+
+    def hit(self, key, now, window):
+        """Record a failed attempt; returns those for `key` within the last `window` seconds"""
+        with self._lock:
+            hits = self._hits[key]
+            hits.append(now)
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+            self._since_sweep += 1
+            if self._since_sweep >= self.SWEEP_EVERY:
+                self._sweep(now, window)
+            return len(hits)
+
+    def _sweep(self, now, window):
+        self._since_sweep = 0
+        for key in [k for k, h in self._hits.items() if not h or h[-1] <= now - window]:
+            del self._hits[key]
+        for key in [k for k, (until, _) in self._blocks.items() if until < now - LOGIN_BACKOFF_MAX_SECONDS]:
+            del self._blocks[key]
+
+    def get_block(self, key):
+        with self._lock:
+            return self._blocks.get(key, (0.0, 0))
+
+    def set_block(self, key, blocked_until, strikes):
+        """Block `key` and clear its attempt log, so a fresh window starts when the block ends"""
+        with self._lock:
+            self._blocks[key] = (blocked_until, strikes)
+            self._hits.pop(key, None)
+
+    def reset(self, key):
+        with self._lock:
+            self._hits.pop(key, None)
+            self._blocks.pop(key, None)
+
+
+class SQLiteThrottleStore:
+    """Store shared by every process on the host through one SQLite file"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(tempfile.gettempdir(), 'urbaneye_login_throttle.db')
+        self._since_sweep = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS login_attempts (key TEXT NOT NULL, ts REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_login_attempts_key_ts ON login_attempts (key, ts)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS login_blocks (
+                    key TEXT PRIMARY KEY,
+                    blocked_until REAL NOT NULL,
+                    strikes INTEGER NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def hit(self, key, now, window):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM login_attempts WHERE key = ? AND ts <= ?", (key, now - window))
+            conn.execute("INSERT INTO login_attempts (key, ts) VALUES (?, ?)", (key, now))
+            count = conn.execute("SELECT COUNT(*) FROM login_attempts WHERE key = ?", (key,)).fetchone()[0]
+            self._since_sweep += 1
+            if self._since_sweep >= MemoryThrottleStore.SWEEP_EVERY:
+                # Keys that never come back are otherwise never pruned
+                self._since_sweep = 0
+                horizon = now - max(window, LOGIN_BACKOFF_MAX_SECONDS)
+                conn.execute("DELETE FROM login_attempts WHERE ts <= ?", (horizon,))
+                conn.execute("DELETE FROM login_blocks WHERE blocked_until <= ?", (horizon,))
+            return count
+
+    def get_block(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT blocked_until, strikes FROM login_blocks WHERE key = ?", (key,)).fetchone()
+        return row if row else (0.0, 0)
+
+    def set_block(self, key, blocked_until, strikes):
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO login_blocks (key, blocked_until, strikes) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET blocked_until = excluded.blocked_until, strikes = excluded.strikes
+            """, (key, blocked_until, strikes))
+            conn.execute("DELETE FROM login_attempts WHERE key = ?", (key,))
+
+    def reset(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM login_attempts WHERE key = ?", (key,))
+            conn.execute("DELETE FROM login_blocks WHERE key = ?", (key,))
+
+
+def create_throttle_store(spec=None):
+    """
+    Build the backend from LOGIN_THROTTLE_STORE:
+    'memory', 'sqlite' / 'sqlite:///path/to.db', or 'package.module:ClassName'
+    for a shared backend exposing hit(), get_block(), set_block() and reset().
+    """
+    spec = spec if spec is not None else os.getenv('LOGIN_THROTTLE_STORE', 'sqlite')
+    if spec == 'memory':
+        return MemoryThrottleStore()
+    if spec == 'sqlite':
+        return SQLiteThrottleStore()
+    if spec.startswith('sqlite:///'):
+        return SQLiteThrottleStore(spec[len('sqlite:///'):])
+    module_name, _, class_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+# =====================
+# THROTTLE
+# =====================
+
+class LoginThrottle:
+    def __init__(self, store=None, rules=None,
+                 backoff_base=LOGIN_BACKOFF_BASE_SECONDS, backoff_max=LOGIN_BACKOFF_MAX_SECONDS):
+        self.store = store or create_throttle_store()
+        # scope -> (limit, window seconds)
+        self.rules = rules or {
+            'ip': (LOGIN_IP_LIMIT, LOGIN_IP_WINDOW_SECONDS),
+            'email': (LOGIN_EMAIL_LIMIT, LOGIN_EMAIL_WINDOW_SECONDS),
+        }
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._counts = defaultdict(int)   # (scope, outcome) -> count
+        self._lock = threading.Lock()
+
+    def _keys(self, ip, email):
+        keys = []
+        if ip:
+            keys.append(('ip', f'ip:{ip}'))
+        if email:
+            keys.append(('email', f'email:{email.strip().lower()}|ip:{ip or ""}'))
+        return keys
+
+    def _count(self, scope, outcome):
+        with self._lock:
+            self._counts[(scope, outcome)] += 1
+
+    def acquire(self, ip, email):
+        """
+        Check a login attempt against existing blocks. Returns 0 if it may proceed,
+        otherwise the seconds until the blocking key may try again.
+        """
+        now = time.time()
+        for scope, key in self._keys(ip, email):
+            blocked_until, _ = self.store.get_block(key)
+            if blocked_until > now:
+                self._count(scope, 'blocked')
+                return int(blocked_until - now) + 1
+        self._count('all', 'allowed')
+        return 0
+
+    def succeeded(self, ip, email):
+        """Clear the (email, IP) key after a successful login"""
+        for scope, key in self._keys(ip, email):
+            if scope == 'email':
+                self.store.reset(key)
+        self._count('all', 'success')
+
+    def failed(self, ip, email):
+        """
+        Count a failed attempt against the IP and (email, IP) keys, blocking a key
+        that goes over its limit. Returns the block length in seconds, or 0.
+        """
+        self._count('all', 'failure')
+        now = time.time()
+        delay = 0
+        for scope, key in self._keys(ip, email):
+            limit, window = self.rules[scope]
+            if self.store.hit(key, now, window) > limit:
+                blocked_until, strikes = self.store.get_block(key)
+                # Strikes escalate while blocks keep recurring; a long quiet spell resets them
+                strikes = strikes + 1 if blocked_until > now - self.backoff_max else 1
+                key_delay = min(self.backoff_base * 2 ** (strikes - 1), self.backoff_max)
+                self.store.set_block(key, now + key_delay, strikes)
+                self._count(scope, 'blocked')
+                logger.warning(f"Login throttle: {key} blocked for {key_delay}s (strike {strikes})")
+                delay = max(delay, key_delay)
+        return delay
+
+    def render_prometheus(self):
+        lines = [
+            '# HELP login_throttle_total Login attempts by throttle scope and outcome',
+            '# TYPE login_throttle_total counter',
+        ]
+        with self._lock:
+            for (scope, outcome), value in sorted(self._counts.items()):
+                lines.append(f'login_throttle_total{{scope="{scope}",outcome="{outcome}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        with self._lock:
+            return {f'{scope}.{outcome}': value for (scope, outcome), value in self._counts.items()}
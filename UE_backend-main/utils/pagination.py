@@ -0,0 +1,118 @@
+"""
+Keyset pagination and whitelisted filters for list endpoints.
+
+Query args understood by paginate():
+    limit          page size (default PAGE_DEFAULT_LIMIT, capped at PAGE_MAX_LIMIT)
+    cursor         opaque token from the previous page's `next_cursor`
+    sort           one of the endpoint's sort keys, '-' prefix for descending
+    include_total  'true' to add `total` (one COUNT over the filtered query)
+    <filter>       equality filter on a whitelisted column, e.g. ?status=paid
+
+Pages continue from the last row's (sort value, id) instead of an OFFSET, so
+page N costs the same as page 1 and rows inserted meanwhile do not shift pages.
+"""
+import os
+import json
+import base64
+import binascii
+
+from sqlalchemy import and_, or_, func
+
+PAGE_DEFAULT_LIMIT = int(os.getenv('PAGE_DEFAULT_LIMIT', 50))
+PAGE_MAX_LIMIT = int(os.getenv('PAGE_MAX_LIMIT', 200))
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(sort, value, row_id):
+    raw = json.dumps([sort, value, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(sort, value, row_id) from a cursor; raises PaginationError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort, value, row_id = json.loads(raw)
+        return sort, value, row_id
+    except (binascii.Error, ValueError, TypeError):
+        raise PaginationError('Invalid cursor')
+
+
+def parse_limit(value):
+    if value in (None, ''):
+        return PAGE_DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be at least 1')
+    return min(limit, PAGE_MAX_LIMIT)
+
+
+def paginate(query, model, args, sort_keys, default_sort, filters=None, serialize=None, count_by_default=False):
+    """
+    One page of `query`.
+
+    sort_keys:  {name: column} the client may sort by; ties are broken by `model.id`
+    filters:    {arg name: column} for whitelisted equality filters
+    Returns {'items', 'limit', 'next_cursor', 'has_more'} plus 'total' when requested.
+    """
+    filters = filters or {}
+    serialize = serialize or (lambda row: row.to_dict())
+
+    for name, column in filters.items():
+        value = args.get(name)
+        if value not in (None, ''):
+            query = query.filter(column == value)
+
+    sort = args.get('sort') or default_sort
+    descending = sort.startswith('-')
+    sort_name = sort.lstrip('-')
+    if sort_name not in sort_keys:
+        raise PaginationError(f'sort must be one of: {sorted(sort_keys)} (prefix with - for descending)')
+    column = sort_keys[sort_name]
+    limit = parse_limit(args.get('limit'))
+
+    total = None
+    include_total = args.get('include_total')
+    if (include_total is None and count_by_default) or str(include_total).lower() in ('1', 'true', 'yes'):
+        # Count before the cursor condition: total is for the whole filtered listing
+        total = query.order_by(None).with_entities(func.count(model.id)).scalar()
+
+    page = query
+    cursor = args.get('cursor')
+    if cursor:
+        cursor_sort, value, row_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise PaginationError('cursor was issued for a different sort')
+        if descending:
+            page = page.filter(or_(column < value, and_(column == value, model.id < row_id)))
+        else:
+            page = page.filter(or_(column > value, and_(column == value, model.id > row_id)))
+
+    if descending:
+        page = page.order_by(None).order_by(column.desc(), model.id.desc())
+    else:
+        page = page.order_by(None).order_by(column.asc(), model.id.asc())
+    rows = page.limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, column.key), last.id)
+
+    result = {
+        'items': [serialize(row) for row in rows],
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'has_more': has_more
+    }
+    if total is not None:
+        result['total'] = total
+    return result
@@ -0,0 +1,132 @@
+"""
+bcrypt hashing and verification on a bounded process pool.
+
+Each bcrypt call at 12 rounds burns ~250 ms of CPU. Running it inline lets a
+login burst take every core away from the rest of the app. Here the work goes
+to at most PASSWORD_HASH_WORKERS processes, and at most PASSWORD_HASH_QUEUE
+calls may wait for them; beyond that, callers get PasswordServiceBusy (503)
+instead of piling up. PASSWORD_HASH_WORKERS=0 hashes inline (scripts, tests).
+
+The work factor is BCRYPT_ROUNDS; hashes with a different factor are upgraded
+on the next successful login (see needs_rehash).
+"""
+import os
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.password_worker import worker_context, hash_one, hash_batch, check
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 64))
+PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT_SECONDS', 10))
+
+
+class PasswordServiceBusy(Exception):
+    """Too many hashing requests are already queued"""
+    pass
+
+
+def hash_rounds(hashed_password):
+    """Work factor encoded in a bcrypt hash ($2b$12$...), or None if unparseable"""
+    try:
+        return int(hashed_password.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordService:
+    def __init__(self, rounds=BCRYPT_ROUNDS, workers=PASSWORD_HASH_WORKERS,
+                 max_queued=PASSWORD_HASH_QUEUE, timeout=PASSWORD_HASH_TIMEOUT):
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(1, workers) + max_queued)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    # Workers must not inherit app state, DB connections or threads:
+                    # see utils/password_worker.py
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=worker_context())
+                    logger.info(f"Password hashing pool started ({self.workers} processes, {self.rounds} rounds)")
+        return self._pool
+
+    def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+        # Fail fast when the queue is full rather than parking the request thread
+        if not self._slots.acquire(blocking=False):
+            raise PasswordServiceBusy("Password hashing queue is full")
+        try:
+            try:
+                future = self._executor().submit(func, *args)
+            except BaseException:
+                self._slots.release()
+                raise
+            # The slot is held until the job finishes, not until the caller stops waiting:
+            # a timed-out call keeps running in the pool and still counts against the queue
+            future.add_done_callback(lambda _: self._slots.release())
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # The pool is saturated: report it like a full queue (503), not a crash
+            raise PasswordServiceBusy("Password hashing timed out")
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time
+            logger.error("Password hashing pool broke; restarting")
+            with self._pool_lock:
+                self._pool = None
+            raise
+
+    def hash(self, password, rounds=None):
+        return self._run(hash_one, password, rounds or self.rounds)
+
+    def hash_many(self, passwords, rounds=None, batch_size=8):
+        """
+        Hash a list of passwords in parallel (bulk imports); results keep input order.
+        At most one batch per worker is queued at a time, so logins submitted meanwhile
+        wait for one batch at most instead of the whole import.
+        """
+        rounds = rounds or self.rounds
+        batches = [passwords[i:i + batch_size] for i in range(0, len(passwords), batch_size)]
+        if self.workers <= 0:
+            return [h for batch in batches for h in hash_batch(batch, rounds)]
+
+        executor = self._executor()
+        results = [None] * len(batches)
+        pending = {}
+        next_batch = 0
+        while next_batch < len(batches) or pending:
+            while next_batch < len(batches) and len(pending) < self.workers:
+                pending[executor.submit(hash_batch, batches[next_batch], rounds)] = next_batch
+                next_batch += 1
+            done, _ = wait(pending, timeout=self.timeout * batch_size, return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError("Bulk password hashing timed out")
+            for future in done:
+                results[pending.pop(future)] = future.result()
+        return [h for batch in results for h in batch]
+
+    def verify(self, password, hashed_password):
+        if not password or not hashed_password:
+            return False
+        return self._run(check, password, hashed_password)
+
+    def needs_rehash(self, hashed_password):
+        return hash_rounds(hashed_password) != self.rounds
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+password_service = PasswordService()
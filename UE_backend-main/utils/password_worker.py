@@ -0,0 +1,38 @@
+"""
+What runs inside the password hashing processes (see password_service.py).
+
+Only bcrypt is imported here, so the forkserver that starts the pool's workers
+preloads just this module, not the app. Workers are forked from that server
+and never inherit the app's threads, DB connections or Gemini clients.
+multiprocessing still imports the parent's main module in each new worker,
+once, at pool start. Under gunicorn that is gunicorn's launcher; under the
+dev server (`python app.py`) it is app.py, whose module-level setup then runs
+once per worker while app.run stays behind __main__.
+"""
+import multiprocessing
+
+import bcrypt
+
+
+# Task functions (top-level so they are picklable by reference)
+def hash_one(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def hash_batch(passwords, rounds):
+    return [hash_one(p, rounds) for p in passwords]
+
+
+def check(password, hashed_password):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    except ValueError:
+        # Malformed hash in the DB
+        return False
+
+
+def worker_context():
+    """Forkserver context for ProcessPoolExecutor(mp_context=...), preloaded with this module"""
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload([__name__])
+    return context
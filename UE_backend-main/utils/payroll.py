@@ -0,0 +1,176 @@
+"""
+Monthly payroll run for all department staff in one pass.
+
+One query joins the staff (dept_head / field_officer users) with their
+EmployeeProfile basic salary and their attendance counts for the month,
+aggregated in SQL. Deductions, bonus and net pay are then computed with NumPy
+over the whole staff set, and the Payroll rows are written in one transaction
+with an executemany INSERT ... ON CONFLICT (user_id, year, month) DO UPDATE
+that leaves paid rows alone. The unique key means concurrent runs (the CLI and
+POST /hr/payroll/run, or two admins) cannot give an employee two rows for a
+month.
+
+Rules (per employee, per month):
+    daily rate   basic / PAYROLL_WORKING_DAYS
+    deductions   daily rate x (absent + 0.5 x half_day + PAYROLL_LATE_PENALTY_DAYS x late), at most basic
+    bonus        basic x PAYROLL_ATTENDANCE_BONUS_RATE with attendance marked and no absent/late/half day
+    net          basic - deductions + bonus
+
+Re-running a month recomputes its pending rows in place; rows already marked
+paid are left untouched, so a run is idempotent.
+"""
+import os
+import time
+import uuid
+import logging
+
+import numpy as np
+from sqlalchemy import func, case
+
+from models import db, User, EmployeeProfile, Attendance, Payroll
+from utils.bulk_seed import dialect_insert
+from utils.hr_reports import month_range
+
+logger = logging.getLogger(__name__)
+
+PAYROLL_WORKING_DAYS = int(os.getenv('PAYROLL_WORKING_DAYS', 26))
+PAYROLL_LATE_PENALTY_DAYS = float(os.getenv('PAYROLL_LATE_PENALTY_DAYS', 0.25))
+PAYROLL_ATTENDANCE_BONUS_RATE = float(os.getenv('PAYROLL_ATTENDANCE_BONUS_RATE', 0.05))
+PAYROLL_CHUNK_SIZE = int(os.getenv('PAYROLL_CHUNK_SIZE', 2000))
+
+PAYROLL_ROLES = ['dept_head', 'field_officer']
+PAYROLL_CONFLICT_KEY = ['user_id', 'year', 'month']
+PAY_COLUMNS = ['base_salary', 'deductions', 'bonus', 'net_salary']
+# Basic salary for staff without an EmployeeProfile salary
+DEFAULT_BASIC_SALARY = {'dept_head': 85000.0, 'field_officer': 45000.0}
+
+
+def month_label(month):
+    """('October 2024', 2024, 10) for '2024-10'"""
+    first = month_range(month)[0]
+    return first.strftime('%B %Y'), first.year, first.month
+
+
+def _staff_rows(month, department=None):
+    """[(user_id, role, basic_salary, present, late, absent, half_day)] in one joined query"""
+    start, end = month_range(month)
+    counts = db.select(
+        Attendance.user_id,
+        func.sum(case((Attendance.status == 'present', 1), else_=0)).label('present'),
+        func.sum(case((Attendance.status == 'late', 1), else_=0)).label('late'),
+        func.sum(case((Attendance.status == 'absent', 1), else_=0)).label('absent'),
+        func.sum(case((Attendance.status == 'half_day', 1), else_=0)).label('half_day')
+    ).where(Attendance.date.between(start, end)).group_by(Attendance.user_id).subquery()
+    # A user may have more than one profile row; take one salary per user
+    salaries = db.select(EmployeeProfile.user_id, func.max(EmployeeProfile.basic_salary).label('basic_salary'))\
+        .group_by(EmployeeProfile.user_id).subquery()
+
+    query = db.select(User.id, User.role, salaries.c.basic_salary,
+                      func.coalesce(counts.c.present, 0), func.coalesce(counts.c.late, 0),
+                      func.coalesce(counts.c.absent, 0), func.coalesce(counts.c.half_day, 0))\
+        .outerjoin(salaries, salaries.c.user_id == User.id)\
+        .outerjoin(counts, counts.c.user_id == User.id)\
+        .where(User.role.in_(PAYROLL_ROLES))
+    if department:
+        query = query.where(User.department == department)
+    return db.session.execute(query).all()
+
+
+def upsert_payroll(rows, update_columns=PAY_COLUMNS, chunk_size=PAYROLL_CHUNK_SIZE):
+    """
+    Insert Payroll `rows` (full column dicts), or on an existing (user_id, year,
+    month) row set `update_columns` unless that row is already paid. Does not commit.
+    """
+    statement = dialect_insert(Payroll)
+    statement = statement.on_conflict_do_update(
+        index_elements=PAYROLL_CONFLICT_KEY,
+        set_={column: statement.excluded[column] for column in update_columns},
+        where=Payroll.__table__.c.status != 'paid')
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(statement, rows[start:start + chunk_size])
+    return len(rows)
+
+
+def compute_pay(basic, present, late, absent, half_day):
+    """Vectorized rules over equal-length arrays; returns (deductions, bonus, net) rounded to paise"""
+    daily = basic / PAYROLL_WORKING_DAYS
+    lost_days = absent + 0.5 * half_day + PAYROLL_LATE_PENALTY_DAYS * late
+    deductions = np.minimum(daily * lost_days, basic)
+    perfect = (present > 0) & (late == 0) & (absent == 0) & (half_day == 0)
+    bonus = np.where(perfect, basic * PAYROLL_ATTENDANCE_BONUS_RATE, 0.0)
+    net = basic - deductions + bonus
+    return np.round(deductions, 2), np.round(bonus, 2), np.round(net, 2)
+
+
+def run_payroll(month, department=None, dry_run=False):
+    """
+    Compute and upsert the Payroll rows of every department staff member for
+    `month` (YYYY-MM). Returns a summary with created/updated/skipped_paid counts and totals.
+    """
+    started = time.time()
+    label, year, month_number = month_label(month)
+    rows = _staff_rows(month, department)
+
+    user_ids = [r[0] for r in rows]
+    basic = np.array([r[2] if r[2] is not None else DEFAULT_BASIC_SALARY.get(r[1], 0.0) for r in rows], dtype=float)
+    present, late, absent, half_day = (np.array([r[i] for r in rows], dtype=float) for i in range(3, 7))
+    deductions, bonus, net = compute_pay(basic, present, late, absent, half_day)
+
+    # Status of the month's existing rows, for the summary; the upsert itself re-checks 'paid'
+    existing = dict(db.session.execute(
+        db.select(Payroll.user_id, Payroll.status).where(Payroll.year == year, Payroll.month == month_number)).all())
+
+    rows = []
+    created = updated = 0
+    computed = np.ones(len(user_ids), dtype=bool)
+    for i, user_id in enumerate(user_ids):
+        status = existing.get(user_id)
+        if status == 'paid':
+            computed[i] = False
+            continue
+        if status is None:
+            created += 1
+        else:
+            updated += 1
+        rows.append({
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'month': month_number,
+            'year': year,
+            'base_salary': float(basic[i]),
+            'deductions': float(deductions[i]),
+            'bonus': float(bonus[i]),
+            'net_salary': float(net[i]),
+            'status': 'pending',
+            'payment_date': None
+        })
+
+    if not dry_run:
+        try:
+            upsert_payroll(rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    skipped_paid = int((~computed).sum())
+    summary = {
+        'month': label,
+        'year': year,
+        'department': department,
+        'employees': len(user_ids),
+        'created': created,
+        'updated': updated,
+        'skipped_paid': skipped_paid,
+        'totals': {
+            'base_salary': round(float(basic[computed].sum()), 2),
+            'deductions': round(float(deductions[computed].sum()), 2),
+            'bonus': round(float(bonus[computed].sum()), 2),
+            'net_salary': round(float(net[computed].sum()), 2)
+        },
+        'dry_run': dry_run,
+        'duration_ms': int((time.time() - started) * 1000)
+    }
+    logger.info(f"Payroll run {label}{f' ({department})' if department else ''}: {summary['created']} created, "
+                f"{summary['updated']} updated, {skipped_paid} already paid in {summary['duration_ms']}ms")
+    return summary
@@ -0,0 +1,201 @@
+"""
+Offline statistical risk predictor over the full report history (NumPy only).
+
+For every occupied grid cell and category it combines:
+- a spatio-temporal kernel density: reports are weighted by severity and an
+  exponential time decay, then smoothed over neighbouring cells with a Gaussian kernel
+- a recurrence rate: the decayed weight per effective day of the decay window, turned into
+  the probability of at least one new report within the horizon (Poisson)
+- a seasonality term: how often each category occurs in the current month
+  relative to its monthly average
+- optionally, recent weather (stored rolling aggregates): rain raises drainage /
+  waterlogging / pothole risk, heat days raise surface damage risk
+
+The output matches what GovPredictions returns: top-N prediction points plus a
+risk-scored grid. Everything is vectorized (bincount / unique / searchsorted), so
+1M reports score in well under a second on one core and no network is needed.
+"""
+import math
+import time
+
+import numpy as np
+
+SEVERITY_WEIGHTS = {'low': 0.5, 'medium': 1.0, 'high': 1.5, 'critical': 2.0}
+
+# Typical repair cost per category (INR)
+REPAIR_COST_INR = {
+    'pothole': 5000,
+    'sidewalk': 6000,
+    'infrastructure': 20000,
+    'traffic_signal': 15000,
+    'streetlight': 3000,
+    'garbage': 1500,
+    'illegal_dumping': 2500,
+    'construction_waste': 4000,
+    'sewage': 12000,
+    'drainage': 8000,
+    'waterlogging': 10000,
+}
+DEFAULT_REPAIR_COST_INR = 5000
+
+# Categories whose recurrence rises with recent rain / heat
+RAIN_SENSITIVE = {'pothole', 'drainage', 'waterlogging', 'sewage'}
+HEAT_SENSITIVE = {'pothole', 'sidewalk', 'infrastructure'}
+
+# Cell keys pack (row, col) into one int64
+_KEY_SHIFT = 1 << 22
+_KEY_OFFSET = 1 << 21
+
+
+class StatisticalRiskModel:
+    def __init__(self, cell_deg=0.01, kernel_radius=1, kernel_sigma=1.0,
+                 half_life_days=60, horizon_days=30):
+        self.cell_deg = cell_deg                # ~1.1 km at the equator
+        self.kernel_radius = kernel_radius      # neighbouring cells included in the density
+        self.kernel_sigma = kernel_sigma
+        self.half_life_days = half_life_days    # time decay of old reports
+        self.horizon_days = horizon_days        # probability window
+
+    def predict(self, lat, lng, ts, category_codes, categories, severity_weights,
+                now=None, top_n=5, max_cells=500, weather=None):
+        """
+        lat, lng, ts, severity_weights: float arrays; category_codes: int array indexing
+        `categories`; weather: optional weather_aggregates() dict.
+        Returns {'predictions': [...], 'grid': [...], 'stats': {...}}.
+        """
+        started = time.perf_counter()
+        now = now or time.time()
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        ts = np.asarray(ts, dtype=np.float64)
+        cat = np.asarray(category_codes, dtype=np.int64)
+        sev = np.asarray(severity_weights, dtype=np.float64)
+        n_cat = len(categories)
+        if lat.size == 0 or n_cat == 0:
+            return {'predictions': [], 'grid': [], 'stats': {'reports': 0, 'cells': 0, 'compute_ms': 0}}
+
+        # --- Time decay x severity ---
+        age_days = np.clip((now - ts) / 86400.0, 0, None)
+        weights = np.exp2(-age_days / self.half_life_days) * sev
+
+        # --- Seasonality: this month's share per category vs its monthly mean ---
+        months = ts.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64) % 12
+        per_month = np.bincount(cat * 12 + months, minlength=n_cat * 12).reshape(n_cat, 12)
+        current_month = int(np.datetime64(int(now), 's').astype('datetime64[M]').astype(np.int64) % 12)
+        season = np.clip((per_month[:, current_month] + 1.0) / (per_month.mean(axis=1) + 1.0), 0.5, 2.0)
+        rain_factor, heat_factor = weather_multipliers(categories, weather)
+
+        # --- Grid cells (only occupied ones) ---
+        rows = np.floor(lat / self.cell_deg).astype(np.int64) + _KEY_OFFSET
+        cols = np.floor(lng / self.cell_deg).astype(np.int64) + _KEY_OFFSET
+        cell_keys, inverse = np.unique(rows * _KEY_SHIFT + cols, return_inverse=True)
+        n_cells = cell_keys.size
+        cell_cat = np.bincount(inverse * n_cat + cat, weights=weights,
+                               minlength=n_cells * n_cat).reshape(n_cells, n_cat)
+        cell_counts = np.bincount(inverse * n_cat + cat, minlength=n_cells * n_cat).reshape(n_cells, n_cat)
+
+        # --- Spatial kernel density over neighbouring cells ---
+        cell_rows = cell_keys // _KEY_SHIFT
+        cell_cols = cell_keys % _KEY_SHIFT
+        r = self.kernel_radius
+        offsets = [(dr, dc) for dr in range(-r, r + 1) for dc in range(-r, r + 1)]
+        kernel = np.array([math.exp(-(dr * dr + dc * dc) / (2 * self.kernel_sigma ** 2)) for dr, dc in offsets])
+        kernel /= kernel.sum()
+        density = np.zeros_like(cell_cat)
+        for (dr, dc), k in zip(offsets, kernel):
+            neighbour = (cell_rows + dr) * _KEY_SHIFT + (cell_cols + dc)
+            pos = np.minimum(np.searchsorted(cell_keys, neighbour), n_cells - 1)
+            found = cell_keys[pos] == neighbour
+            density[found] += k * cell_cat[pos[found]]
+
+        # --- Recurrence rate -> probability within the horizon ---
+        # A steady stream of r reports/day decays to a total weight of r x (half life / ln 2),
+        # so that is the observation window. It is not shortened for young histories: a city
+        # with one report from today would otherwise read as ~30 events a month in that cell.
+        effective_days = self.half_life_days / math.log(2)
+        expected = density / effective_days * self.horizon_days * (season * rain_factor * heat_factor)[None, :]
+        probability = -np.expm1(-expected)                      # P(at least one) per category
+        cell_risk = 1.0 - np.prod(1.0 - probability, axis=1)    # any category
+        top_category = probability.argmax(axis=1)
+
+        center_lat = (cell_rows - _KEY_OFFSET + 0.5) * self.cell_deg
+        center_lng = (cell_cols - _KEY_OFFSET + 0.5) * self.cell_deg
+
+        def ranked(limit):
+            limit = min(limit, n_cells)
+            idx = np.argpartition(-cell_risk, limit - 1)[:limit]
+            return idx[np.argsort(-cell_risk[idx])]
+
+        predictions = []
+        for i in ranked(top_n):
+            c = int(top_category[i])
+            category = categories[c]
+            pct = int(round(probability[i, c] * 100))
+            level = 'High' if pct >= 70 else 'Medium' if pct >= 40 else 'Low'
+            monthly = expected[i, c] / self.horizon_days * 30
+            factors = [f'Recurring {category.replace("_", " ")} reports']
+            if season[c] > 1.1:
+                factors.append('Seasonal peak')
+            if rain_factor[c] > 1.2:
+                factors.append(f"Heavy rain ({weather['rain_7d_mm']} mm in 7 days)")
+            if heat_factor[c] > 1.1:
+                factors.append(f"Heat stress ({weather['heat_days_30d']} heat days)")
+            if cell_counts[i].sum() > cell_counts[i, c]:
+                factors.append('Mixed issue cluster')
+            predictions.append({
+                'lat': round(float(center_lat[i]), 6),
+                'lng': round(float(center_lng[i]), 6),
+                'type': category.replace('_', ' ').title(),
+                'risk': f'{level} ({pct}%)',
+                'probability': pct,
+                'estimated_cost': int(REPAIR_COST_INR.get(category, DEFAULT_REPAIR_COST_INR) * (1 + probability[i, c])),
+                'reasoning': (f'{int(cell_counts[i, c])} past {category.replace("_", " ")} report(s) in this '
+                              f'~{self.cell_deg * 111:.1f} km cell; expected recurrence {monthly:.1f}/month '
+                              f'(seasonal factor {season[c]:.2f}).'),
+                'factors': factors
+            })
+
+        grid = [{
+            'lat': round(float(center_lat[i]), 6),
+            'lng': round(float(center_lng[i]), 6),
+            'risk': round(float(cell_risk[i]), 3),
+            'category': categories[int(top_category[i])]
+        } for i in ranked(max_cells)]
+
+        return {
+            'predictions': predictions,
+            'grid': grid,
+            'stats': {
+                'reports': int(lat.size),
+                'cells': int(n_cells),
+                'compute_ms': int((time.perf_counter() - started) * 1000)
+            }
+        }
+
+
+def weather_multipliers(categories, weather):
+    """Per-category (rain, heat) multipliers from weather_aggregates(); 1.0 when weather is unknown"""
+    rain = np.ones(len(categories))
+    heat = np.ones(len(categories))
+    if weather:
+        rain_boost = 1.0 + min((weather.get('rain_7d_mm') or 0) / 50.0, 1.0)
+        heat_boost = 1.0 + min((weather.get('heat_days_30d') or 0) / 20.0, 0.5)
+        for i, category in enumerate(categories):
+            if category in RAIN_SENSITIVE:
+                rain[i] = rain_boost
+            if category in HEAT_SENSITIVE:
+                heat[i] = heat_boost
+    return rain, heat
+
+
+def arrays_from_rows(rows):
+    """(lat, lng, created_at, category, severity) rows -> arrays for StatisticalRiskModel.predict"""
+    n = len(rows)
+    categories = {}
+    lat = np.fromiter((r[0] for r in rows), dtype=np.float64, count=n)
+    lng = np.fromiter((r[1] for r in rows), dtype=np.float64, count=n)
+    ts = np.fromiter((r[2] or 0 for r in rows), dtype=np.float64, count=n)
+    codes = np.fromiter((categories.setdefault(r[3] or 'general', len(categories)) for r in rows),
+                        dtype=np.int64, count=n)
+    sev = np.fromiter((SEVERITY_WEIGHTS.get(r[4], 1.0) for r in rows), dtype=np.float64, count=n)
+    return lat, lng, ts, codes, list(categories), sev
@@ -0,0 +1,210 @@
+"""
+Interval scheduler for background jobs, with a database lease so only one
+worker process runs a job at a time.
+
+Every gunicorn worker starts its own scheduler thread; they all tick, but a
+run only happens in whichever worker acquires the job's row in `job_locks`.
+Each acquisition gets its own token, so two threads of one worker (a tick and
+a request, say) exclude each other too, and only the holder can release.
+With `lock_per_target` the lease is taken per target instead (`<job>:<target>`,
+e.g. one row per city), held only while that target runs. Jobs can also be
+enqueued on demand (e.g. `?refresh=1`), which wakes the thread immediately;
+enqueue() reports whether the run was accepted. With `parallelism` > 1 the targets of a run (e.g. cities)
+execute concurrently on a bounded thread pool, each in its own app context, so
+one slow target does not delay the others.
+"""
+import os
+import time
+import uuid
+import queue
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, JobLock
+
+logger = logging.getLogger(__name__)
+
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lock(name, ttl, token=None):
+    """
+    Take the lease on `name` for ttl seconds. Returns the lease token, which
+    release_lock needs, or None if the lease is live under any other token,
+    including another thread of this process. Passing a token renews that
+    lease instead (None if it has expired and been taken since).
+    """
+    now = time.time()
+    try:
+        if token is not None:
+            updated = JobLock.query.filter_by(name=name, holder=token).update(
+                {'expires_at': now + ttl}, synchronize_session=False)
+            db.session.commit()
+            return token if updated else None
+        token = f"{HOLDER_ID}:{uuid.uuid4().hex[:8]}"
+        updated = JobLock.query.filter(JobLock.name == name, JobLock.expires_at < now).update(
+            {'holder': token, 'expires_at': now + ttl}, synchronize_session=False)
+        if not updated:
+            if db.session.get(JobLock, name) is not None:
+                db.session.rollback()
+                return None
+            db.session.add(JobLock(name=name, holder=token, expires_at=now + ttl))
+        db.session.commit()
+        return token
+    except IntegrityError:
+        # Another worker inserted the row first
+        db.session.rollback()
+        return None
+
+
+def release_lock(name, token):
+    JobLock.query.filter_by(name=name, holder=token).update({'expires_at': 0}, synchronize_session=False)
+    db.session.commit()
+
+
+class IntervalScheduler:
+    def __init__(self, app, name, job, interval, lock_ttl=None, targets=None, parallelism=1,
+                 lock_per_target=False):
+        """
+        job(target, trigger) is called inside an app context while holding the lock.
+        targets() lists what a scheduled tick should run (e.g. every city).
+        parallelism bounds how many targets run at once.
+        lock_per_target leases each target separately for at most lock_ttl seconds
+        (the longest a single run may take) instead of the whole job.
+        """
+        self.app = app
+        self.name = name
+        self.job = job
+        self.interval = interval
+        self.lock_ttl = lock_ttl or interval
+        self.targets = targets or (lambda: [None])
+        self.parallelism = max(1, parallelism)
+        self.lock_per_target = lock_per_target
+        self._pool = ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix=f"job-{name}") \
+            if self.parallelism > 1 else None
+        self._queue = queue.Queue()
+        self._pending = {}  # target -> lease token taken by enqueue (None without lock_per_target)
+        self._pending_lock = threading.Lock()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def target_lock(self, target):
+        return f"{self.name}:{target}"
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name=f"scheduler-{self.name}", daemon=True)
+            self._thread.start()
+            logger.info(f"Scheduler '{self.name}' started (every {self.interval}s, holder {HOLDER_ID})")
+
+    def enqueue(self, target=None):
+        """
+        Request an on-demand run; returns immediately. False if the run was not
+        accepted: the scheduler is not running, or (lock_per_target) another
+        run, in any worker or thread, holds the target's lease. The lease taken
+        here is kept for the run.
+        """
+        if self._thread is None:
+            return False
+        with self._pending_lock:
+            if target in self._pending:
+                return True
+            token = None
+            if self.lock_per_target:
+                token = acquire_lock(self.target_lock(target), self.lock_ttl)
+                if token is None:
+                    return False
+            self._pending[target] = token
+        self._queue.put(target)
+        return True
+
+    def run_locked(self, target, trigger):
+        """Run the job for one target now, in the calling thread; False if its lease is held elsewhere"""
+        return self._call(target, trigger)
+
+    def _loop(self):
+        next_run = time.time()
+        while True:
+            try:
+                targets, trigger = [self._queue.get(timeout=max(0, next_run - time.time()))], 'on_demand'
+            except queue.Empty:
+                targets, trigger = None, 'schedule'
+                next_run = time.time() + self.interval
+            with self.app.app_context():
+                try:
+                    if targets is not None and self.lock_per_target:
+                        # Run under the lease enqueue() took
+                        with self._pending_lock:
+                            token = self._pending.get(targets[0])
+                        self._call(targets[0], trigger, token)
+                    else:
+                        self.run_once(targets, trigger)
+                except Exception as e:
+                    logger.error(f"Scheduler '{self.name}' run failed: {e}", exc_info=True)
+                finally:
+                    if targets is not None:
+                        with self._pending_lock:
+                            token = self._pending.pop(targets[0], None)
+                        if token is not None:
+                            release_lock(self.target_lock(targets[0]), token)
+                    db.session.remove()
+
+    def run_once(self, targets=None, trigger='schedule'):
+        """Run the job for `targets` (default: all) if this run gets the lock"""
+        if self.lock_per_target:
+            return self._run_targets(targets, trigger)
+        token = acquire_lock(self.name, self.lock_ttl)
+        if token is None:
+            logger.info(f"Scheduler '{self.name}': another run holds the lock, skipping")
+            return False
+        try:
+            self._run_targets(targets, trigger)
+        finally:
+            release_lock(self.name, token)
+        return True
+
+    def _run_targets(self, targets, trigger):
+        targets = list(targets if targets is not None else self.targets())
+        if self._pool is None or len(targets) < 2:
+            for target in targets:
+                self._call(target, trigger)
+        else:
+            futures = [self._pool.submit(self._run_target, target, trigger) for target in targets]
+            for target, future in zip(targets, futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Scheduler '{self.name}' failed for {target}: {e}", exc_info=True)
+        return True
+
+    def _call(self, target, trigger, token=None):
+        """Run one target under its lease; with `token`, under that (already held) lease, renewed first"""
+        if not self.lock_per_target:
+            self.job(target, trigger)
+            return True
+        lock = self.target_lock(target)
+        held = acquire_lock(lock, self.lock_ttl, token)
+        if held is None:
+            logger.info(f"Scheduler '{self.name}': another run holds the lock for {target}, skipping")
+            return False
+        try:
+            self.job(target, trigger)
+        finally:
+            # A lease from enqueue() is released by the loop once the target leaves _pending
+            if token is None:
+                release_lock(lock, held)
+        return True
+
+    def _run_target(self, target, trigger):
+        # Pool threads need their own app context and scoped session
+        with self.app.app_context():
+            try:
+                self._call(target, trigger)
+            finally:
+                db.session.remove()
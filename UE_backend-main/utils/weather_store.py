@@ -0,0 +1,116 @@
+"""
+Local hourly weather history per city.
+
+A background job pulls hourly observations from Open-Meteo into
+`weather_observations`, asking only for the days missing since the last stored
+hour. Predictions read rolling aggregates (rain over 24h/7d, heat days, ...)
+computed in SQL from that table, so serving them needs no outbound call.
+"""
+import os
+import math
+import time
+import logging
+
+from sqlalchemy import func, case
+
+from models import db, WeatherObservation
+from utils.context_providers import http_session, OPEN_METEO_URL
+
+logger = logging.getLogger(__name__)
+
+WEATHER_BACKFILL_DAYS = min(int(os.getenv('WEATHER_BACKFILL_DAYS', 30)), 92) # Open-Meteo serves up to 92 past days
+HEAT_DAY_CELSIUS = float(os.getenv('HEAT_DAY_CELSIUS', 40))
+
+HOUR = 3600
+DAY = 86400
+
+
+def last_observed_at(city):
+    return db.session.query(func.max(WeatherObservation.observed_at)).filter_by(city=city).scalar()
+
+
+def backfill_weather(city, lat, lng, session=None, now=None):
+    """Fetch and store the hours missing for `city`; returns the number of rows inserted"""
+    now = int(now or time.time())
+    last = last_observed_at(city)
+    if last is None:
+        past_days = WEATHER_BACKFILL_DAYS
+    else:
+        past_days = min(WEATHER_BACKFILL_DAYS, math.ceil((now - last) / DAY) + 1)
+        if now - last < 2 * HOUR:
+            return 0
+
+    resp = (session or http_session).get(OPEN_METEO_URL, params={
+        'latitude': lat,
+        'longitude': lng,
+        'hourly': 'temperature_2m,rain,wind_speed_10m',
+        'past_days': past_days,
+        'forecast_days': 1,
+        'timeformat': 'unixtime',
+        'timezone': 'GMT'
+    }, timeout=15)
+    resp.raise_for_status()
+    hourly = resp.json().get('hourly', {})
+
+    # Only completed hours newer than what we already have
+    cutoff = now - HOUR
+    rows = [
+        {'city': city, 'observed_at': int(t), 'temperature': temp, 'rain': rain, 'wind_speed': wind}
+        for t, temp, rain, wind in zip(hourly.get('time', []), hourly.get('temperature_2m', []),
+                                       hourly.get('rain', []), hourly.get('wind_speed_10m', []))
+        if (last is None or t > last) and t <= cutoff
+    ]
+    if rows:
+        db.session.execute(db.insert(WeatherObservation), rows)
+        db.session.commit()
+    logger.info(f"Weather backfill for {city}: {len(rows)} new hour(s) ({past_days} day window)")
+    return len(rows)
+
+
+def weather_aggregates(city, now=None):
+    """Rolling aggregates over the stored history, or None if nothing is stored for `city`"""
+    now = int(now or time.time())
+    W = WeatherObservation
+    since_24h, since_7d, since_30d = now - DAY, now - 7 * DAY, now - 30 * DAY
+
+    row = db.session.query(
+        func.count(W.id),
+        func.max(W.observed_at),
+        func.sum(case((W.observed_at >= since_24h, W.rain), else_=0)),
+        func.sum(case((W.observed_at >= since_7d, W.rain), else_=0)),
+        func.max(case((W.observed_at >= since_24h, W.temperature))),
+        func.sum(case(((W.observed_at >= since_7d) & (W.rain > 0), 1), else_=0)),
+    ).filter(W.city == city, W.observed_at >= since_30d).one()
+    hours, last_hour, rain_24h, rain_7d, max_temp_24h, wet_hours_7d = row
+    if not hours:
+        return None
+
+    daily_max = db.session.query(func.max(W.temperature).label('max_temp'))\
+        .filter(W.city == city, W.observed_at >= since_30d)\
+        .group_by(W.observed_at // DAY).subquery()
+    heat_days_30d = db.session.query(func.count()).select_from(daily_max)\
+        .filter(daily_max.c.max_temp >= HEAT_DAY_CELSIUS).scalar()
+
+    latest = W.query.filter_by(city=city, observed_at=last_hour).first()
+    return {
+        'hours_stored_30d': hours,
+        'last_observed_at': last_hour,
+        'rain_24h_mm': round(rain_24h or 0, 1),
+        'rain_7d_mm': round(rain_7d or 0, 1),
+        'wet_hours_7d': int(wet_hours_7d or 0),
+        'max_temp_24h': max_temp_24h,
+        'heat_days_30d': heat_days_30d,
+        'latest': latest.to_dict() if latest else None
+    }
+
+
+def format_weather_context(agg):
+    """Prompt text for the LLM chain from weather_aggregates()"""
+    latest = agg['latest'] or {}
+    return (
+        f"Latest Temp: {latest.get('temperature')}°C\n"
+        f"Latest Rain: {latest.get('rain')} mm/h\n"
+        f"Latest Wind: {latest.get('wind_speed')} km/h\n"
+        f"Rain last 24h: {agg['rain_24h_mm']} mm; last 7 days: {agg['rain_7d_mm']} mm ({agg['wet_hours_7d']} wet hours)\n"
+        f"Max temp last 24h: {agg['max_temp_24h']}°C; heat days (>= {HEAT_DAY_CELSIUS:g}°C) in last 30 days: {agg['heat_days_30d']}"
+    )
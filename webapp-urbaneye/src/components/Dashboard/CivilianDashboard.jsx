@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
+import { fetchAllPages } from '../../utils/pagination';
 import {
     MapPin, Calendar, CheckCircle, Zap, ArrowRight, TrendingUp,
     LayoutDashboard, FileText, Shield, LogOut, RefreshCw, X,
@@ -78,8 +79,7 @@ const CivilianDashboard = ({ user }) => {
 
     const fetchMyBookings = async () => {
         try {
-            const res = await axios.get(`${API_BASE}/bookings/my`, getAuthHeaders());
-            if (res.data.success) setBookings(res.data.bookings);
+            setBookings(await fetchAllPages(params => axios.get(`${API_BASE}/bookings/my`, { ...getAuthHeaders(), params }), 'bookings'));
         } catch (err) {
             console.error("Failed to fetch bookings", err);
         }
@@ -87,8 +87,7 @@ const CivilianDashboard = ({ user }) => {
 
     const fetchMyNGORequests = async () => {
         try {
-            const res = await axios.get(`${API_BASE}/ngo/requests/my`, getAuthHeaders());
-            if (res.data.success) setNgoRequests(res.data.requests);
+            setNgoRequests(await fetchAllPages(params => axios.get(`${API_BASE}/ngo/requests/my`, { ...getAuthHeaders(), params }), 'requests'));
         } catch (err) {
             console.error("Failed to fetch NGO requests", err);
         }
@@ -7,6 +7,7 @@ import {
     Clock, CheckCircle, Activity, ChevronRight, ChevronLeft, Building, UserPlus
 } from 'lucide-react';
 import axios from 'axios';
+import { fetchAllPages } from '../../utils/pagination';
 import { useAuth } from '../../context/AuthContext';
 import '../Dashboard/GovAdminDashboard.css'; // Reusing Gov Admin styles for consistency
 
@@ -53,12 +54,13 @@ const DeptHeadDashboard = () => {
             });
 
             // Fetch Field Officers (Staff)
-            const staffRes = await axios.get(`${API_BASE}/gov/staff`, { headers });
-            if (staffRes.data.success) {
-                // Filter officers in SAME department
-                const officers = staffRes.data.staff.filter(s => s.role === 'field_officer' && s.department === user.department);
-                setFieldOfficers(officers);
-            }
+            // Field officers in the SAME department (filtered server-side)
+            const officers = await fetchAllPages(
+                params => axios.get(`${API_BASE}/gov/staff`, { headers, params }),
+                'staff',
+                { role: 'field_officer', department: user.department }
+            );
+            setFieldOfficers(officers);
 
         } catch (error) {
             console.error("Error fetching data", error);
@@ -13,6 +13,7 @@ import {
     RadialBarChart, RadialBar, AreaChart, Area
 } from 'recharts';
 import axios from 'axios';
+import { fetchAllPages } from '../../utils/pagination';
 import { useAuth } from '../../context/AuthContext';
 import 'leaflet/dist/leaflet.css';
 import './GovAdminDashboard.css';
@@ -137,12 +138,10 @@ const GovAdminDashboard = () => {
             const headers = token ? { Authorization: `Bearer ${token}` } : {};
 
             if (hrTab === 'recruitment' && recruitmentData.length === 0) {
-                const res = await axios.get(`${API_BASE}/hr/candidates`, { headers });
-                if (res.data.success) setRecruitmentData(res.data.candidates);
+                setRecruitmentData(await fetchAllPages(params => axios.get(`${API_BASE}/hr/candidates`, { headers, params }), 'candidates'));
             }
             if (hrTab === 'attendance' && attendanceData.length === 0) {
-                const res = await axios.get(`${API_BASE}/hr/attendance`, { headers });
-                if (res.data.success) setAttendanceData(res.data.attendance);
+                setAttendanceData(await fetchAllPages(params => axios.get(`${API_BASE}/hr/attendance`, { headers, params }), 'attendance'));
             }
             if (hrTab === 'payroll' && payrollData.length === 0) {
                 const res = await axios.get(`${API_BASE}/hr/payroll`, { headers });
@@ -443,9 +442,9 @@ const GovAdminDashboard = () => {
 
             // Fetch Team Data
             try {
-                const teamRes = await axios.get(`${API_BASE}/gov/staff`, { headers });
-                setTeamMembers(teamRes.data.staff || []);
-                setStats(prev => ({ ...prev, teamCount: teamRes.data.staff?.length || 0 }));
+                const staff = await fetchAllPages(params => axios.get(`${API_BASE}/gov/staff`, { headers, params }), 'staff');
+                setTeamMembers(staff);
+                setStats(prev => ({ ...prev, teamCount: staff.length }));
             } catch (err) {
                 console.error("Failed to fetch team:", err);
             }
@@ -6,6 +6,7 @@ import {
     X, RefreshCw, Download, BarChart3, Building, UserCheck, Database, MapPin, Zap
 } from 'lucide-react';
 import axios from 'axios';
+import { fetchAllPages } from '../utils/pagination';
 import '../styles/SecretAdmin.css';
 
 const API_BASE = (import.meta.env.VITE_API_URL || 'http://localhost:5000') + '/api/v1';
@@ -58,17 +59,20 @@ const SecretAdmin = () => {
 
     const departments = ['Roads', 'Waste', 'Water', 'Electrical', 'General'];
 
+    // Every page of the user listing
+    const fetchAllUsers = () => fetchAllPages(
+        params => axios.post(`${API_BASE}/auth/admin/users`, { secret_key: secretKey }, { params }),
+        'users'
+    );
+
     // Authenticate with secret key
     const handleAuth = async () => {
         setLoading(true);
         setAuthError('');
         try {
-            const response = await axios.post(`${API_BASE}/auth/admin/users`, { secret_key: secretKey });
-            if (response.data.success) {
-                setIsAuthenticated(true);
-                setUsers(response.data.users);
-                fetchStats();
-            }
+            setUsers(await fetchAllUsers());
+            setIsAuthenticated(true);
+            fetchStats();
         } catch (error) {
             setAuthError(error.response?.data?.message || 'Authentication failed');
         }
@@ -79,8 +83,7 @@ const SecretAdmin = () => {
     const fetchUsers = async () => {
         setLoading(true);
         try {
-            const response = await axios.post(`${API_BASE}/auth/admin/users`, { secret_key: secretKey });
-            setUsers(response.data.users);
+            setUsers(await fetchAllUsers());
         } catch (error) {
             showNotification('error', 'Failed to fetch users');
         }
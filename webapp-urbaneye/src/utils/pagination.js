@@ -0,0 +1,16 @@
+// List endpoints return one page at a time ({ [key]: items, next_cursor, has_more }).
+// fetchAllPages follows next_cursor until the listing is exhausted and returns every item.
+// `request(params)` performs the call for one page, e.g.
+//   params => axios.get(`${API_BASE}/gov/staff`, { headers, params })
+export const PAGE_LIMIT = 200;
+
+export async function fetchAllPages(request, key, params = {}) {
+    const items = [];
+    let cursor = null;
+    do {
+        const res = await request({ ...params, limit: PAGE_LIMIT, ...(cursor ? { cursor } : {}) });
+        items.push(...(res.data[key] || []));
+        cursor = res.data.next_cursor;
+    } while (cursor);
+    return items;
+}